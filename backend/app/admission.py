@@ -0,0 +1,161 @@
+"""Admission control for checkout endpoints under burst load."""
+import asyncio
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Deque
+
+from fastapi import HTTPException, status
+
+from app.config import settings
+from app.metrics import Counter, Gauge, Histogram
+
+checkout_in_flight = Gauge(
+    "checkout_admission_in_flight",
+    "Checkout requests currently holding an admission slot"
+)
+checkout_queue_depth = Gauge(
+    "checkout_admission_queue_depth",
+    "Checkout requests waiting for an admission slot"
+)
+checkout_wait_seconds = Histogram(
+    "checkout_admission_wait_seconds",
+    "Time checkout requests spent queued before being admitted"
+)
+checkout_requests = Counter(
+    "checkout_admission_requests_total",
+    "Checkout admission decisions by outcome"
+)
+
+
+class AdmissionController:
+    """
+    Bounds concurrent work with a fixed number of slots and a FIFO wait queue.
+    Requests that find the queue full, or that wait longer than max_wait_seconds,
+    are rejected straight away with Retry-After instead of piling up behind
+    Mongo and Stripe. Each worker process has its own controller.
+    """
+    
+    def __init__(self, capacity: int, max_queue: int, max_wait_seconds: float):
+        self.capacity = capacity
+        self.max_queue = max_queue
+        self.max_wait_seconds = max_wait_seconds
+        self.in_flight = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        # Moving average of how long a slot is held, used for Retry-After
+        self._hold_seconds = 0.5
+    
+    @property
+    def enabled(self) -> bool:
+        return self.capacity > 0
+    
+    @property
+    def queue_depth(self) -> int:
+        return len(self._waiters)
+    
+    def retry_after(self, position: int) -> int:
+        """Estimate the seconds until a request at this queue position would be admitted."""
+        return max(1, math.ceil(position / self.capacity * self._hold_seconds))
+    
+    def _reject(self, status_code: int, reason: str, detail: str, position: int) -> HTTPException:
+        checkout_requests.inc(outcome=reason)
+        return HTTPException(
+            status_code=status_code,
+            detail=detail,
+            headers={
+                "Retry-After": str(self.retry_after(position)),
+                "X-Queue-Position": str(position),
+                "X-Queue-Depth": str(self.queue_depth)
+            }
+        )
+    
+    def _release(self) -> None:
+        """Hand the slot to the oldest waiter, or free it."""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                checkout_queue_depth.set(self.queue_depth)
+                return
+        
+        self.in_flight -= 1
+        checkout_in_flight.set(self.in_flight)
+        checkout_queue_depth.set(self.queue_depth)
+    
+    async def _acquire(self) -> None:
+        """Take a slot, queueing for at most max_wait_seconds."""
+        if self.in_flight < self.capacity and not self._waiters:
+            self.in_flight += 1
+            checkout_in_flight.set(self.in_flight)
+            checkout_wait_seconds.observe(0.0)
+            return
+        
+        position = self.queue_depth + 1
+        
+        if position > self.max_queue:
+            raise self._reject(
+                status.HTTP_429_TOO_MANY_REQUESTS,
+                "queue_full",
+                "Checkout is busy, please retry shortly",
+                position
+            )
+        
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        checkout_queue_depth.set(self.queue_depth)
+        started = time.monotonic()
+        
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), timeout=self.max_wait_seconds)
+        except asyncio.TimeoutError:
+            if waiter.done():
+                # The slot was handed over just as the wait timed out
+                checkout_wait_seconds.observe(time.monotonic() - started)
+                return
+            position = self._waiters.index(waiter) + 1
+            self._waiters.remove(waiter)
+            waiter.cancel()
+            checkout_queue_depth.set(self.queue_depth)
+            raise self._reject(
+                status.HTTP_503_SERVICE_UNAVAILABLE,
+                "wait_timeout",
+                "Checkout is busy, please retry shortly",
+                position
+            )
+        except asyncio.CancelledError:
+            # The client went away; pass on a slot that was already handed over
+            if waiter.done() and not waiter.cancelled():
+                self._release()
+            else:
+                self._waiters.remove(waiter)
+                waiter.cancel()
+                checkout_queue_depth.set(self.queue_depth)
+            raise
+        
+        checkout_wait_seconds.observe(time.monotonic() - started)
+    
+    @asynccontextmanager
+    async def admit(self) -> AsyncIterator[None]:
+        """Hold an admission slot for the duration of the block."""
+        if not self.enabled:
+            yield
+            return
+        
+        await self._acquire()
+        checkout_requests.inc(outcome="admitted")
+        started = time.monotonic()
+        
+        try:
+            yield
+        finally:
+            self._hold_seconds = 0.9 * self._hold_seconds + 0.1 * (time.monotonic() - started)
+            self._release()
+
+
+checkout_admission = AdmissionController(
+    capacity=settings.CHECKOUT_MAX_CONCURRENCY,
+    max_queue=settings.CHECKOUT_MAX_QUEUE,
+    max_wait_seconds=settings.CHECKOUT_MAX_WAIT_SECONDS
+)
+
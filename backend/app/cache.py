@@ -0,0 +1,79 @@
+"""In-process caches for hot catalog reads."""
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Iterable, Optional
+
+from app.config import settings
+from app.metrics import Counter
+
+cache_requests = Counter(
+    "cache_requests_total",
+    "In-process cache lookups by cache and result (hit or miss)"
+)
+
+
+class TTLCache:
+    """
+    A small LRU cache whose entries expire after a fixed time-to-live.
+    Each worker process holds its own copy, so entries can be stale for up to
+    the TTL after a write made by another worker.
+    """
+    
+    def __init__(self, name: str, max_entries: int, ttl_seconds: float):
+        self.name = name
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+    
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 and self.ttl_seconds > 0
+    
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return a cached value, or None if it is missing or expired."""
+        entry = self._entries.get(key)
+        
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            cache_requests.inc(cache=self.name, result="miss")
+            return None
+        
+        self._entries.move_to_end(key)
+        self.hits += 1
+        cache_requests.inc(cache=self.name, result="hit")
+        return entry[1]
+    
+    def set(self, key: Hashable, value: Any) -> None:
+        """Store a value, evicting the least recently used entry when full."""
+        if not self.enabled:
+            return
+        
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+        
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+    
+    def invalidate(self, keys: Iterable[Hashable]) -> None:
+        """Drop the given keys."""
+        for key in keys:
+            self._entries.pop(key, None)
+    
+    def clear(self) -> None:
+        """Drop every entry."""
+        self._entries.clear()
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# (updated_at, stock_shards, ProductPublic) keyed by product id string, hot stock is read live
+product_cache = TTLCache(
+    name="product",
+    max_entries=settings.PRODUCT_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.PRODUCT_CACHE_TTL_SECONDS
+)
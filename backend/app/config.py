@@ -1,3 +1,4 @@
+from typing import Literal
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -6,6 +7,33 @@ class Settings(BaseSettings):
     
     # MongoDB Configuration
     MONGODB_URL: str = "mongodb://localhost:27017/ecommerce"
+    # Skip index creation and seeding at startup, only check that indexes exist
+    FAST_START: bool = False
+    
+    # MongoDB Connection Pool (idle, wait queue and operation timeouts are off at 0)
+    MONGO_MAX_POOL_SIZE: int = 100
+    MONGO_MIN_POOL_SIZE: int = 0
+    MONGO_MAX_CONNECTING: int = 2
+    MONGO_MAX_IDLE_TIME_MS: int = 0
+    MONGO_WAIT_QUEUE_TIMEOUT_MS: int = 0
+    MONGO_CONNECT_TIMEOUT_MS: int = 10000
+    MONGO_SERVER_SELECTION_TIMEOUT_MS: int = 10000
+    MONGO_TIMEOUT_MS: int = 0
+    MONGO_COMPRESSORS: str = ""
+    
+    # MongoDB Read Preferences and Write Concerns per operation class
+    MONGO_CART_WRITE_CONCERN: str = "1"
+    MONGO_ORDER_WRITE_CONCERN: str = "majority"
+    MONGO_STOCK_WRITE_CONCERN: str = "1"  # Hot-product shard decrements, "majority" trades throughput for failover safety
+    MONGO_CATALOG_READ_PREFERENCE: Literal[
+        "primary",
+        "primaryPreferred",
+        "secondary",
+        "secondaryPreferred",
+        "nearest"
+    ] = "secondaryPreferred"
+    MONGO_CATALOG_MAX_STALENESS_SECONDS: int = 90
+    CATALOG_READ_YOUR_WRITES_SECONDS: int = 15
     
     # JWT Configuration
     JWT_SECRET_KEY: str = "your-super-secret-jwt-key-change-this-in-production"
@@ -16,6 +44,81 @@ class Settings(BaseSettings):
     # Stripe Configuration
     STRIPE_SECRET_KEY: str = ""
     STRIPE_WEBHOOK_SECRET: str = ""
+    STRIPE_API_BASE: str = ""  # Empty uses Stripe, set to a local fake gateway for load tests
+    
+    # Idempotency Configuration
+    IDEMPOTENCY_KEY_TTL_SECONDS: int = 86400
+    IDEMPOTENCY_LOCK_TIMEOUT_SECONDS: int = 60
+    IDEMPOTENCY_WAIT_TIMEOUT_SECONDS: float = 30.0
+    IDEMPOTENCY_POLL_INTERVAL_SECONDS: float = 0.1
+    
+    # Catalog Cache Configuration
+    PRODUCT_CACHE_MAX_ENTRIES: int = 10000
+    PRODUCT_CACHE_TTL_SECONDS: float = 30.0
+    
+    # Catalog HTTP Caching Configuration (ETags and CDN headers on product reads)
+    CATALOG_HTTP_CACHE_ENABLED: bool = True
+    CATALOG_MAX_AGE_SECONDS: int = 0  # Browsers revalidate every time, a match costs a 304
+    CATALOG_CDN_MAX_AGE_SECONDS: int = 60  # s-maxage, purge by surrogate key after edits
+    CATALOG_STALE_WHILE_REVALIDATE_SECONDS: int = 30
+    CATALOG_VERSION_TTL_SECONDS: float = 1.0  # How long list ETags may lag a catalog write
+    SURROGATE_KEY_HEADER: str = "Surrogate-Key"  # e.g. Cache-Tag for Cloudflare, empty to omit
+    
+    # Bulk Import Configuration
+    IMPORT_BATCH_SIZE: int = 1000
+    IMPORT_MAX_REPORTED_ERRORS: int = 1000
+    BULK_UPDATE_MAX_ITEMS: int = 50000
+    
+    # Hot Product Stock Configuration
+    STOCK_MAX_SHARDS: int = 64
+    STOCK_RECONCILE_INTERVAL_SECONDS: float = 5.0
+    
+    # Checkout Admission Control (per worker, 0 disables)
+    CHECKOUT_MAX_CONCURRENCY: int = 32
+    CHECKOUT_MAX_QUEUE: int = 256
+    CHECKOUT_MAX_WAIT_SECONDS: float = 2.0
+    
+    # Export Configuration
+    EXPORT_BATCH_SIZE: int = 2000
+    EXPORT_CHUNK_ROWS: int = 500
+    
+    # Metrics Configuration
+    METRICS_ENABLED: bool = True  # Request middleware, Mongo command timings and GET /metrics
+    SLOW_QUERY_THRESHOLD_MS: float = 100.0  # 0 disables the slow query log
+    SLOW_QUERY_EXPLAIN: bool = True  # Explain the first occurrence of each slow read shape
+    SLOW_QUERY_MAX_SHAPES: int = 500
+    SERVER_TIMING_ENABLED: bool = True  # Server-Timing header for admin requests sent with X-Server-Timing: 1
+    PROFILING_ENABLED: bool = True  # Admin requests sent with X-Profile: 1 return a sampled profile
+    PROFILE_SAMPLE_INTERVAL_MS: float = 1.0
+    
+    # Warmup Configuration (run before /ready reports the worker ready)
+    WARMUP_ENABLED: bool = True
+    WARMUP_CONNECTIONS: int = 10  # Pooled connections opened per worker, capped at MONGO_MAX_POOL_SIZE
+    WARMUP_HOT_PRODUCTS: int = 200  # Most reviewed products preloaded into the product cache
+    
+    # Health Configuration
+    HEALTH_CHECK_INTERVAL_SECONDS: float = 5.0  # 0 disables the checks, /ready then only reflects warmup
+    HEALTH_CHECK_TIMEOUT_SECONDS: float = 2.0  # Per MongoDB ping and Stripe lookup
+    HEALTH_MAX_LOOP_LAG_MS: float = 200.0  # Longer event loop stalls mark the worker degraded
+    HEALTH_LOOP_LAG_BREACHES: int = 3  # Probes in a row that must see such a stall first
+    HEALTH_MAX_POOL_WAIT_MS: float = 100.0  # Longer connection checkout waits mark the worker degraded
+    HEALTH_STRIPE_CHECK_INTERVAL_SECONDS: float = 60.0  # 0 disables the Stripe check
+    LOOP_WATCHDOG_ENABLED: bool = False  # Capture the stack and route of code that blocks the event loop
+    LOOP_WATCHDOG_THRESHOLD_MS: float = 100.0
+    LOOP_WATCHDOG_MAX_STACKS: int = 200
+    
+    # Server Configuration (python -m app.serve)
+    SERVER_WORKERS: int = 0  # 0 runs one worker per available CPU
+    SERVER_KEEP_ALIVE_SECONDS: int = 75  # Keep above the load balancer's idle timeout so it closes first
+    SERVER_GRACEFUL_TIMEOUT_SECONDS: int = 30
+    SERVER_MEMORY_REPORT_INTERVAL_SECONDS: float = 300.0
+    
+    # Logging Configuration
+    LOG_LEVEL: str = "INFO"
+    LOG_JSON: bool = True  # One JSON object per line, false for plain text while developing
+    LOG_QUEUE_SIZE: int = 10000  # Records beyond this are dropped rather than blocking requests
+    LOG_DEBUG_SAMPLE_RATE: float = 0.01  # Fraction of DEBUG records kept when LOG_LEVEL=DEBUG
+    ACCESS_LOG_ENABLED: bool = True
     
     # CORS Configuration
     FRONTEND_URL: str = "http://localhost:5173"
@@ -1,31 +1,336 @@
 """Database initialization and seeding."""
+import asyncio
+import logging
+import threading
+import time
+from typing import Any, Dict, List, Optional
 from motor.motor_asyncio import AsyncIOMotorClient
 from beanie import init_beanie
+from beanie.odm.fields import IndexModelField
+from beanie.odm.utils.init import Initializer
+from beanie.odm.utils.pydantic import get_model_fields
+from beanie.odm.utils.typing import get_index_attributes
+from pymongo import IndexModel, monitoring
+from pymongo.write_concern import WriteConcern
 from app.config import settings
+from app.metrics import Counter, Histogram
+from app.slow_queries import SlowQueryListener, slow_query_log
+from app.timing import MongoTimingListener
 from app.models.user import User
 from app.models.product import Product
 from app.models.review import Review
 from app.models.order import Order
 from app.models.cart import Cart
+from app.models.idempotency import IdempotencyRecord
+from app.models.sales_rollup import DailySalesRollup, ProductSalesRollup, CategorySalesRollup, RollupBackfillJob
+from app.models.stock_shard import StockShard
 
+logger = logging.getLogger(__name__)
 
-async def init_db():
-    """Initialize database connection and beanie ODM."""
-    client = AsyncIOMotorClient(settings.MONGODB_URL)
+DOCUMENT_MODELS = [
+    User,
+    Product,
+    Review,
+    Order,
+    Cart,
+    IdempotencyRecord,
+    DailySalesRollup,
+    ProductSalesRollup,
+    CategorySalesRollup,
+    RollupBackfillJob,
+    StockShard
+]
+
+# Index options that change behaviour, compared when reporting drift
+SIGNIFICANT_INDEX_OPTIONS = ("unique", "sparse", "partialFilterExpression", "expireAfterSeconds")
+
+pool_checkout_wait_seconds = Histogram(
+    "mongo_pool_checkout_wait_seconds",
+    "Time spent waiting to check a connection out of the Motor pool",
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+)
+pool_checkout_failures = Counter(
+    "mongo_pool_checkout_failures_total",
+    "Connection checkouts that failed, by reason"
+)
+command_duration_seconds = Histogram(
+    "mongo_command_duration_seconds",
+    "MongoDB command round-trip time by command name and collection",
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+)
+command_failures = Counter(
+    "mongo_command_failures_total",
+    "MongoDB commands that failed, by command name and collection"
+)
+
+# The shared client, created by init_db and closed by close_db
+client: Optional[AsyncIOMotorClient] = None
+
+
+class PoolWaitListener(monitoring.ConnectionPoolListener):
+    """
+    Times connection checkouts and counts connections in use. Motor runs each
+    operation on one executor thread, so the start time is kept per thread.
+    The longest wait is kept until the health monitor takes it.
+    """
+    
+    def __init__(self):
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.in_use = 0
+        self.max_wait_seconds = 0.0
+    
+    def take_max_wait(self) -> float:
+        """The longest checkout wait since the previous call."""
+        with self._lock:
+            wait, self.max_wait_seconds = self.max_wait_seconds, 0.0
+        return wait
+    
+    def connection_check_out_started(self, event):
+        self._local.started = time.perf_counter()
+    
+    def connection_checked_out(self, event):
+        started = getattr(self._local, "started", None)
+        with self._lock:
+            self.in_use += 1
+            if started is not None:
+                self.max_wait_seconds = max(self.max_wait_seconds, time.perf_counter() - started)
+        if started is not None:
+            pool_checkout_wait_seconds.observe(time.perf_counter() - started)
+            self._local.started = None
+    
+    def connection_check_out_failed(self, event):
+        self._local.started = None
+        pool_checkout_failures.inc(reason=event.reason)
+    
+    def pool_created(self, event):
+        pass
+    
+    def pool_ready(self, event):
+        pass
+    
+    def pool_cleared(self, event):
+        pass
+    
+    def pool_closed(self, event):
+        pass
+    
+    def connection_created(self, event):
+        pass
+    
+    def connection_ready(self, event):
+        pass
+    
+    def connection_closed(self, event):
+        pass
+    
+    def connection_checked_in(self, event):
+        with self._lock:
+            self.in_use -= 1
+
+
+# Shared by every client so the health monitor can read pool usage
+pool_listener = PoolWaitListener()
+
+
+class CommandMetricsListener(monitoring.CommandListener):
+    """
+    Times commands by name and collection. Only the started event carries
+    the command document, so its collection is kept until the reply arrives.
+    """
+    
+    def __init__(self):
+        self._collections: Dict[int, str] = {}
+    
+    def started(self, event):
+        # getMore names its cursor id first and its collection separately
+        target = event.command.get("collection" if event.command_name == "getMore" else event.command_name)
+        self._collections[event.request_id] = target if isinstance(target, str) else ""
+    
+    def succeeded(self, event):
+        command_duration_seconds.observe(
+            event.duration_micros / 1_000_000,
+            command=event.command_name,
+            collection=self._collections.pop(event.request_id, "")
+        )
+    
+    def failed(self, event):
+        collection = self._collections.pop(event.request_id, "")
+        command_duration_seconds.observe(
+            event.duration_micros / 1_000_000,
+            command=event.command_name,
+            collection=collection
+        )
+        command_failures.inc(command=event.command_name, collection=collection)
+
+
+def _client_options() -> Dict[str, Any]:
+    """Build Motor client options from settings, leaving unset values at driver defaults."""
+    options: Dict[str, Any] = {
+        "maxPoolSize": settings.MONGO_MAX_POOL_SIZE,
+        "minPoolSize": settings.MONGO_MIN_POOL_SIZE,
+        "maxConnecting": settings.MONGO_MAX_CONNECTING,
+        "connectTimeoutMS": settings.MONGO_CONNECT_TIMEOUT_MS,
+        "serverSelectionTimeoutMS": settings.MONGO_SERVER_SELECTION_TIMEOUT_MS,
+        "event_listeners": [pool_listener]
+    }
+    
+    if settings.MONGO_MAX_IDLE_TIME_MS > 0:
+        options["maxIdleTimeMS"] = settings.MONGO_MAX_IDLE_TIME_MS
+    if settings.MONGO_WAIT_QUEUE_TIMEOUT_MS > 0:
+        options["waitQueueTimeoutMS"] = settings.MONGO_WAIT_QUEUE_TIMEOUT_MS
+    if settings.MONGO_TIMEOUT_MS > 0:
+        options["timeoutMS"] = settings.MONGO_TIMEOUT_MS
+    if settings.MONGO_COMPRESSORS:
+        options["compressors"] = settings.MONGO_COMPRESSORS
+    if settings.METRICS_ENABLED:
+        options["event_listeners"].append(CommandMetricsListener())
+    if slow_query_log.enabled:
+        options["event_listeners"].append(SlowQueryListener(slow_query_log))
+    if settings.SERVER_TIMING_ENABLED:
+        options["event_listeners"].append(MongoTimingListener())
+    
+    return options
+
+
+def _write_concern(value: str) -> WriteConcern:
+    """Parse a write concern setting such as "1" or "majority"."""
+    return WriteConcern(w=int(value) if value.isdigit() else value)
+
+
+def apply_operation_classes() -> None:
+    """
+    Give each collection the write concern of its operation class: cheap
+    acknowledged cart writes, durable order writes and hot-stock decrements,
+    which must not wait for replication on the path built to be fast.
+    Catalog reads are routed to secondaries per request, see app.read_routing.
+    """
+    operation_classes = [
+        ([Cart], {"write_concern": _write_concern(settings.MONGO_CART_WRITE_CONCERN)}),
+        (
+            [Order, IdempotencyRecord],
+            {"write_concern": _write_concern(settings.MONGO_ORDER_WRITE_CONCERN)}
+        ),
+        ([StockShard], {"write_concern": _write_concern(settings.MONGO_STOCK_WRITE_CONCERN)})
+    ]
+    
+    for models, options in operation_classes:
+        for model in models:
+            model_settings = model.get_settings()
+            model_settings.motor_collection = model_settings.motor_collection.with_options(**options)
+
+
+class FastStartInitializer(Initializer):
+    """Beanie initializer that skips createIndexes, leaving indexes to `python -m app.manage migrate`."""
+    
+    async def init_indexes(self, cls, allow_index_dropping: bool = False):
+        return None
+
+
+async def init_db(create_indexes: bool = True):
+    """
+    Initialize database connection and beanie ODM.
+    With create_indexes=False no createIndexes commands are sent, which is
+    how workers start in FAST_START mode.
+    """
+    global client
+    
+    client = AsyncIOMotorClient(settings.MONGODB_URL, **_client_options())
     database = client.get_default_database()
+    # Slow read shapes are explained through the same client, off the driver threads
+    slow_query_log.bind(asyncio.get_running_loop(), lambda name, command: client[name].command(command))
     
-    await init_beanie(
-        database=database,
-        document_models=[
-            User,
-            Product,
-            Review,
-            Order,
-            Cart
-        ]
-    )
+    if create_indexes:
+        await init_beanie(database=database, document_models=DOCUMENT_MODELS)
+    else:
+        await FastStartInitializer(database=database, document_models=DOCUMENT_MODELS)
+    apply_operation_classes()
+    
+    logger.info("Database initialized")
+
+
+def expected_indexes(model) -> List[IndexModelField]:
+    """The indexes a model declares through Indexed() fields and Settings.indexes."""
+    indexes = []
+    
+    for name, field in get_model_fields(model).items():
+        attributes = get_index_attributes(field)
+        if attributes is not None:
+            indexes.append(IndexModelField(IndexModel(
+                [(field.alias or name, attributes[0])],
+                **attributes[1]
+            )))
+    
+    declared = model.get_settings().indexes or []
+    # Beanie keys indexes by field names alone, so one of two declarations on
+    # the same fields (in any order or direction) would silently not be created
+    if len({index.fields for index in declared}) < len(declared):
+        raise RuntimeError(
+            f"{model.__name__} declares several indexes on the same fields: "
+            f"{', '.join(index.name for index in declared)}"
+        )
+    
+    if declared:
+        indexes = IndexModelField.merge_indexes(indexes, declared)
+    return indexes
+
+
+async def check_indexes() -> Dict[str, Dict[str, List[str]]]:
+    """
+    Compare the declared indexes with those in the database, by index name.
+    Returns, per collection, the missing and unexpected indexes and those
+    whose unique/sparse/partial/TTL options differ.
+    """
+    report = {}
+    
+    for model in DOCUMENT_MODELS:
+        existing = await model.get_motor_collection().index_information()
+        existing.pop("_id_", None)
+        missing, changed = [], []
+        expected_names = set()
+        
+        for index in expected_indexes(model):
+            expected_names.add(index.name)
+            actual = existing.get(index.name)
+            
+            if actual is None:
+                missing.append(index.name)
+            elif any(
+                index.index.document.get(option) != actual.get(option)
+                for option in SIGNIFICANT_INDEX_OPTIONS
+            ):
+                changed.append(index.name)
+        
+        report[model.get_collection_name()] = {
+            "missing": missing,
+            "unexpected": sorted(set(existing) - expected_names),
+            "changed": changed
+        }
+    
+    return report
+
+
+async def verify_indexes() -> None:
+    """Fail fast when declared indexes are missing, e.g. because migrate was not run."""
+    missing = [
+        f"{collection}.{index}"
+        for collection, drift in (await check_indexes()).items()
+        for index in drift["missing"]
+    ]
+    
+    if missing:
+        raise RuntimeError(
+            f"Missing indexes: {', '.join(missing)}. Run `python -m app.manage migrate` first."
+        )
+
+
+def close_db():
+    """Close the shared client and its connection pool."""
+    global client
     
-    print("Database initialized successfully!")
+    if client is not None:
+        client.close()
+        client = None
 
 
 async def seed_database():
@@ -34,10 +339,10 @@ async def seed_database():
     product_count = await Product.count()
     
     if product_count > 0:
-        print(f"Database already has {product_count} products. Skipping seed.")
+        logger.info("Database already has %d products, skipping seed", product_count)
         return
     
-    print("Seeding database with sample products...")
+    logger.info("Seeding database with sample products")
     
     sample_products = [
         {
@@ -165,4 +470,4 @@ async def seed_database():
     products = [Product(**product_data) for product_data in sample_products]
     await Product.insert_many(products)
     
-    print(f"Successfully seeded {len(products)} products!")
+    logger.info("Seeded %d products", len(products))
@@ -0,0 +1,170 @@
+"""Periodic dependency probes behind the readiness endpoint."""
+import asyncio
+import logging
+import time
+from typing import Any, Dict, Optional
+
+import stripe
+
+from app import db
+from app.config import settings
+from app.metrics import Gauge
+
+logger = logging.getLogger(__name__)
+
+HEALTHY = "healthy"
+DEGRADED = "degraded"
+UNHEALTHY = "unhealthy"
+SKIPPED = "skipped"
+
+# The overall status is that of the most severe check
+_SEVERITY = {UNHEALTHY: 2, DEGRADED: 1, HEALTHY: 0, SKIPPED: 0}
+
+health_check_status = Gauge(
+    "health_check_status",
+    "Latest result of each health check: 0 healthy, 1 degraded, 2 unhealthy"
+)
+event_loop_lag_seconds = Gauge(
+    "event_loop_lag_seconds",
+    "Longest event loop delay seen between health checks"
+)
+mongo_ping_seconds = Gauge(
+    "mongo_ping_seconds",
+    "Round-trip time of the latest health check ping"
+)
+
+# How often the loop lag probe wakes up
+LOOP_LAG_SAMPLE_SECONDS = 0.1
+
+
+class HealthMonitor:
+    """
+    Probes MongoDB, the connection pool, the event loop and Stripe in the
+    background and keeps the latest results, so readiness checks cost nothing.
+    Stripe is reported but does not affect readiness: every worker shares it,
+    so moving traffic between workers would not help.
+    """
+    
+    def __init__(self):
+        self.status = HEALTHY
+        self.checks: Dict[str, Dict[str, Any]] = {}
+        self.checked_at: Optional[float] = None
+        self.max_loop_lag_seconds = 0.0
+        self.loop_lag_breaches = 0
+        self._stripe_checked_at = 0.0
+    
+    async def watch_loop_lag(self) -> None:
+        """Measure how late short sleeps wake up, keeping the longest delay."""
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + LOOP_LAG_SAMPLE_SECONDS
+            await asyncio.sleep(LOOP_LAG_SAMPLE_SECONDS)
+            self.max_loop_lag_seconds = max(self.max_loop_lag_seconds, loop.time() - expected)
+    
+    def check_loop(self) -> Dict[str, Any]:
+        """
+        Degraded only once the longest lag has exceeded the threshold in
+        HEALTH_LOOP_LAG_BREACHES probes in a row, so one stall does not take
+        the worker out of the load balancer for a whole interval.
+        """
+        lag, self.max_loop_lag_seconds = self.max_loop_lag_seconds, 0.0
+        event_loop_lag_seconds.set(lag)
+        
+        if lag * 1000 > settings.HEALTH_MAX_LOOP_LAG_MS:
+            self.loop_lag_breaches += 1
+        else:
+            self.loop_lag_breaches = 0
+        
+        return {
+            "status": DEGRADED if self.loop_lag_breaches >= settings.HEALTH_LOOP_LAG_BREACHES else HEALTHY,
+            "max_lag_ms": round(lag * 1000, 1),
+            "breaches": self.loop_lag_breaches
+        }
+    
+    def check_pool(self) -> Dict[str, Any]:
+        wait = db.pool_listener.take_max_wait()
+        return {
+            "status": DEGRADED if wait * 1000 > settings.HEALTH_MAX_POOL_WAIT_MS else HEALTHY,
+            "in_use": db.pool_listener.in_use,
+            "max_pool_size": settings.MONGO_MAX_POOL_SIZE,
+            "max_wait_ms": round(wait * 1000, 1)
+        }
+    
+    async def check_mongo(self) -> Dict[str, Any]:
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(
+                db.client.admin.command("ping"),
+                timeout=settings.HEALTH_CHECK_TIMEOUT_SECONDS
+            )
+        except Exception as e:
+            return {"status": UNHEALTHY, "error": str(e) or type(e).__name__}
+        
+        rtt = time.perf_counter() - started
+        mongo_ping_seconds.set(rtt)
+        return {"status": HEALTHY, "rtt_ms": round(rtt * 1000, 1)}
+    
+    async def check_stripe(self) -> Dict[str, Any]:
+        """Look up a payment intent that does not exist, a 404 proves the API is reachable with our key."""
+        if not settings.STRIPE_SECRET_KEY:
+            return {"status": SKIPPED}
+        
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(
+                asyncio.to_thread(stripe.PaymentIntent.retrieve, "pi_health_check"),
+                timeout=settings.HEALTH_CHECK_TIMEOUT_SECONDS
+            )
+        except stripe.error.InvalidRequestError:
+            pass
+        except (stripe.error.StripeError, asyncio.TimeoutError) as e:
+            return {"status": UNHEALTHY, "error": type(e).__name__}
+        
+        return {"status": HEALTHY, "rtt_ms": round((time.perf_counter() - started) * 1000, 1)}
+    
+    async def probe(self) -> None:
+        """Run every check once and update the overall status."""
+        checks = {
+            "mongo": await self.check_mongo(),
+            "pool": self.check_pool(),
+            "event_loop": self.check_loop()
+        }
+        
+        status = max((check["status"] for check in checks.values()), key=_SEVERITY.get)
+        
+        # Stripe calls are rate limited and cost the same from every worker, so check it less often
+        interval = settings.HEALTH_STRIPE_CHECK_INTERVAL_SECONDS
+        if interval > 0 and time.monotonic() - self._stripe_checked_at >= interval:
+            self._stripe_checked_at = time.monotonic()
+            checks["stripe"] = await self.check_stripe()
+        elif "stripe" in self.checks:
+            checks["stripe"] = self.checks["stripe"]
+        
+        for name, check in checks.items():
+            health_check_status.set(_SEVERITY[check["status"]], check=name)
+        
+        if status != self.status:
+            logger.warning("Health changed from %s to %s", self.status, status, extra={"checks": checks})
+        
+        self.checks = checks
+        self.status = status
+        self.checked_at = time.time()
+    
+    async def run(self) -> None:
+        """Probe every HEALTH_CHECK_INTERVAL_SECONDS until cancelled, after a first probe()."""
+        lag_watcher = asyncio.create_task(self.watch_loop_lag())
+        try:
+            while True:
+                await asyncio.sleep(settings.HEALTH_CHECK_INTERVAL_SECONDS)
+                try:
+                    await self.probe()
+                except Exception:
+                    logger.exception("Health probe failed")
+        finally:
+            lag_watcher.cancel()
+    
+    def report(self) -> Dict[str, Any]:
+        return {"status": self.status, "checked_at": self.checked_at, "checks": self.checks}
+
+
+health_monitor = HealthMonitor()
@@ -0,0 +1,126 @@
+"""ETags, conditional GETs and CDN caching headers for catalog endpoints."""
+import asyncio
+import hashlib
+from datetime import datetime
+from typing import Any, Dict, Iterable, List
+
+from fastapi import Request, Response, status
+from pymongo import DESCENDING
+
+from app.cache import TTLCache
+from app.config import settings
+from app.models.product import Product
+from app.read_routing import reads_own_writes
+
+# Purges every cached product list, which any product change can affect
+CATALOG_SURROGATE_KEY = "products"
+
+# The catalog-wide version behind list ETags, shared by every list query
+catalog_version_cache = TTLCache(
+    name="catalog_version",
+    max_entries=1,
+    ttl_seconds=settings.CATALOG_VERSION_TTL_SECONDS
+)
+
+
+def _etag(*parts) -> str:
+    digest = hashlib.sha1("|".join(str(part) for part in parts).encode()).hexdigest()[:20]
+    return f'W/"{digest}"'
+
+
+def last_modified(document: Dict[str, Any]) -> datetime:
+    """
+    A product document's updated_at. Products written before the field existed
+    fall back to created_at, then to their ObjectId's creation time, until
+    `python -m app.manage migrate` backfills them.
+    """
+    return document.get("updated_at") or document.get("created_at") or document["_id"].generation_time
+
+
+def product_etag(updated_at: datetime, stock_quantity: int) -> str:
+    """ETag of a product's details. Hot products change stock without touching updated_at."""
+    return _etag(updated_at.isoformat(timespec="milliseconds"), stock_quantity)
+
+
+def reviews_etag(updated_at: datetime) -> str:
+    """
+    ETag of a product's reviews, a new review updates the product's rating and
+    updated_at. Author names are not part of it: the API cannot rename or
+    delete users, so after editing one in the database, purge the products it
+    reviewed.
+    """
+    return _etag("reviews", updated_at.isoformat(timespec="milliseconds"))
+
+
+async def catalog_version(fresh: bool = False) -> str:
+    """
+    The newest updated_at in the catalog and the product count, which a
+    delete changes. Cached for CATALOG_VERSION_TTL_SECONDS so list requests
+    usually skip both queries; `fresh` skips the cache for clients that must
+    see their own writes.
+    """
+    version = None if fresh else catalog_version_cache.get("catalog")
+    
+    if version is None:
+        collection = Product.get_motor_collection()
+        latest, count = await asyncio.gather(
+            collection.find_one({}, {"updated_at": 1, "created_at": 1}, sort=[("updated_at", DESCENDING)]),
+            collection.estimated_document_count()
+        )
+        version = f"{last_modified(latest).isoformat() if latest else ''}:{count}"
+        catalog_version_cache.set("catalog", version)
+    
+    return version
+
+
+def list_etag(version: str, **params) -> str:
+    """ETag of one product list query, from the catalog version and the query parameters."""
+    return _etag(version, *sorted(params.items()))
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Whether If-None-Match names this ETag, using the weak comparison GET allows."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    
+    opaque = etag.removeprefix("W/")
+    return any(candidate.strip().removeprefix("W/") == opaque for candidate in header.split(","))
+
+
+def cache_control() -> str:
+    directives = [
+        "public",
+        f"max-age={settings.CATALOG_MAX_AGE_SECONDS}",
+        f"s-maxage={settings.CATALOG_CDN_MAX_AGE_SECONDS}"
+    ]
+    if settings.CATALOG_STALE_WHILE_REVALIDATE_SECONDS > 0:
+        directives.append(f"stale-while-revalidate={settings.CATALOG_STALE_WHILE_REVALIDATE_SECONDS}")
+    return ", ".join(directives)
+
+
+def set_cache_headers(request: Request, response: Response, etag: str, surrogate_keys: Iterable[str]) -> None:
+    response.headers["ETag"] = etag
+    
+    # A client reading its own writes got a primary read, which shared caches must not hand to others
+    if reads_own_writes(request):
+        response.headers["Cache-Control"] = "private, no-store"
+        return
+    
+    response.headers["Cache-Control"] = cache_control()
+    if settings.SURROGATE_KEY_HEADER:
+        response.headers[settings.SURROGATE_KEY_HEADER] = " ".join(surrogate_keys)
+
+
+def not_modified(request: Request, etag: str, surrogate_keys: Iterable[str]) -> Response:
+    """A 304 carrying the same caching headers as the full response."""
+    response = Response(status_code=status.HTTP_304_NOT_MODIFIED)
+    set_cache_headers(request, response, etag, surrogate_keys)
+    return response
+
+
+def product_surrogate_keys(product_id: str) -> List[str]:
+    """Keys for a product's details and reviews, purge them after editing the product."""
+    return [f"product-{product_id}"]
@@ -0,0 +1,132 @@
+"""Structured JSON logging through a bounded queue drained by a background thread."""
+import json
+import logging
+import queue
+import random
+import sys
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict, Optional
+
+from app.config import settings
+from app.metrics import Counter
+
+log_records_dropped = Counter(
+    "log_records_dropped_total",
+    "Log records dropped because the log queue was full"
+)
+
+# Attributes every LogRecord has, anything else was passed with `extra`
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "context"}
+
+# Set by RequestLogMiddleware. The dict is shared rather than replaced, so
+# fields bound by dependencies running in a copied context still reach it.
+_request_context: ContextVar[Optional[Dict[str, Any]]] = ContextVar("request_context", default=None)
+
+
+def start_request_context(**fields: Any) -> Dict[str, Any]:
+    context = dict(fields)
+    _request_context.set(context)
+    return context
+
+
+def bind_request_context(**fields: Any) -> None:
+    """Add fields such as the user id to every later record of the current request."""
+    context = _request_context.get()
+    if context is not None:
+        context.update(fields)
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line with the request context and any `extra` fields."""
+    
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage()
+        }
+        entry.update(getattr(record, "context", None) or {})
+        for name, value in vars(record).items():
+            if name not in _RECORD_ATTRIBUTES:
+                entry[name] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class DebugSampler(logging.Filter):
+    """Keeps a fraction of records below INFO, every other record passes."""
+    
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+    
+    def filter(self, record: logging.LogRecord) -> bool:
+        return record.levelno >= logging.INFO or random.random() < self.rate
+
+
+class BoundedQueueHandler(QueueHandler):
+    """
+    Hands records to the listener thread, which formats and writes them. The
+    record is frozen here because its arguments and the request context may
+    change afterwards. A full queue drops the record instead of blocking.
+    """
+    
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.msg = record.getMessage()
+        record.args = None
+        record.context = dict(_request_context.get() or {})
+        if record.exc_info:
+            # Tracebacks hold frames, render them while they are still accurate
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+    
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            log_records_dropped.inc()
+
+
+class LogListener(QueueListener):
+    """Writes queued records to its handlers from a background thread."""
+    
+    def enqueue_sentinel(self) -> None:
+        # The queue may be full at shutdown, wait for the thread to make room
+        self.queue.put(self._sentinel)
+
+
+def start_logging() -> QueueListener:
+    """Route the `app` loggers through the queue and start the thread writing them to stdout."""
+    output = logging.StreamHandler(sys.stdout)
+    if settings.LOG_JSON:
+        output.setFormatter(JsonFormatter())
+    else:
+        output.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s %(message)s"))
+    
+    log_queue: queue.Queue = queue.Queue(maxsize=settings.LOG_QUEUE_SIZE)
+    handler = BoundedQueueHandler(log_queue)
+    handler.addFilter(DebugSampler(settings.LOG_DEBUG_SAMPLE_RATE))
+    
+    logger = logging.getLogger("app")
+    logger.handlers = [handler]
+    logger.setLevel(settings.LOG_LEVEL)
+    logger.propagate = False
+    
+    listener = LogListener(log_queue, output)
+    listener.start()
+    return listener
+
+
+def stop_logging(listener: QueueListener) -> None:
+    """Write out the queued records and stop the listener thread."""
+    logger = logging.getLogger("app")
+    logger.handlers = []
+    logger.propagate = True
+    listener.stop()
@@ -0,0 +1,163 @@
+"""Event loop stall detection with the stack and route of the blocking code."""
+import asyncio
+import os
+import sys
+import threading
+import time
+from types import FrameType
+from typing import Any, Dict, List, Optional
+
+from starlette.types import Scope
+
+from app.config import settings
+from app.metrics import Counter
+
+loop_stalls = Counter(
+    "event_loop_stalls_total",
+    "Event loop stalls longer than the watchdog threshold, by route"
+)
+
+# Innermost frames kept per stack, the outer ones are the server and middleware
+MAX_STACK_DEPTH = 30
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _stack(frame: Optional[FrameType]) -> List[str]:
+    """The stack from the outermost of the innermost frames to the innermost one."""
+    stack = []
+    while frame is not None and len(stack) < MAX_STACK_DEPTH:
+        filename = frame.f_code.co_filename
+        filename = os.path.relpath(filename, _ROOT) if filename.startswith(_ROOT) else filename
+        stack.append(f"{frame.f_code.co_name} ({filename}:{frame.f_lineno})")
+        frame = frame.f_back
+    return stack[::-1]
+
+
+class LoopWatchdog:
+    """
+    A heartbeat task on the event loop and a thread that watches it. When
+    the heartbeat is late by more than the threshold, the thread captures the
+    loop thread's stack once, along with the route of the request whose task
+    was running. The heartbeat measures how long the stall lasted when it next
+    runs. Stalls are aggregated by route and stack.
+    """
+    
+    def __init__(self, threshold_ms: float, max_entries: int):
+        self.threshold_seconds = threshold_ms / 1000
+        self.max_entries = max_entries
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self.stalls_without_stack = 0
+        # Request scopes by task, kept by RequestLogMiddleware while the watchdog runs
+        self.requests: Dict[asyncio.Task, Scope] = {}
+        self.running = False
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id = 0
+        self._last_beat = 0.0
+        self._captured: Optional[tuple] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._heartbeat: Optional[asyncio.Task] = None
+    
+    def start(self) -> None:
+        """Start watching the running loop."""
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._stop.clear()
+        self._heartbeat = asyncio.create_task(self._beat())
+        self._thread = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._thread.start()
+        self.running = True
+    
+    async def stop(self) -> None:
+        self.running = False
+        self._stop.set()
+        if self._heartbeat:
+            self._heartbeat.cancel()
+        if self._thread:
+            await asyncio.to_thread(self._thread.join)
+        self.requests.clear()
+    
+    async def _beat(self) -> None:
+        interval = self.threshold_seconds / 2
+        while True:
+            previous = self._last_beat
+            expected = time.monotonic() + interval
+            await asyncio.sleep(interval)
+            now = time.monotonic()
+            self._last_beat = now
+            
+            lag = now - expected
+            if lag > self.threshold_seconds:
+                with self._lock:
+                    captured, self._captured = self._captured, None
+                # A capture for an earlier beat raced with the end of its stall and is stale
+                self._record(lag, captured if captured and captured[0] == previous else None)
+    
+    def _watch(self) -> None:
+        while not self._stop.wait(self.threshold_seconds / 2):
+            last_beat = self._last_beat
+            late = time.monotonic() - last_beat - self.threshold_seconds / 2
+            if late <= self.threshold_seconds or (self._captured and self._captured[0] == last_beat):
+                continue
+            
+            frame = sys._current_frames().get(self._loop_thread_id)
+            task = asyncio.current_task(self._loop)
+            scope = self.requests.get(task)
+            if scope is not None:
+                # Before routing has matched, e.g. while a middleware is running
+                route = f"{scope['method']} {getattr(scope.get('route'), 'path', 'unrouted')}"
+            else:
+                route = f"task {task.get_name()}" if task else "loop callback"
+            
+            with self._lock:
+                self._captured = (last_beat, route, _stack(frame))
+    
+    def _record(self, lag: float, captured: Optional[tuple]) -> None:
+        if captured is None:
+            # Shorter than the watchdog's polling interval could catch
+            self.stalls_without_stack += 1
+            loop_stalls.inc(route="unknown")
+            return
+        
+        _, route, stack = captured
+        key = route + "\n" + "\n".join(stack)
+        loop_stalls.inc(route=route)
+        
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                if len(self.entries) >= self.max_entries:
+                    cheapest = min(self.entries, key=lambda entry_key: self.entries[entry_key]["total_ms"])
+                    del self.entries[cheapest]
+                entry = self.entries[key] = {
+                    "route": route,
+                    "stack": stack,
+                    "count": 0,
+                    "total_ms": 0.0,
+                    "max_ms": 0.0
+                }
+            
+            entry["count"] += 1
+            entry["total_ms"] += lag * 1000
+            entry["max_ms"] = max(entry["max_ms"], lag * 1000)
+            entry["last_seen"] = time.time()
+    
+    def top(self, limit: int) -> List[Dict[str, Any]]:
+        """Offenders with the most cumulative stall time first."""
+        with self._lock:
+            entries = sorted(self.entries.values(), key=lambda entry: entry["total_ms"], reverse=True)
+            return [dict(entry) for entry in entries[:limit]]
+    
+    def clear(self) -> None:
+        with self._lock:
+            self.entries.clear()
+            self.stalls_without_stack = 0
+
+
+loop_watchdog = LoopWatchdog(
+    threshold_ms=settings.LOOP_WATCHDOG_THRESHOLD_MS,
+    max_entries=settings.LOOP_WATCHDOG_MAX_STACKS
+)
@@ -1,21 +1,74 @@
 """Main FastAPI application."""
-from fastapi import FastAPI
+import asyncio
+import logging
+from fastapi import FastAPI, HTTPException, status
 from fastapi.middleware.cors import CORSMiddleware
-from contextlib import asynccontextmanager
+from fastapi.responses import JSONResponse, PlainTextResponse
+from contextlib import asynccontextmanager, suppress
 
 from app.config import settings
-from app.db import init_db, seed_database
+from app.db import init_db, close_db, seed_database, verify_indexes
+from app.health import HEALTHY, health_monitor
+from app.loop_watchdog import loop_watchdog
+from app.logs import start_logging, stop_logging
+from app.metrics import registry
+from app.middleware import MetricsMiddleware, ProfilerMiddleware, RequestLogMiddleware, ServerTimingMiddleware
 from app.routers import auth, products, cart, orders, admin
+from app.services.stock_service import run_stock_reconciler
+from app.timing import TimedJSONResponse
+from app.warmup import warm_up
+
+logger = logging.getLogger(__name__)
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Lifespan context manager for startup and shutdown events."""
     # Startup
-    await init_db()
-    await seed_database()
+    log_listener = start_logging()
+    
+    if settings.FAST_START:
+        # Indexes and seed data are handled by `python -m app.manage`
+        await init_db(create_indexes=False)
+        await verify_indexes()
+    else:
+        await init_db()
+        await seed_database()
+    
+    reconciler = None
+    if settings.STOCK_RECONCILE_INTERVAL_SECONDS > 0:
+        reconciler = asyncio.create_task(run_stock_reconciler())
+    
+    if settings.WARMUP_ENABLED:
+        try:
+            await warm_up(app)
+        except Exception:
+            # A cold worker is slower, not broken, so it still starts
+            logger.exception("Warmup failed, serving without it")
+    
+    if settings.LOOP_WATCHDOG_ENABLED:
+        loop_watchdog.start()
+    
+    monitor = None
+    if settings.HEALTH_CHECK_INTERVAL_SECONDS > 0:
+        await health_monitor.probe()
+        monitor = asyncio.create_task(health_monitor.run())
+    app.state.ready = True
+    
     yield
-    # Shutdown (if needed)
+    
+    # Shutdown, app.serve has already reported not ready when draining started
+    app.state.ready = False
+    for task in (reconciler, monitor):
+        if task:
+            task.cancel()
+            with suppress(asyncio.CancelledError):
+                await task
+    if loop_watchdog.running:
+        await loop_watchdog.stop()
+    
+    close_db()
+    stop_logging(log_listener)
 
 
 # Create FastAPI app
@@ -23,7 +76,8 @@ app = FastAPI(
     title="E-Commerce Platform API",
     description="A complete e-commerce platform with FastAPI and MongoDB",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=TimedJSONResponse if settings.SERVER_TIMING_ENABLED else JSONResponse
 )
 
 # Configure CORS
@@ -33,8 +87,19 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Pagination cursors travel in a response header the frontend must be able to read
+    expose_headers=["X-Next-Cursor"],
 )
 
+# Middleware added later wraps the middleware added before it
+if settings.PROFILING_ENABLED:
+    app.add_middleware(ProfilerMiddleware)
+if settings.SERVER_TIMING_ENABLED:
+    app.add_middleware(ServerTimingMiddleware)
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+app.add_middleware(RequestLogMiddleware)
+
 # Include routers
 app.include_router(auth.router, prefix="/api/v1")
 app.include_router(products.router, prefix="/api/v1")
@@ -55,5 +120,32 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    """Health check endpoint."""
+    """Liveness endpoint: the worker is up and its event loop answers. Dependencies are checked by /ready."""
     return {"status": "healthy"}
+
+
+@app.get("/ready")
+async def readiness_check():
+    """
+    Readiness endpoint for load balancers: 503 until warmup has finished,
+    while the health checks report the worker degraded or unhealthy, and
+    once the worker starts draining under app.serve. The body has the
+    latest check results.
+    """
+    if not getattr(app.state, "ready", False):
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Not ready")
+    
+    report = health_monitor.report()
+    if report["status"] != HEALTHY:
+        return JSONResponse(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, content=report)
+    
+    return report
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """This worker's metrics in the Prometheus text format."""
+    if not settings.METRICS_ENABLED:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
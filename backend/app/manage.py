@@ -0,0 +1,88 @@
+"""
+Database management commands, run once per deploy instead of in every worker.
+
+Usage (from backend/):
+    python -m app.manage migrate   # create declared indexes, backfill fields and report drift
+    python -m app.manage seed      # insert sample products into an empty catalog
+    python -m app.manage verify    # exit non-zero if declared indexes are missing
+"""
+import argparse
+import asyncio
+import logging
+import sys
+
+from app.db import init_db, close_db, seed_database, check_indexes
+from app.models.order import Order
+from app.models.product import Product
+
+
+def print_drift(report: dict) -> bool:
+    """Print index drift per collection. Returns True if any index is missing."""
+    missing = False
+    
+    for collection, drift in report.items():
+        problems = [
+            f"{kind}: {', '.join(indexes)}"
+            for kind, indexes in drift.items()
+            if indexes
+        ]
+        print(f"  {collection}: {'; '.join(problems) if problems else 'ok'}")
+        missing = missing or bool(drift["missing"])
+    
+    return missing
+
+
+async def backfill_updated_at(model) -> int:
+    """Give documents written before updated_at existed their created_at, or now if they have neither."""
+    result = await model.get_motor_collection().update_many(
+        {"updated_at": {"$exists": False}},
+        [{"$set": {"updated_at": {"$ifNull": ["$created_at", "$$NOW"]}}}]
+    )
+    return result.modified_count
+
+
+async def migrate() -> int:
+    """Create every declared index and backfill new fields, then report indexes that differ from the models."""
+    await init_db(create_indexes=True)
+    for model in (Product, Order):
+        print(f"Backfilled updated_at on {await backfill_updated_at(model)} {model.get_collection_name()}")
+    print("Index drift after migration:")
+    print_drift(await check_indexes())
+    return 0
+
+
+async def seed() -> int:
+    """Seed sample products without touching indexes."""
+    await init_db(create_indexes=False)
+    await seed_database()
+    return 0
+
+
+async def verify() -> int:
+    """Check that every declared index exists."""
+    await init_db(create_indexes=False)
+    print("Index drift:")
+    return 1 if print_drift(await check_indexes()) else 0
+
+
+COMMANDS = {
+    "migrate": migrate,
+    "seed": seed,
+    "verify": verify
+}
+
+
+async def main(command: str) -> int:
+    try:
+        return await COMMANDS[command]()
+    finally:
+        close_db()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Database management commands")
+    parser.add_argument("command", choices=COMMANDS)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    
+    sys.exit(asyncio.run(main(args.command)))
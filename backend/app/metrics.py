@@ -0,0 +1,164 @@
+"""In-process metrics for the API worker."""
+import threading
+from bisect import bisect_left
+from typing import Dict, List, Tuple
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _label_key(labels: Dict[str, str]) -> LabelKey:
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(key: LabelKey, **extra: str) -> str:
+    """Render a label set in Prometheus text format, e.g. {route="/x",le="0.1"}."""
+    pairs = [f'{name}="{_escape(value)}"' for name, value in key + tuple(extra.items())]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Metric:
+    """
+    Base class for a named metric with optional labels.
+    Updates may come from driver threads as well as the event loop.
+    """
+    
+    kind = "untyped"
+    
+    def __init__(self, name: str, description: str):
+        self.name = name
+        self.description = description
+        registry.register(self)
+    
+    def snapshot(self) -> Dict[str, object]:
+        raise NotImplementedError
+    
+    def samples(self) -> List[str]:
+        """Sample lines in Prometheus text format."""
+        raise NotImplementedError
+    
+    def render(self) -> List[str]:
+        return [
+            f"# HELP {self.name} {self.description}",
+            f"# TYPE {self.name} {self.kind}",
+            *self.samples()
+        ]
+
+
+class Counter(Metric):
+    """A monotonically increasing count."""
+    
+    kind = "counter"
+    
+    def __init__(self, name: str, description: str):
+        super().__init__(name, description)
+        self.values: Dict[LabelKey, float] = {}
+        self._lock = threading.Lock()
+    
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            self.values[key] = self.values.get(key, 0) + amount
+    
+    def snapshot(self) -> Dict[str, object]:
+        return {
+            ",".join(f"{name}={value}" for name, value in key) or "total": value
+            for key, value in self.values.items()
+        }
+    
+    def samples(self) -> List[str]:
+        return [f"{self.name}{_format_labels(key)} {value}" for key, value in list(self.values.items())]
+
+
+class Gauge(Counter):
+    """A value that can go up and down."""
+    
+    kind = "gauge"
+    
+    def set(self, value: float, **labels: str) -> None:
+        self.values[_label_key(labels)] = value
+    
+    def dec(self, amount: float = 1, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+
+class Histogram(Metric):
+    """Observations counted into buckets, with their sum and count."""
+    
+    kind = "histogram"
+    
+    def __init__(self, name: str, description: str, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        super().__init__(name, description)
+        self.buckets = buckets
+        self.series: Dict[LabelKey, List[float]] = {}
+        self._lock = threading.Lock()
+    
+    def observe(self, value: float, **labels: str) -> None:
+        # Per series: one count per bucket, then +Inf, then the sum
+        with self._lock:
+            series = self.series.setdefault(_label_key(labels), [0] * (len(self.buckets) + 2))
+            series[bisect_left(self.buckets, value)] += 1
+            series[-1] += value
+    
+    def snapshot(self) -> Dict[str, object]:
+        result = {}
+        for key, series in self.series.items():
+            count = sum(series[:-1])
+            result[",".join(f"{name}={value}" for name, value in key) or "total"] = {
+                "count": count,
+                "sum": series[-1],
+                "mean": series[-1] / count if count else 0.0
+            }
+        return result
+    
+    def samples(self) -> List[str]:
+        lines = []
+        with self._lock:
+            series_items = [(key, list(series)) for key, series in self.series.items()]
+        
+        for key, series in series_items:
+            # Prometheus buckets are cumulative, the stored counts are per bucket
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{_format_labels(key, le=str(bound))} {cumulative}")
+            cumulative += series[-2]
+            lines.append(f"{self.name}_bucket{_format_labels(key, le='+Inf')} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(key)} {series[-1]}")
+            lines.append(f"{self.name}_count{_format_labels(key)} {cumulative}")
+        return lines
+
+
+class Registry:
+    """Holds every metric created in this process."""
+    
+    def __init__(self):
+        self.metrics: Dict[str, Metric] = {}
+    
+    def register(self, metric: Metric) -> None:
+        if metric.name in self.metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self.metrics[metric.name] = metric
+    
+    def snapshot(self, prefix: str = "") -> Dict[str, Dict[str, object]]:
+        """Current values of every metric whose name starts with prefix."""
+        return {
+            name: metric.snapshot()
+            for name, metric in self.metrics.items()
+            if name.startswith(prefix)
+        }
+    
+    def render(self) -> str:
+        """Every metric in the Prometheus text exposition format."""
+        lines = []
+        for metric in list(self.metrics.values()):
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
@@ -0,0 +1,220 @@
+"""ASGI middleware for request instrumentation."""
+import asyncio
+import logging
+import threading
+import time
+import uuid
+
+from fastapi import HTTPException
+from starlette.requests import Request
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import settings
+from app.logs import start_request_context
+from app.loop_watchdog import loop_watchdog
+from app.metrics import Gauge, Histogram
+from app.profiling import StackSampler
+from app.security import get_current_user
+from app.timing import start_request_timings
+
+http_request_duration_seconds = Histogram(
+    "http_request_duration_seconds",
+    "Request latency by method, route template and status code"
+)
+http_requests_in_flight = Gauge(
+    "http_requests_in_flight",
+    "Requests currently being handled, by method"
+)
+
+access_logger = logging.getLogger("app.access")
+
+# Label for paths no route matches, so scanners cannot inflate label cardinality
+UNMATCHED_ROUTE = "unmatched"
+
+
+def route_template(scope: Scope) -> str:
+    """
+    The path template of the route that handled a request, e.g.
+    /api/v1/products/{product_id}. The router stores the matched route in the
+    scope, which is cheaper than matching the path again.
+    """
+    route = scope.get("route")
+    return getattr(route, "path", UNMATCHED_ROUTE)
+
+
+class MetricsMiddleware:
+    """
+    Records latency per route template and requests in flight. A plain ASGI
+    middleware, so responses are streamed through untouched.
+    """
+    
+    def __init__(self, app: ASGIApp):
+        self.app = app
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        method = scope["method"]
+        status_code = 500
+        
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+        
+        # The route is only known once the router has matched it
+        http_requests_in_flight.inc(method=method)
+        started = time.perf_counter()
+        
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            http_request_duration_seconds.observe(
+                time.perf_counter() - started,
+                method=method,
+                route=route_template(scope),
+                status=str(status_code)
+            )
+            http_requests_in_flight.dec(method=method)
+
+
+class ServerTimingMiddleware:
+    """
+    Adds a Server-Timing header breaking the request down into Mongo, Stripe
+    and rendering time, for admin requests sent with `X-Server-Timing: 1`.
+    The breakdown reveals which queries and calls a request made, so it is
+    never sent to anyone else.
+    """
+    
+    def __init__(self, app: ASGIApp):
+        self.app = app
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or (b"x-server-timing", b"1") not in scope["headers"] or not await _is_admin(scope):
+            await self.app(scope, receive, send)
+            return
+        
+        timings = start_request_timings()
+        
+        async def send_with_timing(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                message["headers"] = [
+                    *message.get("headers", []),
+                    (b"server-timing", timings.header().encode("latin-1"))
+                ]
+            await send(message)
+        
+        await self.app(scope, receive, send_with_timing)
+
+
+async def _is_admin(scope: Scope) -> bool:
+    try:
+        user = await get_current_user(Request(scope))
+    except HTTPException:
+        return False
+    return user.is_admin
+
+
+class ProfilerMiddleware:
+    """
+    Runs admin requests sent with `X-Profile: 1` under a sampling profiler
+    and answers with the collapsed stacks instead of the normal response.
+    Other requests only pay for a header lookup.
+    """
+    
+    def __init__(self, app: ASGIApp):
+        self.app = app
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or (b"x-profile", b"1") not in scope["headers"] or not await _is_admin(scope):
+            await self.app(scope, receive, send)
+            return
+        
+        status_code = 500
+        
+        async def discard(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+        
+        sampler = StackSampler(threading.get_ident(), settings.PROFILE_SAMPLE_INTERVAL_MS / 1000)
+        sampler.start()
+        try:
+            await self.app(scope, receive, discard)
+        finally:
+            sampler.stop()
+        
+        body = sampler.folded().encode()
+        await send({
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [
+                (b"content-type", b"text/plain; charset=utf-8"),
+                (b"content-length", str(len(body)).encode()),
+                (b"x-profile-samples", str(sampler.samples).encode()),
+                (b"x-profiled-status", str(status_code).encode())
+            ]
+        })
+        await send({"type": "http.response.body", "body": body})
+
+
+def _request_id(scope: Scope) -> str:
+    """The caller's X-Request-ID if it is reasonable, otherwise a new one."""
+    for name, value in scope["headers"]:
+        if name == b"x-request-id":
+            if 0 < len(value) <= 128 and value.isascii():
+                return value.decode("ascii")
+            break
+    return uuid.uuid4().hex
+
+
+class RequestLogMiddleware:
+    """
+    Gives every request an id that is echoed in X-Request-ID and attached to
+    each record logged while handling it, then logs one access record with the
+    route, status, user and duration.
+    """
+    
+    def __init__(self, app: ASGIApp):
+        self.app = app
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        request_id = _request_id(scope)
+        start_request_context(request_id=request_id)
+        status_code = 500
+        
+        async def send_with_request_id(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                message["headers"] = [*message.get("headers", []), (b"x-request-id", request_id.encode())]
+            await send(message)
+        
+        # Lets the loop watchdog name the request that blocked the loop
+        task = asyncio.current_task() if loop_watchdog.running else None
+        if task is not None:
+            loop_watchdog.requests[task] = scope
+        
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            if task is not None:
+                loop_watchdog.requests.pop(task, None)
+            if settings.ACCESS_LOG_ENABLED:
+                access_logger.info(
+                    "%s %s %d", scope["method"], scope["path"], status_code,
+                    extra={
+                        "method": scope["method"],
+                        "route": route_template(scope),
+                        "status": status_code,
+                        "duration_ms": round((time.perf_counter() - started) * 1000, 2)
+                    }
+                )
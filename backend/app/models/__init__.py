@@ -4,5 +4,20 @@ from app.models.product import Product
 from app.models.review import Review
 from app.models.order import Order
 from app.models.cart import Cart
+from app.models.idempotency import IdempotencyRecord
+from app.models.sales_rollup import DailySalesRollup, ProductSalesRollup, CategorySalesRollup, RollupBackfillJob
+from app.models.stock_shard import StockShard
 
-__all__ = ["User", "Product", "Review", "Order", "Cart"]
+__all__ = [
+    "User",
+    "Product",
+    "Review",
+    "Order",
+    "Cart",
+    "IdempotencyRecord",
+    "DailySalesRollup",
+    "ProductSalesRollup",
+    "CategorySalesRollup",
+    "RollupBackfillJob",
+    "StockShard"
+]
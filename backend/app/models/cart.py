@@ -21,6 +21,8 @@ class Cart(Document):
     
     class Settings:
         name = "carts"
+        # Track loaded state so save_changes() only sends modified fields
+        use_state_management = True
         indexes = [
             "user_id"
         ]
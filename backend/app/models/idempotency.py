@@ -0,0 +1,42 @@
+"""Idempotency record model for safely retried write endpoints."""
+from datetime import datetime
+from typing import Any, Dict, Optional
+from beanie import Document, PydanticObjectId
+from pydantic import Field
+from pymongo import IndexModel, ASCENDING
+
+
+class IdempotencyRecord(Document):
+    """Idempotency record document model."""
+    
+    key: str  # "<user_id>:<endpoint>:<Idempotency-Key header>"
+    user_id: PydanticObjectId
+    endpoint: str
+    request_hash: str
+    status: str = Field(default="in_progress")  # in_progress, completed
+    owner: Optional[str] = None  # Token of the request executing the key, only it may complete or release it
+    response_status: Optional[int] = None
+    response_body: Optional[Dict[str, Any]] = None
+    locked_until: datetime
+    expires_at: datetime
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    
+    class Settings:
+        name = "idempotency_keys"
+        indexes = [
+            IndexModel([("key", ASCENDING)], unique=True),
+            IndexModel([("expires_at", ASCENDING)], expireAfterSeconds=0)
+        ]
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "key": "507f191e810c19729de860ea:create_order:3f1c9a52-7c1e-4b8e-9d7a-1a2b3c4d5e6f",
+                "user_id": "507f191e810c19729de860ea",
+                "endpoint": "create_order",
+                "request_hash": "9f86d081884c7d659a2feaa0c55ad015a3bf4f1b2b0b822cd15d6c15b0f00a08",
+                "status": "completed",
+                "owner": "c0b8e4a1f27d4f3a9e6b5d2c1a0f9e8d",
+                "response_status": 201
+            }
+        }
@@ -1,15 +1,17 @@
 """Order model for order management."""
 from datetime import datetime
-from typing import List
-from beanie import Document, Indexed
+from typing import List, Optional
+from beanie import Document
 from pydantic import BaseModel, Field
 from beanie import PydanticObjectId
+from pymongo import IndexModel, ASCENDING, DESCENDING
 
 
 class OrderItem(BaseModel):
     """Order item embedded model."""
     product_id: PydanticObjectId
     name: str
+    category: Optional[str] = None  # Snapshot for sales rollups
     price: float = Field(..., gt=0)
     quantity: int = Field(..., gt=0)
 
@@ -22,21 +24,38 @@ class ShippingAddress(BaseModel):
     zip_code: str = Field(..., min_length=5, max_length=10)
 
 
+class OrderSummaryView(BaseModel):
+    """Projection of an order without line items and shipping address."""
+    id: PydanticObjectId = Field(alias="_id")
+    user_id: PydanticObjectId
+    total_amount: float
+    status: str
+    stripe_payment_intent_id: str
+    created_at: datetime
+
+
 class Order(Document):
     """Order document model."""
     
-    user_id: Indexed(PydanticObjectId)  # type: ignore
+    user_id: PydanticObjectId
     items: List[OrderItem]
     total_amount: float = Field(..., gt=0)
     shipping_address: ShippingAddress
     status: str = Field(default="pending")  # pending, processing, shipped, delivered, cancelled
     stripe_payment_intent_id: str
     created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
     
     class Settings:
         name = "orders"
+        # Track loaded state so save_changes() only sends modified fields
+        use_state_management = True
+        # Compound indexes back keyset pagination on (created_at, _id)
         indexes = [
-            "user_id"
+            IndexModel([("user_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)]),
+            IndexModel([("status", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)]),
+            IndexModel([("created_at", DESCENDING), ("_id", DESCENDING)]),
+            IndexModel([("updated_at", ASCENDING)])
         ]
     
     class Config:
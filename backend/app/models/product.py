@@ -3,27 +3,40 @@ from datetime import datetime
 from typing import Optional
 from beanie import Document, Indexed
 from pydantic import Field
-from pymongo import IndexModel, TEXT
+from pymongo import IndexModel, TEXT, ASCENDING
 
+from app.read_routing import ReplicaReadable
 
-class Product(Document):
+
+class Product(ReplicaReadable, Document):
     """Product document model."""
     
+    sku: Optional[str] = None  # External catalog identifier used by bulk imports
     name: str = Field(..., min_length=1, max_length=200)
     description: str = Field(..., min_length=1)
     price: float = Field(..., gt=0)
     imageUrl: str
     category: Indexed(str)  # type: ignore
-    stock_quantity: int = Field(..., ge=0)
+    stock_quantity: int = Field(..., ge=0)  # Reconciled snapshot when stock_shards > 0
+    stock_shards: int = Field(default=0, ge=0)  # Hot product mode, stock lives in stock_shards
     avg_rating: float = Field(default=0.0, ge=0, le=5)
     review_count: int = Field(default=0, ge=0)
     created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
     
     class Settings:
         name = "products"
+        # Track loaded state so save_changes() only sends modified fields
+        use_state_management = True
         indexes = [
             IndexModel([("name", TEXT), ("description", TEXT)]),
-            "category"
+            "category",
+            IndexModel([("updated_at", ASCENDING)]),
+            IndexModel(
+                [("sku", ASCENDING)],
+                unique=True,
+                partialFilterExpression={"sku": {"$type": "string"}}
+            )
         ]
     
     class Config:
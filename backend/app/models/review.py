@@ -4,8 +4,10 @@ from beanie import Document, Indexed
 from pydantic import Field
 from beanie import PydanticObjectId
 
+from app.read_routing import ReplicaReadable
 
-class Review(Document):
+
+class Review(ReplicaReadable, Document):
     """Review document model."""
     
     product_id: Indexed(PydanticObjectId)  # type: ignore
@@ -0,0 +1,70 @@
+"""Sales rollup models for pre-aggregated analytics."""
+from datetime import datetime
+from typing import Optional
+from beanie import Document, PydanticObjectId
+from pydantic import Field
+from pymongo import IndexModel, ASCENDING
+
+
+class DailySalesRollup(Document):
+    """Daily platform-wide sales totals."""
+    
+    day: datetime  # Midnight UTC
+    revenue: float = Field(default=0.0)
+    units: int = Field(default=0)
+    orders: int = Field(default=0)
+    
+    class Settings:
+        name = "sales_daily"
+        indexes = [
+            IndexModel([("day", ASCENDING)], unique=True)
+        ]
+
+
+class ProductSalesRollup(Document):
+    """Daily sales totals per product."""
+    
+    day: datetime  # Midnight UTC
+    product_id: PydanticObjectId
+    name: str = ""
+    category: str = ""
+    revenue: float = Field(default=0.0)
+    units: int = Field(default=0)
+    
+    class Settings:
+        name = "sales_daily_products"
+        indexes = [
+            # Required by the backfill's $merge on day and product_id, and keeps
+            # concurrent $inc upserts from creating duplicate rows
+            IndexModel([("day", ASCENDING), ("product_id", ASCENDING)], unique=True)
+        ]
+
+
+class CategorySalesRollup(Document):
+    """Daily sales totals per category."""
+    
+    day: datetime  # Midnight UTC
+    category: str
+    revenue: float = Field(default=0.0)
+    units: int = Field(default=0)
+    
+    class Settings:
+        name = "sales_daily_categories"
+        indexes = [
+            IndexModel([("day", ASCENDING), ("category", ASCENDING)], unique=True)
+        ]
+
+
+class RollupBackfillJob(Document):
+    """A rollup backfill running in the background, polled by the admin who started it."""
+    
+    status: str = Field(default="running")  # running, completed, failed
+    start: Optional[datetime] = None  # None rebuilds every day before end
+    end: datetime
+    days: Optional[int] = None
+    error: Optional[str] = None
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    finished_at: Optional[datetime] = None
+    
+    class Settings:
+        name = "rollup_backfills"
@@ -0,0 +1,27 @@
+"""Stock shard model for hot products under flash-sale contention."""
+from beanie import Document, PydanticObjectId
+from pydantic import Field
+from pymongo import IndexModel, ASCENDING
+
+
+class StockShard(Document):
+    """One slice of a hot product's stock, decremented independently of the others."""
+    
+    product_id: PydanticObjectId
+    shard: int = Field(..., ge=0)
+    quantity: int = Field(default=0, ge=0)
+    
+    class Settings:
+        name = "stock_shards"
+        indexes = [
+            IndexModel([("product_id", ASCENDING), ("shard", ASCENDING)], unique=True)
+        ]
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "product_id": "507f1f77bcf86cd799439011",
+                "shard": 3,
+                "quantity": 25
+            }
+        }
@@ -0,0 +1,107 @@
+"""Per-request routing of catalog reads to replica set secondaries."""
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+from fastapi import Request, Response
+from pymongo.read_preferences import (
+    Nearest,
+    Primary,
+    PrimaryPreferred,
+    Secondary,
+    SecondaryPreferred
+)
+
+from app.config import settings
+
+READ_PREFERENCES = {
+    "primary": Primary,
+    "primaryPreferred": PrimaryPreferred,
+    "secondary": Secondary,
+    "secondaryPreferred": SecondaryPreferred,
+    "nearest": Nearest
+}
+
+READ_YOUR_WRITES_HEADER = "X-Read-Your-Writes"
+READ_YOUR_WRITES_COOKIE = "read_primary_until"
+
+# Read preference mode for routed reads in the current request, None means the collection default
+_read_preference: ContextVar[Optional[str]] = ContextVar("read_preference", default=None)
+
+
+def build_read_preference(mode: str):
+    """Build a read preference, bounded by MONGO_CATALOG_MAX_STALENESS_SECONDS off the primary."""
+    if mode == "primary":
+        return Primary()
+    if settings.MONGO_CATALOG_MAX_STALENESS_SECONDS > 0:
+        return READ_PREFERENCES[mode](max_staleness=settings.MONGO_CATALOG_MAX_STALENESS_SECONDS)
+    return READ_PREFERENCES[mode]()
+
+
+class ReplicaReadable:
+    """
+    Document mixin whose reads follow the read preference routed for the
+    current request. Writes always go to the primary whatever the preference.
+    """
+    
+    @classmethod
+    def get_motor_collection(cls):
+        collection = super().get_motor_collection()
+        mode = _read_preference.get()
+        
+        if mode is None:
+            return collection
+        
+        # Reuse one routed collection per model and mode, rebuilt if the base is replaced
+        cached = cls.__dict__.get("_routed_collections")
+        if cached is None or cached[0] is not collection:
+            cached = (collection, {})
+            setattr(cls, "_routed_collections", cached)
+        
+        routed = cached[1].get(mode)
+        if routed is None:
+            routed = collection.with_options(read_preference=build_read_preference(mode))
+            cached[1][mode] = routed
+        return routed
+
+
+def reads_own_writes(request: Request) -> bool:
+    """Whether this client asked for, or recently made, a write it must see."""
+    if request.headers.get(READ_YOUR_WRITES_HEADER, "").lower() in ("1", "true"):
+        return True
+    
+    try:
+        return float(request.cookies.get(READ_YOUR_WRITES_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+def use_read_preference(mode: Optional[str]) -> None:
+    """Route the current context's catalog reads with `mode`, None for the collection default."""
+    _read_preference.set(mode)
+
+
+async def catalog_reads(request: Request) -> None:
+    """
+    Dependency that routes the request's catalog reads to secondaries,
+    unless the client needs to read its own writes.
+    """
+    use_read_preference(None if reads_own_writes(request) else settings.MONGO_CATALOG_READ_PREFERENCE)
+
+
+async def catalog_writes(request: Request, response: Response) -> None:
+    """
+    Dependency that sends this client's catalog reads to the primary for
+    CATALOG_READ_YOUR_WRITES_SECONDS after a write, so an edit is visible
+    on the next page load even while secondaries lag.
+    """
+    if request.method in ("GET", "HEAD", "OPTIONS") or settings.CATALOG_READ_YOUR_WRITES_SECONDS <= 0:
+        return
+    
+    response.set_cookie(
+        READ_YOUR_WRITES_COOKIE,
+        str(time.time() + settings.CATALOG_READ_YOUR_WRITES_SECONDS),
+        max_age=settings.CATALOG_READ_YOUR_WRITES_SECONDS,
+        httponly=True,
+        samesite="lax"
+    )
@@ -1,17 +1,69 @@
 """Admin router for administrative functions."""
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from datetime import datetime
+from typing import List, Optional, Union
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
 from beanie import PydanticObjectId
+from pymongo.errors import DuplicateKeyError
 
 from app.models.user import User
 from app.models.product import Product
 from app.models.order import Order
-from app.schemas.product_schemas import ProductCreate, ProductUpdate, ProductPublic
-from app.schemas.order_schemas import OrderPublic, OrderItemSchema, ShippingAddressSchema
+from app.models.stock_shard import StockShard
+from app.models.sales_rollup import RollupBackfillJob
+from app.schemas.analytics_schemas import (
+    AnalyticsPublic,
+    DailySales,
+    ProductSales,
+    CategorySales,
+    RollupBackfillJobPublic
+)
+from app.schemas.product_schemas import (
+    ProductCreate,
+    ProductUpdate,
+    ProductPublic,
+    ProductImportResult,
+    ProductBulkPatch,
+    ProductBulkItemResult,
+    ProductBulkUpdateResult,
+    HotStockPublic
+)
+from app.schemas.order_schemas import (
+    ORDER_STATUS_PATTERN,
+    OrderPublic,
+    OrderSummary,
+    OrderItemSchema,
+    ShippingAddressSchema
+)
 from app.security import get_current_admin_user
+from app.cache import product_cache
+from app.admission import checkout_admission
+from app.metrics import registry
+from app.read_routing import catalog_writes
+from app.slow_queries import slow_query_log
+from app.loop_watchdog import loop_watchdog
 from app.services.order_service import get_all_orders
+from app.services.export_service import stream_orders, stream_products
+from app.services.analytics_service import get_sales_summary, create_backfill_job, run_backfill_job
+from app.services.import_service import import_products
+from app.services.product_service import bulk_update_products
+from app.services.stock_service import (
+    enable_hot_stock,
+    disable_hot_stock,
+    reconcile_hot_stock
+)
+from app.config import settings
 
-router = APIRouter(prefix="/admin", tags=["Admin"], dependencies=[Depends(get_current_admin_user)])
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv"
+}
+
+router = APIRouter(
+    prefix="/admin",
+    tags=["Admin"],
+    dependencies=[Depends(get_current_admin_user), Depends(catalog_writes)]
+)
 
 
 @router.post("/products", response_model=ProductPublic, status_code=status.HTTP_201_CREATED)
@@ -21,6 +73,7 @@ async def create_product(
 ):
     """Create a new product (admin only)."""
     product = Product(
+        sku=product_data.sku,
         name=product_data.name,
         description=product_data.description,
         price=product_data.price,
@@ -29,10 +82,17 @@ async def create_product(
         stock_quantity=product_data.stock_quantity
     )
     
-    await product.insert()
+    try:
+        await product.insert()
+    except DuplicateKeyError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="A product with this SKU already exists"
+        )
     
     return ProductPublic(
         id=str(product.id),
+        sku=product.sku,
         name=product.name,
         description=product.description,
         price=product.price,
@@ -45,6 +105,64 @@ async def create_product(
     )
 
 
+@router.post("/products:import", response_model=ProductImportResult)
+async def import_products_admin(
+    request: Request,
+    import_format: Optional[str] = Query(None, alias="format", regex="^(ndjson|csv)$"),
+    current_user: User = Depends(get_current_admin_user)
+):
+    """
+    Bulk upsert products keyed on sku from a streamed NDJSON or CSV request body (admin only).
+    
+    - **format**: ndjson or csv, defaults from the Content-Type header
+    
+    CSV uploads need a header row with the ProductCreate field names.
+    Rows that fail validation or writing are listed in the error report.
+    """
+    if import_format is None:
+        content_type = request.headers.get("content-type", "")
+        import_format = "csv" if "csv" in content_type else "ndjson"
+    
+    result = await import_products(request.stream(), import_format)
+    return ProductImportResult(**result)
+
+
+@router.patch("/products:bulk", response_model=ProductBulkUpdateResult)
+async def bulk_update_products_admin(
+    patches: List[ProductBulkPatch],
+    current_user: User = Depends(get_current_admin_user)
+):
+    """
+    Update many products in one request (admin only).
+    
+    Each entry sets any ProductUpdate fields, or adjusts stock relatively with
+    stock_delta. All entries are applied with a single unordered bulk write and
+    reported individually.
+    """
+    if len(patches) > settings.BULK_UPDATE_MAX_ITEMS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {settings.BULK_UPDATE_MAX_ITEMS} products can be updated per request"
+        )
+    
+    if len({patch.id for patch in patches}) != len(patches):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Each product id may appear only once per request"
+        )
+    
+    results = await bulk_update_products(patches)
+    product_cache.invalidate([patch.id for patch in patches])
+    
+    updated = sum(1 for result in results if result["status"] == "updated")
+    
+    return ProductBulkUpdateResult(
+        updated=updated,
+        failed=len(results) - updated,
+        results=[ProductBulkItemResult(**result) for result in results]
+    )
+
+
 @router.put("/products/{product_id}", response_model=ProductPublic)
 async def update_product(
     product_id: str,
@@ -69,13 +187,30 @@ async def update_product(
     # Update fields if provided
     update_data = product_data.model_dump(exclude_unset=True)
     
+    if product.stock_shards > 0 and "stock_quantity" in update_data:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Disable hot stock mode before setting stock_quantity directly"
+        )
+    
     for field, value in update_data.items():
         setattr(product, field, value)
     
-    await product.save()
+    product.updated_at = datetime.utcnow()
+    
+    try:
+        await product.save_changes()
+    except DuplicateKeyError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="A product with this SKU already exists"
+        )
+    
+    product_cache.invalidate([product_id])
     
     return ProductPublic(
         id=str(product.id),
+        sku=product.sku,
         name=product.name,
         description=product.description,
         price=product.price,
@@ -109,13 +244,152 @@ async def delete_product(
         )
     
     await product.delete()
+    await StockShard.find(StockShard.product_id == product.id).delete()
+    product_cache.invalidate([product_id])
     return None
 
 
-@router.get("/orders", response_model=List[OrderPublic])
-async def get_all_orders_admin(current_user: User = Depends(get_current_admin_user)):
-    """Get all orders across the platform (admin only)."""
-    orders = await get_all_orders()
+@router.post("/products/{product_id}/hot-stock", response_model=HotStockPublic)
+async def enable_hot_stock_admin(
+    product_id: str,
+    shards: int = Query(..., ge=1, le=settings.STOCK_MAX_SHARDS),
+    current_user: User = Depends(get_current_admin_user)
+):
+    """
+    Split a product's stock into shard counters (admin only).
+    Meant for drops, where every checkout would otherwise update one document.
+    """
+    try:
+        product = await Product.get(PydanticObjectId(product_id))
+    except Exception:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Product not found"
+        )
+    
+    if not product:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Product not found"
+        )
+    
+    if product.stock_shards > 0:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Hot stock mode is already enabled for this product"
+        )
+    
+    product = await enable_hot_stock(product.id, shards)
+    
+    if not product:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Hot stock mode was enabled concurrently"
+        )
+    
+    product_cache.invalidate([product_id])
+    
+    return HotStockPublic(
+        id=str(product.id),
+        stock_shards=product.stock_shards,
+        stock_quantity=await reconcile_hot_stock(product.id, product.stock_shards)
+    )
+
+
+@router.delete("/products/{product_id}/hot-stock", response_model=HotStockPublic)
+async def disable_hot_stock_admin(
+    product_id: str,
+    current_user: User = Depends(get_current_admin_user)
+):
+    """Collapse a product's stock shards back into stock_quantity (admin only)."""
+    try:
+        product = await Product.get(PydanticObjectId(product_id))
+    except Exception:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Product not found"
+        )
+    
+    if not product:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Product not found"
+        )
+    
+    if product.stock_shards == 0:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Hot stock mode is not enabled for this product"
+        )
+    
+    product = await disable_hot_stock(product.id)
+    product_cache.invalidate([product_id])
+    
+    return HotStockPublic(
+        id=str(product.id),
+        stock_shards=product.stock_shards,
+        stock_quantity=product.stock_quantity
+    )
+
+
+@router.get("/orders", response_model=Union[List[OrderPublic], List[OrderSummary]])
+async def get_all_orders_admin(
+    response: Response,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    order_status: Optional[str] = Query(None, alias="status", regex=ORDER_STATUS_PATTERN),
+    user_id: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    summary: bool = False,
+    current_user: User = Depends(get_current_admin_user)
+):
+    """
+    Get orders across the platform, newest first (admin only).
+    
+    - **limit**: Maximum number of orders to return
+    - **cursor**: Value of the X-Next-Cursor header from the previous page
+    - **status**: Filter by order status
+    - **user_id**: Filter by customer
+    - **created_from** / **created_to**: Filter by creation date range
+    - **summary**: Omit line items and shipping address
+    """
+    user_object_id = None
+    
+    if user_id:
+        try:
+            user_object_id = PydanticObjectId(user_id)
+        except Exception:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid user_id"
+            )
+    
+    orders, next_cursor = await get_all_orders(
+        user_id=user_object_id,
+        order_status=order_status,
+        created_from=created_from,
+        created_to=created_to,
+        cursor=cursor,
+        limit=limit,
+        summary=summary
+    )
+    
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    
+    if summary:
+        return [
+            OrderSummary(
+                id=str(order.id),
+                user_id=str(order.user_id),
+                total_amount=order.total_amount,
+                status=order.status,
+                stripe_payment_intent_id=order.stripe_payment_intent_id,
+                created_at=order.created_at
+            )
+            for order in orders
+        ]
     
     return [
         OrderPublic(
@@ -143,3 +417,233 @@ async def get_all_orders_admin(current_user: User = Depends(get_current_admin_us
         )
         for order in orders
     ]
+
+
+def _export_response(name: str, export_format: str, rows) -> StreamingResponse:
+    """Wrap an export row stream in a downloadable streaming response."""
+    # Clients pass this back as changed_since on their next incremental export
+    started_at = datetime.utcnow().isoformat()
+    
+    return StreamingResponse(
+        rows,
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={
+            "Content-Disposition": f'attachment; filename="{name}.{export_format}"',
+            "X-Export-Started-At": started_at
+        }
+    )
+
+
+@router.get("/export/orders")
+async def export_orders(
+    export_format: str = Query("ndjson", alias="format", regex="^(ndjson|csv)$"),
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    changed_since: Optional[datetime] = None,
+    current_user: User = Depends(get_current_admin_user)
+):
+    """
+    Stream all orders as NDJSON or CSV (admin only).
+    
+    - **format**: ndjson (full documents) or csv (one row per order)
+    - **created_from** / **created_to**: Filter by creation date range
+    - **changed_since**: Only orders updated since this time (incremental export)
+    """
+    return _export_response(
+        "orders",
+        export_format,
+        stream_orders(export_format, created_from, created_to, changed_since)
+    )
+
+
+@router.get("/export/products")
+async def export_products(
+    export_format: str = Query("ndjson", alias="format", regex="^(ndjson|csv)$"),
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    changed_since: Optional[datetime] = None,
+    current_user: User = Depends(get_current_admin_user)
+):
+    """
+    Stream the product catalog as NDJSON or CSV (admin only).
+    
+    - **format**: ndjson or csv
+    - **created_from** / **created_to**: Filter by creation date range
+    - **changed_since**: Only products updated since this time (incremental export)
+    """
+    return _export_response(
+        "products",
+        export_format,
+        stream_products(export_format, created_from, created_to, changed_since)
+    )
+
+
+@router.get("/analytics", response_model=AnalyticsPublic)
+async def get_analytics(
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    top: int = Query(10, ge=1, le=100),
+    current_user: User = Depends(get_current_admin_user)
+):
+    """
+    Get sales analytics from the daily rollups (admin only).
+    
+    - **start** / **end**: Day range, defaults to the last 30 days
+    - **top**: Number of products and categories in the top-N lists
+    """
+    summary = await get_sales_summary(start, end, top)
+    
+    return AnalyticsPublic(
+        start=summary["start"],
+        end=summary["end"],
+        total_revenue=summary["total_revenue"],
+        total_units=summary["total_units"],
+        total_orders=summary["total_orders"],
+        timeseries=[
+            DailySales(
+                day=day.day,
+                revenue=round(day.revenue, 2),
+                units=day.units,
+                orders=day.orders
+            )
+            for day in summary["timeseries"]
+        ],
+        top_products=[
+            ProductSales(
+                product_id=str(product["_id"]),
+                name=product["name"],
+                category=product["category"],
+                revenue=round(product["revenue"], 2),
+                units=product["units"]
+            )
+            for product in summary["top_products"]
+        ],
+        top_categories=[
+            CategorySales(
+                category=category["_id"],
+                revenue=round(category["revenue"], 2),
+                units=category["units"]
+            )
+            for category in summary["top_categories"]
+        ]
+    )
+
+
+def _backfill_job_public(job: RollupBackfillJob) -> RollupBackfillJobPublic:
+    return RollupBackfillJobPublic(
+        id=str(job.id),
+        status=job.status,
+        start=job.start,
+        end=job.end,
+        days=job.days,
+        error=job.error,
+        created_at=job.created_at,
+        finished_at=job.finished_at
+    )
+
+
+@router.post(
+    "/analytics/backfill",
+    response_model=RollupBackfillJobPublic,
+    status_code=status.HTTP_202_ACCEPTED
+)
+async def backfill_analytics(
+    background_tasks: BackgroundTasks,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    current_user: User = Depends(get_current_admin_user)
+):
+    """
+    Rebuild the sales rollups from the orders collection (admin only).
+    Defaults to every day before today. The rebuild runs after the response
+    is sent; poll GET /admin/analytics/backfill/{job_id} for its status.
+    """
+    job = await create_backfill_job(start, end)
+    background_tasks.add_task(run_backfill_job, job)
+    return _backfill_job_public(job)
+
+
+@router.get("/analytics/backfill/{job_id}", response_model=RollupBackfillJobPublic)
+async def get_backfill_job(
+    job_id: str,
+    current_user: User = Depends(get_current_admin_user)
+):
+    """Get the status of a rollup backfill (admin only)."""
+    try:
+        job = await RollupBackfillJob.get(PydanticObjectId(job_id))
+    except Exception:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Backfill job not found"
+        )
+    
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Backfill job not found"
+        )
+    
+    return _backfill_job_public(job)
+
+
+@router.get("/checkout-admission")
+async def get_checkout_admission(current_user: User = Depends(get_current_admin_user)):
+    """Current checkout admission state and metrics for this worker (admin only)."""
+    return {
+        "capacity": checkout_admission.capacity,
+        "max_queue": checkout_admission.max_queue,
+        "max_wait_seconds": checkout_admission.max_wait_seconds,
+        "in_flight": checkout_admission.in_flight,
+        "queue_depth": checkout_admission.queue_depth,
+        "metrics": registry.snapshot("checkout_admission")
+    }
+
+
+@router.get("/metrics")
+async def get_metrics(current_user: User = Depends(get_current_admin_user)):
+    """In-process metrics for this worker, such as pool checkout wait times (admin only)."""
+    return registry.snapshot()
+
+
+@router.get("/slow-queries")
+async def get_slow_queries(
+    limit: int = Query(20, ge=1, le=500),
+    current_user: User = Depends(get_current_admin_user)
+):
+    """
+    Slow MongoDB query shapes seen by this worker, most cumulative time first (admin only).
+    Filter values are redacted; the first occurrence of each read shape is explained.
+    """
+    return {
+        "threshold_ms": slow_query_log.threshold_ms,
+        "shapes": slow_query_log.top(limit)
+    }
+
+
+@router.delete("/slow-queries", status_code=status.HTTP_204_NO_CONTENT)
+async def clear_slow_queries(current_user: User = Depends(get_current_admin_user)):
+    """Forget the recorded slow query shapes, e.g. after adding an index (admin only)."""
+    slow_query_log.clear()
+
+
+@router.get("/loop-stalls")
+async def get_loop_stalls(
+    limit: int = Query(20, ge=1, le=200),
+    current_user: User = Depends(get_current_admin_user)
+):
+    """
+    Code that blocked this worker's event loop, grouped by route and stack,
+    most cumulative stall time first (admin only). Needs LOOP_WATCHDOG_ENABLED.
+    """
+    return {
+        "enabled": loop_watchdog.running,
+        "threshold_ms": loop_watchdog.threshold_seconds * 1000,
+        "stalls_without_stack": loop_watchdog.stalls_without_stack,
+        "offenders": loop_watchdog.top(limit)
+    }
+
+
+@router.delete("/loop-stalls", status_code=status.HTTP_204_NO_CONTENT)
+async def clear_loop_stalls(current_user: User = Depends(get_current_admin_user)):
+    """Forget the recorded loop stalls, e.g. after a fix is deployed (admin only)."""
+    loop_watchdog.clear()
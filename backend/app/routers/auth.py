@@ -1,4 +1,6 @@
 """Authentication router for user registration and login."""
+import asyncio
+
 from fastapi import APIRouter, Depends, HTTPException, status, Response
 from fastapi.security import OAuth2PasswordRequestForm
 
@@ -29,10 +31,10 @@ async def register(user_data: UserCreate):
             detail="Email already registered"
         )
     
-    # Create new user
+    # Create new user, bcrypt runs in a thread so it does not stall the event loop
     user = User(
         email=user_data.email,
-        hashed_password=hash_password(user_data.password),
+        hashed_password=await asyncio.to_thread(hash_password, user_data.password),
         first_name=user_data.first_name,
         last_name=user_data.last_name
     )
@@ -58,7 +60,8 @@ async def login(
     # Find user by email
     user = await User.find_one(User.email == form_data.username)
     
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    # bcrypt takes hundreds of milliseconds, too long to run on the event loop
+    if not user or not await asyncio.to_thread(verify_password, form_data.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
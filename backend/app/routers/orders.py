@@ -1,79 +1,195 @@
 """Orders router for checkout and order management."""
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status, Request
+import json
+from datetime import datetime
+from typing import List, Optional, Union
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, status, Request, Response
 from beanie import PydanticObjectId
 
 from app.models.user import User
 from app.models.order import Order
-from app.schemas.order_schemas import OrderCreate, OrderPublic, PaymentIntentResponse, OrderItemSchema, ShippingAddressSchema
+from app.schemas.order_schemas import (
+    ORDER_STATUS_PATTERN,
+    OrderCreate,
+    OrderPublic,
+    OrderSummary,
+    PaymentIntentResponse,
+    OrderItemSchema,
+    ShippingAddressSchema
+)
 from app.security import get_current_user
+from app.admission import checkout_admission
 from app.services.order_service import (
     create_payment_intent,
     create_order_from_cart,
     get_user_orders,
     handle_stripe_webhook
 )
+from app.services.cart_service import get_user_cart
+from app.services.idempotency_service import downstream_idempotency_key, run_idempotent, hash_request
 
 router = APIRouter(prefix="/orders", tags=["Orders"])
 
 
 @router.post("/create-payment-intent", response_model=PaymentIntentResponse)
-async def create_payment_intent_endpoint(current_user: User = Depends(get_current_user)):
+async def create_payment_intent_endpoint(
+    response: Response,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+    current_user: User = Depends(get_current_user)
+):
     """
     Create a Stripe payment intent for the current user's cart.
     Returns the client secret for the frontend to complete payment.
+    Retries sent with the same Idempotency-Key replay the original response.
     """
-    result = await create_payment_intent(current_user.id)
-    return PaymentIntentResponse(
-        clientSecret=result["clientSecret"],
-        amount=result["amount"]
+    cart = None
+    request_hash = hash_request("")
+    
+    if idempotency_key:
+        # The intent is built from the cart, so the cart is the request being retried
+        cart = await get_user_cart(current_user.id)
+        request_hash = hash_request(json.dumps([[str(item.product_id), item.quantity] for item in cart.items]))
+    
+    async def create_intent() -> dict:
+        # Admitted only once authenticated and owning the key, replays and waits take no slot
+        async with checkout_admission.admit():
+            result = await create_payment_intent(
+                current_user.id,
+                idempotency_key=(
+                    downstream_idempotency_key(current_user.id, idempotency_key, request_hash)
+                    if idempotency_key else None
+                ),
+                cart=cart
+            )
+        return PaymentIntentResponse(
+            clientSecret=result["clientSecret"],
+            amount=result["amount"]
+        ).model_dump(mode="json")
+    
+    status_code, body, replayed = await run_idempotent(
+        current_user.id,
+        "create_payment_intent",
+        idempotency_key,
+        request_hash,
+        create_intent
     )
+    
+    response.status_code = status_code
+    if replayed:
+        response.headers["Idempotent-Replayed"] = "true"
+    
+    return body
 
 
-@router.post("", response_model=OrderPublic, status_code=status.HTTP_201_CREATED)
+@router.post(
+    "",
+    response_model=OrderPublic,
+    status_code=status.HTTP_201_CREATED
+)
 async def create_order(
     order_data: OrderCreate,
+    response: Response,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
     current_user: User = Depends(get_current_user)
 ):
     """
     Create an order from the user's cart after payment confirmation.
     This should be called after the payment is successfully processed.
+    Retries sent with the same Idempotency-Key replay the original response.
     """
-    order = await create_order_from_cart(
+    async def place_order() -> dict:
+        # Admitted only once authenticated and owning the key, replays and waits take no slot
+        async with checkout_admission.admit():
+            order = await create_order_from_cart(
+                current_user.id,
+                order_data.payment_intent_id,
+                order_data.shipping_address
+            )
+        
+        return OrderPublic(
+            id=str(order.id),
+            user_id=str(order.user_id),
+            items=[
+                OrderItemSchema(
+                    product_id=str(item.product_id),
+                    name=item.name,
+                    price=item.price,
+                    quantity=item.quantity
+                )
+                for item in order.items
+            ],
+            total_amount=order.total_amount,
+            shipping_address=ShippingAddressSchema(
+                street=order.shipping_address.street,
+                city=order.shipping_address.city,
+                state=order.shipping_address.state,
+                zip_code=order.shipping_address.zip_code
+            ),
+            status=order.status,
+            stripe_payment_intent_id=order.stripe_payment_intent_id,
+            created_at=order.created_at
+        ).model_dump(mode="json")
+    
+    status_code, body, replayed = await run_idempotent(
         current_user.id,
-        order_data.payment_intent_id,
-        order_data.shipping_address
+        "create_order",
+        idempotency_key,
+        hash_request(order_data.model_dump_json()),
+        place_order,
+        success_status=status.HTTP_201_CREATED
     )
     
-    return OrderPublic(
-        id=str(order.id),
-        user_id=str(order.user_id),
-        items=[
-            OrderItemSchema(
-                product_id=str(item.product_id),
-                name=item.name,
-                price=item.price,
-                quantity=item.quantity
-            )
-            for item in order.items
-        ],
-        total_amount=order.total_amount,
-        shipping_address=ShippingAddressSchema(
-            street=order.shipping_address.street,
-            city=order.shipping_address.city,
-            state=order.shipping_address.state,
-            zip_code=order.shipping_address.zip_code
-        ),
-        status=order.status,
-        stripe_payment_intent_id=order.stripe_payment_intent_id,
-        created_at=order.created_at
-    )
+    response.status_code = status_code
+    if replayed:
+        response.headers["Idempotent-Replayed"] = "true"
+    
+    return body
 
 
-@router.get("", response_model=List[OrderPublic])
-async def get_orders(current_user: User = Depends(get_current_user)):
-    """Get all orders for the current user."""
-    orders = await get_user_orders(current_user.id)
+@router.get("", response_model=Union[List[OrderPublic], List[OrderSummary]])
+async def get_orders(
+    response: Response,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    order_status: Optional[str] = Query(None, alias="status", regex=ORDER_STATUS_PATTERN),
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    summary: bool = False,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Get the current user's orders, newest first.
+    
+    - **limit**: Maximum number of orders to return
+    - **cursor**: Value of the X-Next-Cursor header from the previous page
+    - **status**: Filter by order status
+    - **created_from** / **created_to**: Filter by creation date range
+    - **summary**: Omit line items and shipping address
+    """
+    orders, next_cursor = await get_user_orders(
+        current_user.id,
+        order_status=order_status,
+        created_from=created_from,
+        created_to=created_to,
+        cursor=cursor,
+        limit=limit,
+        summary=summary
+    )
+    
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    
+    if summary:
+        return [
+            OrderSummary(
+                id=str(order.id),
+                user_id=str(order.user_id),
+                total_amount=order.total_amount,
+                status=order.status,
+                stripe_payment_intent_id=order.stripe_payment_intent_id,
+                created_at=order.created_at
+            )
+            for order in orders
+        ]
     
     return [
         OrderPublic(
@@ -1,6 +1,6 @@
 """Products router for product catalog and reviews."""
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
 from beanie import PydanticObjectId
 
 from app.models.user import User
@@ -10,12 +10,30 @@ from app.schemas.product_schemas import ProductPublic
 from app.schemas.review_schemas import ReviewCreate, ReviewPublic
 from app.security import get_current_user
 from app.services.product_service import recalculate_product_rating
+from app.cache import product_cache
+from app.config import settings
+from app.http_cache import (
+    CATALOG_SURROGATE_KEY,
+    catalog_version,
+    etag_matches,
+    last_modified,
+    list_etag,
+    not_modified,
+    product_etag,
+    product_surrogate_keys,
+    reviews_etag,
+    set_cache_headers
+)
+from app.services.stock_service import get_sharded_stock
+from app.read_routing import catalog_reads, catalog_writes, reads_own_writes
 
 router = APIRouter(prefix="/products", tags=["Products"])
 
 
-@router.get("", response_model=List[ProductPublic])
+@router.get("", response_model=List[ProductPublic], dependencies=[Depends(catalog_reads)])
 async def get_products(
+    request: Request,
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(20, ge=1, le=100),
     category: Optional[str] = None,
@@ -31,6 +49,14 @@ async def get_products(
     - **sort**: Sort by price (price_asc or price_desc)
     - **q**: Search query (searches name and description)
     """
+    # Answer revalidations from the catalog version, before running the query
+    if settings.CATALOG_HTTP_CACHE_ENABLED:
+        version = await catalog_version(fresh=reads_own_writes(request))
+        etag = list_etag(version, skip=skip, limit=limit, category=category, sort=sort, q=q)
+        if etag_matches(request, etag):
+            return not_modified(request, etag, [CATALOG_SURROGATE_KEY])
+        set_cache_headers(request, response, etag, [CATALOG_SURROGATE_KEY])
+    
     # Build query
     query = {}
     
@@ -60,6 +86,7 @@ async def get_products(
     return [
         ProductPublic(
             id=str(product.id),
+            sku=product.sku,
             name=product.name,
             description=product.description,
             price=product.price,
@@ -74,54 +101,111 @@ async def get_products(
     ]
 
 
-@router.get("/{product_id}", response_model=ProductPublic)
-async def get_product(product_id: str):
+@router.get("/{product_id}", response_model=ProductPublic, dependencies=[Depends(catalog_reads)])
+async def get_product(product_id: str, request: Request, response: Response):
     """Get a single product by ID."""
+    # Edits only invalidate the cache of the worker that made them, so writers skip it
+    cached = None if reads_own_writes(request) else product_cache.get(product_id)
+    
+    if cached is not None:
+        updated_at, stock_shards, product_public = cached
+        # Only the catalog fields are cached, a hot product's stock is always read from its shards
+        if stock_shards > 0:
+            product_public = product_public.model_copy(
+                update={"stock_quantity": await get_sharded_stock(PydanticObjectId(product_id))}
+            )
+        
+        etag = product_etag(updated_at, product_public.stock_quantity)
+        if settings.CATALOG_HTTP_CACHE_ENABLED:
+            if etag_matches(request, etag):
+                return not_modified(request, etag, product_surrogate_keys(product_id))
+            set_cache_headers(request, response, etag, product_surrogate_keys(product_id))
+        return product_public
+    
+    # Fetched raw, so a revalidation is answered without building the document
     try:
-        product = await Product.get(PydanticObjectId(product_id))
+        document = await Product.get_motor_collection().find_one({"_id": PydanticObjectId(product_id)})
     except Exception:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Product not found"
         )
     
-    if not product:
+    if not document:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Product not found"
         )
     
-    return ProductPublic(
+    # Hot products hold their live stock in shards
+    stock_quantity = document["stock_quantity"]
+    if document.get("stock_shards", 0) > 0:
+        stock_quantity = await get_sharded_stock(document["_id"])
+    
+    updated_at = last_modified(document)
+    etag = product_etag(updated_at, stock_quantity)
+    if settings.CATALOG_HTTP_CACHE_ENABLED:
+        if etag_matches(request, etag):
+            return not_modified(request, etag, product_surrogate_keys(product_id))
+        set_cache_headers(request, response, etag, product_surrogate_keys(product_id))
+    
+    product = Product.model_validate(document)
+    product_public = ProductPublic(
         id=str(product.id),
+        sku=product.sku,
         name=product.name,
         description=product.description,
         price=product.price,
         imageUrl=product.imageUrl,
         category=product.category,
-        stock_quantity=product.stock_quantity,
+        stock_quantity=stock_quantity,
         avg_rating=product.avg_rating,
         review_count=product.review_count,
         created_at=product.created_at
     )
+    
+    product_cache.set(product_id, (updated_at, document.get("stock_shards", 0), product_public))
+    return product_public
 
 
-@router.get("/{product_id}/reviews", response_model=List[ReviewPublic])
-async def get_product_reviews(product_id: str):
+@router.get(
+    "/{product_id}/reviews",
+    response_model=List[ReviewPublic],
+    dependencies=[Depends(catalog_reads)]
+)
+async def get_product_reviews(product_id: str, request: Request, response: Response):
     """Get all reviews for a specific product."""
     try:
-        reviews = await Review.find(
-            Review.product_id == PydanticObjectId(product_id)
-        ).sort(-Review.created_at).to_list()
+        object_id = PydanticObjectId(product_id)
     except Exception:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Product not found"
         )
     
-    # Populate user names
+    if settings.CATALOG_HTTP_CACHE_ENABLED:
+        product = await Product.get_motor_collection().find_one(
+            {"_id": object_id},
+            {"updated_at": 1, "created_at": 1}
+        )
+        if product:
+            etag = reviews_etag(last_modified(product))
+            if etag_matches(request, etag):
+                return not_modified(request, etag, product_surrogate_keys(product_id))
+            set_cache_headers(request, response, etag, product_surrogate_keys(product_id))
+    
+    reviews = await Review.find(Review.product_id == object_id).sort(-Review.created_at).to_list()
+    
+    # Populate user names, fetching all authors in one query
+    author_ids = list({review.user_id for review in reviews})
+    authors = {
+        user.id: user
+        for user in await User.find({"_id": {"$in": author_ids}}).to_list()
+    } if author_ids else {}
+    
     result = []
     for review in reviews:
-        user = await User.get(review.user_id)
+        user = authors.get(review.user_id)
         user_name = f"{user.first_name} {user.last_name}" if user else "Anonymous"
         
         result.append(ReviewPublic(
@@ -137,7 +221,12 @@ async def get_product_reviews(product_id: str):
     return result
 
 
-@router.post("/{product_id}/reviews", response_model=ReviewPublic, status_code=status.HTTP_201_CREATED)
+@router.post(
+    "/{product_id}/reviews",
+    response_model=ReviewPublic,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(catalog_writes)]
+)
 async def create_review(
     product_id: str,
     review_data: ReviewCreate,
@@ -183,6 +272,7 @@ async def create_review(
     
     # Recalculate product rating
     await recalculate_product_rating(PydanticObjectId(product_id))
+    product_cache.invalidate([product_id])
     
     return ReviewPublic(
         id=str(review.id),
@@ -0,0 +1,52 @@
+"""Analytics schemas for API responses."""
+from typing import List, Optional
+from pydantic import BaseModel
+from datetime import datetime
+
+
+class DailySales(BaseModel):
+    """Schema for one day of platform-wide sales."""
+    day: datetime
+    revenue: float
+    units: int
+    orders: int
+
+
+class ProductSales(BaseModel):
+    """Schema for a product's sales over a date range."""
+    product_id: str
+    name: str
+    category: str
+    revenue: float
+    units: int
+
+
+class CategorySales(BaseModel):
+    """Schema for a category's sales over a date range."""
+    category: str
+    revenue: float
+    units: int
+
+
+class AnalyticsPublic(BaseModel):
+    """Schema for the admin analytics response."""
+    start: datetime
+    end: datetime
+    total_revenue: float
+    total_units: int
+    total_orders: int
+    timeseries: List[DailySales]
+    top_products: List[ProductSales]
+    top_categories: List[CategorySales]
+
+
+class RollupBackfillJobPublic(BaseModel):
+    """Schema for a rollup backfill job and its progress."""
+    id: str
+    status: str
+    start: Optional[datetime] = None
+    end: datetime
+    days: Optional[int] = None
+    error: Optional[str] = None
+    created_at: datetime
+    finished_at: Optional[datetime] = None
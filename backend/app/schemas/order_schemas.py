@@ -3,6 +3,8 @@ from typing import List
 from pydantic import BaseModel, Field
 from datetime import datetime
 
+ORDER_STATUS_PATTERN = "^(pending|processing|shipped|delivered|cancelled)$"
+
 
 class ShippingAddressSchema(BaseModel):
     """Schema for shipping address."""
@@ -41,6 +43,16 @@ class OrderPublic(BaseModel):
         from_attributes = True
 
 
+class OrderSummary(BaseModel):
+    """Schema for order list entries without line items and shipping address."""
+    id: str
+    user_id: str
+    total_amount: float
+    status: str
+    stripe_payment_intent_id: str
+    created_at: datetime
+
+
 class PaymentIntentResponse(BaseModel):
     """Schema for payment intent response."""
     clientSecret: str
@@ -1,11 +1,12 @@
 """Product schemas for API requests and responses."""
-from typing import Optional
-from pydantic import BaseModel, Field
+from typing import List, Optional
+from pydantic import BaseModel, Field, model_validator
 from datetime import datetime
 
 
 class ProductCreate(BaseModel):
     """Schema for creating a product."""
+    sku: Optional[str] = Field(None, min_length=1, max_length=64)
     name: str = Field(..., min_length=1, max_length=200)
     description: str = Field(..., min_length=1)
     price: float = Field(..., gt=0)
@@ -16,6 +17,7 @@ class ProductCreate(BaseModel):
 
 class ProductUpdate(BaseModel):
     """Schema for updating a product."""
+    sku: Optional[str] = Field(None, min_length=1, max_length=64)
     name: Optional[str] = Field(None, min_length=1, max_length=200)
     description: Optional[str] = Field(None, min_length=1)
     price: Optional[float] = Field(None, gt=0)
@@ -24,9 +26,53 @@ class ProductUpdate(BaseModel):
     stock_quantity: Optional[int] = Field(None, ge=0)
 
 
+class ProductBulkPatch(ProductUpdate):
+    """Schema for one entry of a bulk product update."""
+    id: str
+    stock_delta: Optional[int] = None  # Relative stock change, applied with $inc
+    
+    @model_validator(mode="after")
+    def check_stock_fields(self) -> "ProductBulkPatch":
+        if self.stock_quantity is not None and self.stock_delta is not None:
+            raise ValueError("Set either stock_quantity or stock_delta, not both")
+        return self
+
+
+class ProductBulkItemResult(BaseModel):
+    """Schema for the outcome of one bulk update entry."""
+    id: str
+    status: str  # updated, not_found, insufficient_stock, hot_stock, invalid_id, error
+    error: Optional[str] = None
+
+
+class ProductBulkUpdateResult(BaseModel):
+    """Schema for the result of a bulk product update."""
+    updated: int
+    failed: int
+    results: List[ProductBulkItemResult]
+
+
+class ProductImportError(BaseModel):
+    """Schema for a row rejected by a bulk import."""
+    row: int
+    sku: Optional[str] = None
+    error: str
+
+
+class ProductImportResult(BaseModel):
+    """Schema for the result of a bulk product import."""
+    rows: int
+    inserted: int
+    updated: int
+    failed: int
+    errors: List[ProductImportError]
+    errors_truncated: bool = False
+
+
 class ProductPublic(BaseModel):
     """Schema for public product information."""
     id: str
+    sku: Optional[str] = None
     name: str
     description: str
     price: float
@@ -39,3 +85,10 @@ class ProductPublic(BaseModel):
     
     class Config:
         from_attributes = True
+
+
+class HotStockPublic(BaseModel):
+    """Schema for a product's sharded stock state."""
+    id: str
+    stock_shards: int
+    stock_quantity: int
@@ -10,6 +10,7 @@ from beanie import PydanticObjectId
 from app.config import settings
 from app.models.user import User
 from app.schemas.user_schemas import TokenData
+from app.logs import bind_request_context
 
 # Password hashing context
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -125,6 +126,7 @@ async def get_current_user(request: Request) -> User:
     if user is None:
         raise credentials_exception
     
+    bind_request_context(user_id=str(user.id))
     return user
 
 
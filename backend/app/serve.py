@@ -0,0 +1,235 @@
+"""
+Production server entry point.
+
+The parent process imports the app once, binds the listening socket and
+forks the workers, so the imported code is shared copy-on-write. Each worker
+runs uvicorn with uvloop and httptools. SIGTERM or SIGINT drains the workers:
+they stop accepting connections, finish requests in flight (checkouts
+included) and run the app's shutdown, which closes the Motor client. Workers
+that crash are replaced. Each worker's memory is logged once it has started
+and periodically afterwards.
+
+Usage (from backend/):
+    python -m app.serve --port 8000 --workers 4
+
+Needs fork(), so Linux or macOS. The Windows launchers run the dev server.
+"""
+import argparse
+import gc
+import logging
+import os
+import signal
+import socket
+import sys
+import time
+from contextlib import suppress
+from typing import Dict, Set
+
+import uvicorn
+
+from app.config import settings
+from app.logs import JsonFormatter
+from app.main import app
+
+logger = logging.getLogger("app.serve")
+
+# Exit status of a worker whose app failed to start, as uvicorn uses
+STARTUP_FAILURE = 3
+
+
+def default_workers() -> int:
+    """One worker per CPU this process may run on, which respects container CPU sets."""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def memory_mb(pid: int) -> Dict[str, float]:
+    """
+    Resident, proportional and private memory of a process in MiB. PSS splits
+    shared pages between the processes sharing them, so summing it over the
+    workers gives their real footprint. Empty where /proc is unavailable.
+    """
+    fields: Dict[str, float] = {}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as smaps:
+            for line in smaps:
+                name, _, value = line.partition(":")
+                if value.strip().endswith("kB"):
+                    fields[name] = int(value.split()[0]) / 1024
+    except OSError:
+        return {}
+    
+    return {
+        "rss_mb": round(fields.get("Rss", 0.0), 1),
+        "pss_mb": round(fields.get("Pss", 0.0), 1),
+        "private_mb": round(fields.get("Private_Clean", 0.0) + fields.get("Private_Dirty", 0.0), 1)
+    }
+
+
+class WorkerServer(uvicorn.Server):
+    """Uvicorn server that logs the worker's memory once the app has started and reports not ready on exit."""
+    
+    async def startup(self, sockets=None) -> None:
+        await super().startup(sockets=sockets)
+        if not self.should_exit:
+            pid = os.getpid()
+            logger.info("Worker %d started", pid, extra={"pid": pid, "phase": "startup", **memory_mb(pid)})
+    
+    def handle_exit(self, sig: int, frame) -> None:
+        # /ready answers 503 while the worker drains, the app's shutdown only runs once it has
+        app.state.ready = False
+        super().handle_exit(sig, frame)
+
+
+def run_worker(sock: socket.socket, args: argparse.Namespace) -> int:
+    """Serve on the inherited socket until told to exit, returning the exit status."""
+    # The parent's handlers were inherited, uvicorn installs its own on the loop
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    # The app's lifespan routes this logger through the worker's log queue
+    logger.handlers = []
+    
+    config = uvicorn.Config(
+        app,
+        loop="uvloop",
+        http="httptools",
+        lifespan="on",
+        access_log=False,  # RequestLogMiddleware logs requests
+        timeout_keep_alive=args.keep_alive,
+        timeout_graceful_shutdown=args.graceful_timeout
+    )
+    server = WorkerServer(config)
+    server.run(sockets=[sock])
+    return 0 if server.started else STARTUP_FAILURE
+
+
+class Supervisor:
+    """Forks the workers, replaces the ones that crash and drains them on shutdown."""
+    
+    def __init__(self, sock: socket.socket, args: argparse.Namespace):
+        self.sock = sock
+        self.args = args
+        self.workers: Set[int] = set()
+        self.stopping = False
+        self.exit_status = 0
+    
+    def spawn(self) -> None:
+        pid = os.fork()
+        if pid == 0:
+            status = STARTUP_FAILURE
+            try:
+                status = run_worker(self.sock, self.args)
+            finally:
+                logging.shutdown()
+                sys.stdout.flush()
+                sys.stderr.flush()
+                os._exit(status)
+        self.workers.add(pid)
+    
+    def handle_exit(self, sig: int, frame) -> None:
+        self.stopping = True
+    
+    def reap(self) -> None:
+        while self.workers:
+            pid, status = os.waitpid(-1, os.WNOHANG)
+            if pid == 0:
+                return
+            self.workers.discard(pid)
+            code = os.waitstatus_to_exitcode(status)
+            if self.stopping:
+                continue
+            
+            if code == STARTUP_FAILURE:
+                # Another worker would fail the same way, e.g. MongoDB is unreachable
+                logger.error("Worker %d failed to start, shutting down", pid)
+                self.stopping = True
+                self.exit_status = STARTUP_FAILURE
+            else:
+                logger.warning("Worker %d exited with status %d, replacing it", pid, code)
+                self.spawn()
+    
+    def report_memory(self) -> None:
+        for pid in self.workers:
+            usage = memory_mb(pid)
+            if usage:
+                logger.info("Worker %d memory", pid, extra={"pid": pid, "phase": "steady", **usage})
+    
+    def drain(self) -> None:
+        """Stop accepting connections, then give the workers the graceful timeout to finish."""
+        # Workers close their copies of the socket, the parent's would keep accepting into the backlog
+        self.sock.close()
+        for pid in self.workers:
+            with suppress(ProcessLookupError):
+                os.kill(pid, signal.SIGTERM)
+        
+        deadline = time.monotonic() + self.args.graceful_timeout + 5
+        while self.workers and time.monotonic() < deadline:
+            self.reap()
+            time.sleep(0.1)
+        
+        for pid in self.workers:
+            logger.error("Worker %d did not drain in time, killing it", pid)
+            with suppress(ProcessLookupError):
+                os.kill(pid, signal.SIGKILL)
+    
+    def run(self) -> int:
+        signal.signal(signal.SIGTERM, self.handle_exit)
+        signal.signal(signal.SIGINT, self.handle_exit)
+        
+        for _ in range(self.args.workers):
+            self.spawn()
+        logger.info(
+            "Serving on %s:%d with %d workers", self.args.host, self.args.port, self.args.workers,
+            extra={"pid": os.getpid(), **memory_mb(os.getpid())}
+        )
+        
+        next_report = time.monotonic() + self.args.memory_report_interval
+        while not self.stopping:
+            time.sleep(0.5)
+            self.reap()
+            if self.args.memory_report_interval > 0 and time.monotonic() >= next_report:
+                self.report_memory()
+                next_report += self.args.memory_report_interval
+        
+        logger.info("Draining %d workers", len(self.workers))
+        self.drain()
+        return self.exit_status
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run the API with multiple worker processes")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=settings.SERVER_WORKERS or default_workers())
+    parser.add_argument("--backlog", type=int, default=2048)
+    parser.add_argument("--keep-alive", type=int, default=settings.SERVER_KEEP_ALIVE_SECONDS)
+    parser.add_argument("--graceful-timeout", type=int, default=settings.SERVER_GRACEFUL_TIMEOUT_SECONDS)
+    parser.add_argument(
+        "--memory-report-interval", type=float, default=settings.SERVER_MEMORY_REPORT_INTERVAL_SECONDS,
+        help="Seconds between worker memory reports, 0 disables them"
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    
+    handler = logging.StreamHandler(sys.stdout)
+    if settings.LOG_JSON:
+        handler.setFormatter(JsonFormatter())
+    else:
+        handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s %(message)s"))
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    
+    sock = uvicorn.Config(app, host=args.host, port=args.port, backlog=args.backlog).bind_socket()
+    # Objects imported so far move to a permanent generation the collector never
+    # writes to, so collections in the workers do not copy their pages
+    gc.freeze()
+    
+    return Supervisor(sock, args).run()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
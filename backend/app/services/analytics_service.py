@@ -0,0 +1,296 @@
+"""Analytics service for pre-aggregated sales rollups."""
+import asyncio
+import logging
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+from pymongo import UpdateOne
+from pymongo.errors import PyMongoError
+
+from app.models.order import Order
+from app.models.sales_rollup import DailySalesRollup, ProductSalesRollup, CategorySalesRollup, RollupBackfillJob
+
+logger = logging.getLogger(__name__)
+
+UNCATEGORIZED = "Uncategorized"
+
+
+def day_bucket(timestamp: datetime) -> datetime:
+    """Truncate a timestamp to midnight UTC."""
+    return datetime(timestamp.year, timestamp.month, timestamp.day)
+
+
+async def record_order_sales(order: Order) -> None:
+    """
+    Add an order to the daily rollups with $inc upserts.
+    Rollups count gross bookings at order creation; a failure here is logged
+    rather than failing checkout, and backfill_rollups can repair the day.
+    """
+    day = day_bucket(order.created_at)
+    product_totals: Dict[Tuple, List[float]] = defaultdict(lambda: [0.0, 0])
+    category_totals: Dict[str, List[float]] = defaultdict(lambda: [0.0, 0])
+    units = 0
+    
+    for item in order.items:
+        revenue = item.price * item.quantity
+        category = item.category or UNCATEGORIZED
+        
+        product_totals[(item.product_id, item.name, category)][0] += revenue
+        product_totals[(item.product_id, item.name, category)][1] += item.quantity
+        category_totals[category][0] += revenue
+        category_totals[category][1] += item.quantity
+        units += item.quantity
+    
+    try:
+        await DailySalesRollup.get_motor_collection().update_one(
+            {"day": day},
+            {"$inc": {"revenue": order.total_amount, "units": units, "orders": 1}},
+            upsert=True
+        )
+        
+        await ProductSalesRollup.get_motor_collection().bulk_write([
+            UpdateOne(
+                {"day": day, "product_id": product_id},
+                {
+                    "$inc": {"revenue": revenue, "units": quantity},
+                    "$set": {"name": name, "category": category}
+                },
+                upsert=True
+            )
+            for (product_id, name, category), (revenue, quantity) in product_totals.items()
+        ], ordered=False)
+        
+        await CategorySalesRollup.get_motor_collection().bulk_write([
+            UpdateOne(
+                {"day": day, "category": category},
+                {"$inc": {"revenue": revenue, "units": quantity}},
+                upsert=True
+            )
+            for category, (revenue, quantity) in category_totals.items()
+        ], ordered=False)
+    except PyMongoError as e:
+        logger.error("Failed to update sales rollups for order %s: %s", order.id, e)
+
+
+async def backfill_rollups(
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None
+) -> dict:
+    """
+    Rebuild the daily rollups for [start, end) from the orders collection with
+    $group/$merge. Defaults to everything before today, because days that are
+    still receiving orders would race with the live $inc updates. The range
+    is cleared first, so days and products that no longer have orders do not
+    keep their old totals.
+    """
+    end = day_bucket(end) if end else day_bucket(datetime.utcnow())
+    match: dict = {"created_at": {"$lt": end}}
+    
+    if start:
+        match["created_at"]["$gte"] = day_bucket(start)
+    
+    day_expression = {"$dateTrunc": {"date": "$created_at", "unit": "day"}}
+    orders = Order.get_motor_collection()
+    
+    # Rollup days are midnight UTC, so the order range selects the same days
+    for rollup in (DailySalesRollup, ProductSalesRollup, CategorySalesRollup):
+        await rollup.get_motor_collection().delete_many({"day": match["created_at"]})
+    
+    # Daily totals
+    await orders.aggregate([
+        {"$match": match},
+        {"$group": {
+            "_id": day_expression,
+            "revenue": {"$sum": "$total_amount"},
+            "units": {"$sum": {"$sum": "$items.quantity"}},
+            "orders": {"$sum": 1}
+        }},
+        {"$project": {"_id": 0, "day": "$_id", "revenue": 1, "units": 1, "orders": 1}},
+        {"$merge": {
+            "into": DailySalesRollup.get_collection_name(),
+            "on": "day",
+            "whenMatched": "replace",
+            "whenNotMatched": "insert"
+        }}
+    ]).to_list(length=None)
+    
+    # Line items, with the category looked up for orders placed before it was snapshotted
+    line_items = [
+        {"$match": match},
+        {"$unwind": "$items"},
+        {"$lookup": {
+            "from": "products",
+            "localField": "items.product_id",
+            "foreignField": "_id",
+            "pipeline": [{"$project": {"category": 1}}],
+            "as": "product"
+        }},
+        {"$set": {
+            "day": day_expression,
+            "category": {"$ifNull": [
+                "$items.category",
+                {"$ifNull": [{"$first": "$product.category"}, UNCATEGORIZED]}
+            ]},
+            "revenue": {"$multiply": ["$items.price", "$items.quantity"]}
+        }}
+    ]
+    
+    await orders.aggregate(line_items + [
+        {"$group": {
+            "_id": {"day": "$day", "product_id": "$items.product_id"},
+            "name": {"$last": "$items.name"},
+            "category": {"$last": "$category"},
+            "revenue": {"$sum": "$revenue"},
+            "units": {"$sum": "$items.quantity"}
+        }},
+        {"$project": {
+            "_id": 0,
+            "day": "$_id.day",
+            "product_id": "$_id.product_id",
+            "name": 1,
+            "category": 1,
+            "revenue": 1,
+            "units": 1
+        }},
+        {"$merge": {
+            "into": ProductSalesRollup.get_collection_name(),
+            "on": ["day", "product_id"],
+            "whenMatched": "replace",
+            "whenNotMatched": "insert"
+        }}
+    ]).to_list(length=None)
+    
+    await orders.aggregate(line_items + [
+        {"$group": {
+            "_id": {"day": "$day", "category": "$category"},
+            "revenue": {"$sum": "$revenue"},
+            "units": {"$sum": "$items.quantity"}
+        }},
+        {"$project": {
+            "_id": 0,
+            "day": "$_id.day",
+            "category": "$_id.category",
+            "revenue": 1,
+            "units": 1
+        }},
+        {"$merge": {
+            "into": CategorySalesRollup.get_collection_name(),
+            "on": ["day", "category"],
+            "whenMatched": "replace",
+            "whenNotMatched": "insert"
+        }}
+    ]).to_list(length=None)
+    
+    return {
+        "start": match["created_at"].get("$gte"),
+        "end": end,
+        "days": await DailySalesRollup.find({"day": match["created_at"]}).count()
+    }
+
+
+async def create_backfill_job(start: Optional[datetime], end: Optional[datetime]) -> RollupBackfillJob:
+    """Record a backfill of [start, end) with the same defaults as backfill_rollups."""
+    job = RollupBackfillJob(
+        start=day_bucket(start) if start else None,
+        end=day_bucket(end) if end else day_bucket(datetime.utcnow())
+    )
+    await job.insert()
+    return job
+
+
+async def run_backfill_job(job: RollupBackfillJob) -> None:
+    """Run a recorded backfill and store its outcome, meant to run after the response is sent."""
+    update: dict = {}
+    
+    try:
+        result = await backfill_rollups(job.start, job.end)
+        update = {"status": "completed", "days": result["days"]}
+    except asyncio.CancelledError:
+        # The worker is shutting down, the range is left partly rebuilt until the next run
+        update = {"status": "failed", "error": "Interrupted by shutdown"}
+        raise
+    except Exception as e:
+        logger.exception("Rollup backfill %s failed", job.id)
+        update = {"status": "failed", "error": str(e) or type(e).__name__}
+    finally:
+        update["finished_at"] = datetime.utcnow()
+        await RollupBackfillJob.get_motor_collection().update_one({"_id": job.id}, {"$set": update})
+
+
+def _day_range(start: Optional[datetime], end: Optional[datetime]) -> dict:
+    """Build a day filter for [start, end), defaulting to the last 30 days."""
+    end = day_bucket(end) if end else day_bucket(datetime.utcnow()) + timedelta(days=1)
+    start = day_bucket(start) if start else end - timedelta(days=30)
+    return {"day": {"$gte": start, "$lt": end}}
+
+
+async def get_sales_timeseries(
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None
+) -> List[DailySalesRollup]:
+    """Get daily revenue, units and order counts, oldest first."""
+    return await DailySalesRollup.find(_day_range(start, end)).sort(+DailySalesRollup.day).to_list()
+
+
+async def get_top_products(
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    limit: int = 10
+) -> List[dict]:
+    """Get the best-selling products by revenue over a date range."""
+    return await ProductSalesRollup.get_motor_collection().aggregate([
+        {"$match": _day_range(start, end)},
+        {"$group": {
+            "_id": "$product_id",
+            "name": {"$last": "$name"},
+            "category": {"$last": "$category"},
+            "revenue": {"$sum": "$revenue"},
+            "units": {"$sum": "$units"}
+        }},
+        {"$sort": {"revenue": -1}},
+        {"$limit": limit}
+    ]).to_list(length=None)
+
+
+async def get_top_categories(
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    limit: int = 10
+) -> List[dict]:
+    """Get the best-selling categories by revenue over a date range."""
+    return await CategorySalesRollup.get_motor_collection().aggregate([
+        {"$match": _day_range(start, end)},
+        {"$group": {
+            "_id": "$category",
+            "revenue": {"$sum": "$revenue"},
+            "units": {"$sum": "$units"}
+        }},
+        {"$sort": {"revenue": -1}},
+        {"$limit": limit}
+    ]).to_list(length=None)
+
+
+async def get_sales_summary(
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    top: int = 10
+) -> dict:
+    """
+    Get totals, the daily time series and top-N lists for a date range.
+    Everything is read from the rollups, so the cost does not grow with order history.
+    """
+    day_range = _day_range(start, end)["day"]
+    timeseries = await get_sales_timeseries(day_range["$gte"], day_range["$lt"])
+    top_products = await get_top_products(day_range["$gte"], day_range["$lt"], top)
+    top_categories = await get_top_categories(day_range["$gte"], day_range["$lt"], top)
+    
+    return {
+        "start": day_range["$gte"],
+        "end": day_range["$lt"],
+        "total_revenue": round(sum(day.revenue for day in timeseries), 2),
+        "total_units": sum(day.units for day in timeseries),
+        "total_orders": sum(day.orders for day in timeseries),
+        "timeseries": timeseries,
+        "top_products": top_products,
+        "top_categories": top_categories
+    }
@@ -1,6 +1,6 @@
 """Cart service for business logic."""
 from datetime import datetime
-from typing import Optional
+from typing import Dict, List, Optional
 from beanie import PydanticObjectId
 from fastapi import HTTPException, status
 
@@ -9,6 +9,17 @@ from app.models.product import Product
 from app.schemas.cart_schemas import CartItemCreate, CartPublic, CartItemPublic, ProductInCart
 
 
+async def get_products_by_id(product_ids: List[PydanticObjectId]) -> Dict[PydanticObjectId, Product]:
+    """
+    Load several products with a single query, keyed by id. Missing ids are absent.
+    """
+    if not product_ids:
+        return {}
+    
+    products = await Product.find({"_id": {"$in": list(set(product_ids))}}).to_list()
+    return {product.id: product for product in products}
+
+
 async def get_user_cart(user_id: PydanticObjectId) -> Cart:
     """
     Get the user's cart. Creates a new cart if one doesn't exist.
@@ -70,7 +81,7 @@ async def add_item_to_cart(user_id: PydanticObjectId, item: CartItemCreate) -> C
         ))
     
     cart.updated_at = datetime.utcnow()
-    await cart.save()
+    await cart.save_changes()
     
     return cart
 
@@ -111,7 +122,7 @@ async def update_cart_item(user_id: PydanticObjectId, product_id: str, quantity:
         )
     
     cart.updated_at = datetime.utcnow()
-    await cart.save()
+    await cart.save_changes()
     
     return cart
 
@@ -133,7 +144,7 @@ async def remove_item_from_cart(user_id: PydanticObjectId, product_id: str) -> C
         )
     
     cart.updated_at = datetime.utcnow()
-    await cart.save()
+    await cart.save_changes()
     
     return cart
 
@@ -144,12 +155,15 @@ async def get_populated_cart(user_id: PydanticObjectId) -> CartPublic:
     """
     cart = await get_user_cart(user_id)
     
+    # Fetch every product in one round trip instead of one per item
+    products = await get_products_by_id([item.product_id for item in cart.items])
+    
     # Populate product details for each item
     populated_items = []
     total = 0.0
     
     for cart_item in cart.items:
-        product = await Product.get(cart_item.product_id)
+        product = products.get(cart_item.product_id)
         
         if product:
             product_in_cart = ProductInCart(
@@ -184,4 +198,4 @@ async def clear_cart(user_id: PydanticObjectId) -> None:
     cart = await get_user_cart(user_id)
     cart.items = []
     cart.updated_at = datetime.utcnow()
-    await cart.save()
+    await cart.save_changes()
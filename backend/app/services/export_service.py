@@ -0,0 +1,225 @@
+"""Export service for streaming order and product dumps."""
+import csv
+import io
+import json
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional
+from bson import ObjectId
+from pymongo import ASCENDING
+
+from app.config import settings
+from app.models.order import Order
+from app.models.product import Product
+
+ORDER_CSV_COLUMNS = [
+    "id",
+    "user_id",
+    "status",
+    "total_amount",
+    "item_count",
+    "stripe_payment_intent_id",
+    "street",
+    "city",
+    "state",
+    "zip_code",
+    "created_at",
+    "updated_at"
+]
+
+PRODUCT_CSV_COLUMNS = [
+    "id",
+    "name",
+    "description",
+    "price",
+    "imageUrl",
+    "category",
+    "stock_quantity",
+    "avg_rating",
+    "review_count",
+    "created_at",
+    "updated_at"
+]
+
+# Raw-dict projections, documents are never hydrated into Beanie models
+ORDER_PROJECTION = {
+    "user_id": 1,
+    "items": 1,
+    "total_amount": 1,
+    "shipping_address": 1,
+    "status": 1,
+    "stripe_payment_intent_id": 1,
+    "created_at": 1,
+    "updated_at": 1
+}
+
+PRODUCT_PROJECTION = {column: 1 for column in PRODUCT_CSV_COLUMNS if column != "id"}
+
+
+def _json_default(value: Any) -> Any:
+    """Encode BSON values that the json module does not know about."""
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _rename_id(doc: Dict[str, Any]) -> Dict[str, Any]:
+    """Rename _id to id so exported documents match the API field names."""
+    doc["id"] = doc.pop("_id")
+    return doc
+
+
+def _order_csv_row(doc: Dict[str, Any]) -> List[Any]:
+    """Flatten an order document into a CSV row."""
+    address = doc.get("shipping_address") or {}
+    return [
+        doc["_id"],
+        doc.get("user_id"),
+        doc.get("status"),
+        doc.get("total_amount"),
+        sum(item.get("quantity", 0) for item in doc.get("items", [])),
+        doc.get("stripe_payment_intent_id"),
+        address.get("street"),
+        address.get("city"),
+        address.get("state"),
+        address.get("zip_code"),
+        doc.get("created_at").isoformat() if doc.get("created_at") else "",
+        doc.get("updated_at").isoformat() if doc.get("updated_at") else ""
+    ]
+
+
+def _product_csv_row(doc: Dict[str, Any]) -> List[Any]:
+    """Flatten a product document into a CSV row."""
+    row = [doc["_id"]]
+    for column in PRODUCT_CSV_COLUMNS[1:]:
+        value = doc.get(column)
+        row.append(value.isoformat() if isinstance(value, datetime) else value)
+    return row
+
+
+def _date_range_query(
+    field: str,
+    start: Optional[datetime],
+    end: Optional[datetime]
+) -> Dict[str, Any]:
+    """Build a half-open [start, end) range filter on a date field."""
+    if not start and not end:
+        return {}
+    
+    bounds: Dict[str, Any] = {}
+    if start:
+        bounds["$gte"] = start
+    if end:
+        bounds["$lt"] = end
+    return {field: bounds}
+
+
+def _changed_since_query(since: Optional[datetime]) -> Dict[str, Any]:
+    """
+    Match documents updated since `since`. Documents written before updated_at
+    existed match on created_at until `python -m app.manage migrate` backfills them.
+    """
+    if not since:
+        return {}
+    
+    return {"$or": [
+        {"updated_at": {"$gte": since}},
+        {"updated_at": {"$exists": False}, "created_at": {"$gte": since}}
+    ]}
+
+
+async def _stream_documents(
+    collection,
+    query: Dict[str, Any],
+    projection: Dict[str, Any],
+    sort_field: str,
+    export_format: str,
+    columns: List[str],
+    to_csv_row,
+    to_json
+) -> AsyncIterator[str]:
+    """
+    Stream documents from a Motor cursor as NDJSON or CSV chunks.
+    Rows are buffered into chunks of EXPORT_CHUNK_ROWS so memory stays flat
+    regardless of the collection size.
+    """
+    cursor = collection.find(
+        query,
+        projection,
+        batch_size=settings.EXPORT_BATCH_SIZE
+    ).sort(sort_field, ASCENDING)
+    
+    buffer = io.StringIO()
+    writer = csv.writer(buffer) if export_format == "csv" else None
+    rows = 0
+    
+    if writer:
+        writer.writerow(columns)
+    
+    async for doc in cursor:
+        if writer:
+            writer.writerow(to_csv_row(doc))
+        else:
+            buffer.write(json.dumps(to_json(doc), default=_json_default))
+            buffer.write("\n")
+        
+        rows += 1
+        if rows % settings.EXPORT_CHUNK_ROWS == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    
+    remaining = buffer.getvalue()
+    if remaining:
+        yield remaining
+
+
+def stream_orders(
+    export_format: str = "ndjson",
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    changed_since: Optional[datetime] = None
+) -> AsyncIterator[str]:
+    """
+    Stream orders as NDJSON or CSV.
+    Incremental exports (changed_since) are ordered by updated_at, full
+    exports by created_at, both served from an index.
+    """
+    query = _date_range_query("created_at", created_from, created_to)
+    query.update(_changed_since_query(changed_since))
+    
+    return _stream_documents(
+        Order.get_motor_collection(),
+        query,
+        ORDER_PROJECTION,
+        "updated_at" if changed_since else "created_at",
+        export_format,
+        ORDER_CSV_COLUMNS,
+        _order_csv_row,
+        _rename_id
+    )
+
+
+def stream_products(
+    export_format: str = "ndjson",
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    changed_since: Optional[datetime] = None
+) -> AsyncIterator[str]:
+    """
+    Stream the product catalog as NDJSON or CSV.
+    """
+    query = _date_range_query("created_at", created_from, created_to)
+    query.update(_changed_since_query(changed_since))
+    
+    return _stream_documents(
+        Product.get_motor_collection(),
+        query,
+        PRODUCT_PROJECTION,
+        "updated_at" if changed_since else "_id",
+        export_format,
+        PRODUCT_CSV_COLUMNS,
+        _product_csv_row,
+        _rename_id
+    )
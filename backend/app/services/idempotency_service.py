@@ -0,0 +1,205 @@
+"""Idempotency service for safely retried write endpoints."""
+import asyncio
+import hashlib
+import logging
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+from beanie import PydanticObjectId
+from fastapi import HTTPException, status
+from pymongo.errors import DuplicateKeyError
+
+from app.config import settings
+from app.models.idempotency import IdempotencyRecord
+
+logger = logging.getLogger(__name__)
+
+MAX_IDEMPOTENCY_KEY_LENGTH = 255
+
+# Keys currently being executed by this worker. Duplicates that land on the
+# same worker wait on the event instead of polling the collection.
+_in_flight: Dict[str, asyncio.Event] = {}
+
+
+def hash_request(payload: str) -> str:
+    """Fingerprint a request body so a reused key with a different body is rejected."""
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def downstream_idempotency_key(user_id: PydanticObjectId, idempotency_key: str, request_hash: str) -> str:
+    """
+    Key to forward to an external API such as Stripe. It includes the request
+    hash, so a retry of a failed attempt with a different request is not
+    rejected by the external API as a reuse of the key.
+    """
+    return hash_request(f"{user_id}:{idempotency_key}:{request_hash}")
+
+
+async def _wait_for_in_flight(key: str, timeout: float) -> None:
+    """Wait for an in-flight request to finish, or until the timeout elapses."""
+    event = _in_flight.get(key)
+    
+    if event is None:
+        # Owned by another worker, poll the record again after a short delay
+        await asyncio.sleep(min(timeout, settings.IDEMPOTENCY_POLL_INTERVAL_SECONDS))
+        return
+    
+    try:
+        await asyncio.wait_for(event.wait(), timeout=timeout)
+    except asyncio.TimeoutError:
+        pass
+
+
+async def _acquire(
+    key: str,
+    user_id: PydanticObjectId,
+    endpoint: str,
+    request_hash: str,
+    owner: str
+) -> Optional[IdempotencyRecord]:
+    """
+    Claim the idempotency key for this request under the owner token.
+    Returns None when the caller now owns the key and must execute the request,
+    or the completed record whose stored response should be replayed.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + settings.IDEMPOTENCY_WAIT_TIMEOUT_SECONDS
+    lock_timeout = timedelta(seconds=settings.IDEMPOTENCY_LOCK_TIMEOUT_SECONDS)
+    
+    while True:
+        now = datetime.utcnow()
+        record = IdempotencyRecord(
+            key=key,
+            user_id=user_id,
+            endpoint=endpoint,
+            request_hash=request_hash,
+            owner=owner,
+            locked_until=now + lock_timeout,
+            expires_at=now + timedelta(seconds=settings.IDEMPOTENCY_KEY_TTL_SECONDS)
+        )
+        
+        try:
+            await record.insert()
+            return None
+        except DuplicateKeyError:
+            pass
+        
+        existing = await IdempotencyRecord.find_one(IdempotencyRecord.key == key)
+        
+        if existing is None:
+            # The previous attempt failed and released the key, try to claim it again
+            continue
+        
+        if existing.request_hash != request_hash:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail="Idempotency-Key has already been used with a different request"
+            )
+        
+        if existing.status == "completed":
+            return existing
+        
+        if existing.locked_until < now:
+            # Owners renew their lock while they run, so the owner stopped renewing
+            # it and is presumed dead. Taking over replaces the owner token, which
+            # fences the old owner off in case it was only stalled.
+            taken = await IdempotencyRecord.get_motor_collection().find_one_and_update(
+                {
+                    "_id": existing.id,
+                    "status": "in_progress",
+                    "owner": existing.owner,
+                    "locked_until": existing.locked_until
+                },
+                {"$set": {"owner": owner, "locked_until": now + lock_timeout}}
+            )
+            
+            if taken:
+                return None
+            continue
+        
+        remaining = deadline - loop.time()
+        
+        if remaining <= 0:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="A request with this Idempotency-Key is still being processed",
+                headers={"Retry-After": "1"}
+            )
+        
+        await _wait_for_in_flight(key, remaining)
+
+
+async def _renew_lock(key: str, owner: str) -> None:
+    """Extend the lock while the owner is executing, until cancelled or taken over."""
+    lock_timeout = timedelta(seconds=settings.IDEMPOTENCY_LOCK_TIMEOUT_SECONDS)
+    
+    while True:
+        await asyncio.sleep(lock_timeout.total_seconds() / 3)
+        result = await IdempotencyRecord.get_motor_collection().update_one(
+            {"key": key, "owner": owner, "status": "in_progress"},
+            {"$set": {"locked_until": datetime.utcnow() + lock_timeout}}
+        )
+        if result.matched_count == 0:
+            logger.warning("Lost the lock on idempotency key %s", key)
+            return
+
+
+async def run_idempotent(
+    user_id: PydanticObjectId,
+    endpoint: str,
+    idempotency_key: Optional[str],
+    request_hash: str,
+    handler: Callable[[], Awaitable[Dict[str, Any]]],
+    success_status: int = status.HTTP_200_OK
+) -> Tuple[int, Dict[str, Any], bool]:
+    """
+    Execute a request handler at most once per idempotency key.
+    Concurrent duplicates wait for the in-flight request and completed requests
+    replay their stored response. Returns (status_code, body, replayed).
+    """
+    if not idempotency_key:
+        return success_status, await handler(), False
+    
+    if len(idempotency_key) > MAX_IDEMPOTENCY_KEY_LENGTH:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Idempotency-Key must be at most {MAX_IDEMPOTENCY_KEY_LENGTH} characters"
+        )
+    
+    key = f"{user_id}:{endpoint}:{idempotency_key}"
+    owner = uuid.uuid4().hex
+    completed = await _acquire(key, user_id, endpoint, request_hash, owner)
+    
+    if completed is not None:
+        return completed.response_status, completed.response_body, True
+    
+    event = asyncio.Event()
+    _in_flight[key] = event
+    renewal = asyncio.create_task(_renew_lock(key, owner))
+    collection = IdempotencyRecord.get_motor_collection()
+    
+    try:
+        try:
+            body = await handler()
+        except BaseException:
+            # Release the key so the client can retry a failed request
+            await collection.delete_one({"key": key, "owner": owner})
+            raise
+        finally:
+            renewal.cancel()
+        
+        # Conditional on the owner token, a request whose key was taken over does not overwrite the new owner's result
+        result = await collection.update_one(
+            {"key": key, "owner": owner},
+            {"$set": {
+                "status": "completed",
+                "response_status": success_status,
+                "response_body": body
+            }}
+        )
+        if result.matched_count == 0:
+            logger.error("Idempotency key %s was taken over while its request was executing", key)
+        return success_status, body, False
+    finally:
+        _in_flight.pop(key, None)
+        event.set()
@@ -0,0 +1,236 @@
+"""Import service for bulk product uploads."""
+import asyncio
+import codecs
+import csv
+import json
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+from pydantic import ValidationError
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+from app.cache import product_cache
+from app.config import settings
+from app.models.product import Product
+from app.schemas.product_schemas import ProductCreate
+from app.services.stock_service import NOT_SHARDED
+
+# Reported for rows that would overwrite the stock of a hot product
+HOT_STOCK_ERROR = "stock_quantity: Stock of a hot product is managed through its shards, disable hot stock mode first"
+
+
+async def _iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Decode a byte stream incrementally and yield complete lines."""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = ""
+    
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            yield line
+    
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending
+
+
+async def _iter_ndjson(lines: AsyncIterator[str]) -> AsyncIterator[Tuple[int, Any]]:
+    """Yield (row number, parsed object) pairs from NDJSON lines."""
+    row_number = 0
+    
+    async for line in lines:
+        if not line.strip():
+            continue
+        
+        row_number += 1
+        try:
+            yield row_number, json.loads(line)
+        except json.JSONDecodeError as e:
+            yield row_number, ValueError(f"Invalid JSON: {e.msg}")
+
+
+async def _iter_csv(lines: AsyncIterator[str]) -> AsyncIterator[Tuple[int, Any]]:
+    """
+    Yield (row number, dict) pairs from CSV lines, using the first row as the header.
+    Lines are joined while a quoted field is still open so values may contain newlines.
+    """
+    header: Optional[List[str]] = None
+    record = ""
+    row_number = 0
+    
+    async for line in lines:
+        record = f"{record}\n{line}" if record else line
+        
+        if record.count('"') % 2:
+            continue
+        
+        values = next(csv.reader([record.rstrip("\r")]), [])
+        record = ""
+        
+        if not any(value.strip() for value in values):
+            continue
+        
+        if header is None:
+            header = [value.strip() for value in values]
+            continue
+        
+        row_number += 1
+        if len(values) != len(header):
+            yield row_number, ValueError(f"Expected {len(header)} columns, got {len(values)}")
+            continue
+        
+        # Empty CSV cells mean "not provided"
+        yield row_number, {
+            column: value for column, value in zip(header, values) if value != ""
+        }
+
+
+class ProductImport:
+    """Accumulates upserts into bulk_write batches and builds the import report."""
+    
+    def __init__(self):
+        self.rows = 0
+        self.inserted = 0
+        self.updated = 0
+        self.failed = 0
+        self.errors: List[Dict[str, Any]] = []
+        self._batch: List[UpdateOne] = []
+        self._batch_rows: List[Tuple[int, str]] = []
+        self._pending: Optional[asyncio.Task] = None
+    
+    def add_error(self, row: int, sku: Optional[str], error: str) -> None:
+        """Record a failed row, keeping at most IMPORT_MAX_REPORTED_ERRORS details."""
+        self.failed += 1
+        if len(self.errors) < settings.IMPORT_MAX_REPORTED_ERRORS:
+            self.errors.append({"row": row, "sku": sku, "error": error})
+    
+    async def add_row(self, row: int, record: Any) -> None:
+        """Validate one row and queue its upsert."""
+        self.rows += 1
+        sku = None
+        if isinstance(record, dict) and record.get("sku") is not None:
+            sku = str(record["sku"])
+        
+        if isinstance(record, Exception):
+            self.add_error(row, None, str(record))
+            return
+        
+        if not isinstance(record, dict):
+            self.add_error(row, None, "Row must be an object")
+            return
+        
+        try:
+            product = ProductCreate.model_validate(record)
+        except ValidationError as e:
+            self.add_error(row, sku, "; ".join(
+                f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}"
+                for error in e.errors()
+            ))
+            return
+        
+        if not product.sku:
+            self.add_error(row, None, "sku: Field required for import")
+            return
+        
+        now = datetime.utcnow()
+        fields = product.model_dump(exclude={"sku"})
+        fields["updated_at"] = now
+        
+        # A hot product does not match, so its upsert fails on the sku index instead of
+        # overwriting stock the shards hold
+        self._batch.append(UpdateOne(
+            {"sku": product.sku, **NOT_SHARDED},
+            {
+                "$set": fields,
+                "$setOnInsert": {"avg_rating": 0.0, "review_count": 0, "created_at": now}
+            },
+            upsert=True
+        ))
+        self._batch_rows.append((row, product.sku))
+        
+        if len(self._batch) >= settings.IMPORT_BATCH_SIZE:
+            await self.flush()
+    
+    async def flush(self) -> None:
+        """
+        Send the current batch. One batch is written while the next is parsed,
+        so parsing and database round trips overlap.
+        """
+        if self._pending:
+            await self._pending
+            self._pending = None
+        
+        if self._batch:
+            self._pending = asyncio.create_task(self._write(self._batch, self._batch_rows))
+            self._batch = []
+            self._batch_rows = []
+    
+    async def finish(self) -> None:
+        """Write the remaining rows and wait for the last batch."""
+        await self.flush()
+        await self.flush()
+    
+    async def _write(self, operations: List[UpdateOne], rows: List[Tuple[int, str]]) -> None:
+        """Upsert one batch with an unordered bulk_write and map failures back to rows."""
+        try:
+            result = await Product.get_motor_collection().bulk_write(operations, ordered=False)
+            details = result.bulk_api_result
+        except BulkWriteError as e:
+            details = e.details
+            write_errors = details.get("writeErrors", [])
+            
+            # A duplicate sku is a hot product, or a row racing another insert of the same sku
+            duplicate_skus = [rows[error["index"]][1] for error in write_errors if error.get("code") == 11000]
+            hot_skus = set()
+            if duplicate_skus:
+                hot_skus = {
+                    doc["sku"]
+                    for doc in await Product.get_motor_collection().find(
+                        {"sku": {"$in": duplicate_skus}, "stock_shards": {"$gt": 0}},
+                        {"sku": 1}
+                    ).to_list(length=None)
+                }
+            
+            for write_error in write_errors:
+                row, sku = rows[write_error["index"]]
+                if write_error.get("code") == 11000 and sku in hot_skus:
+                    self.add_error(row, sku, HOT_STOCK_ERROR)
+                else:
+                    self.add_error(row, sku, write_error.get("errmsg", "Write failed"))
+        
+        self.inserted += details.get("nUpserted", 0)
+        self.updated += details.get("nMatched", 0)
+    
+    def report(self) -> Dict[str, Any]:
+        """Summarize the import with a per-row error report."""
+        return {
+            "rows": self.rows,
+            "inserted": self.inserted,
+            "updated": self.updated,
+            "failed": self.failed,
+            "errors": self.errors,
+            "errors_truncated": self.failed > len(self.errors)
+        }
+
+
+async def import_products(chunks: AsyncIterator[bytes], import_format: str) -> Dict[str, Any]:
+    """
+    Upsert products keyed on sku from a streamed NDJSON or CSV upload.
+    Rows are validated against ProductCreate as they arrive and written in
+    bulk_write batches; the product cache is refreshed once at the end. Rows
+    for hot products fail, since their stock lives in the shards.
+    """
+    lines = _iter_lines(chunks)
+    records = _iter_csv(lines) if import_format == "csv" else _iter_ndjson(lines)
+    product_import = ProductImport()
+    
+    try:
+        async for row, record in records:
+            await product_import.add_row(row, record)
+        await product_import.finish()
+    finally:
+        # Any rows already written must not be served stale from the cache
+        product_cache.clear()
+    
+    return product_import.report()
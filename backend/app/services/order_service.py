@@ -1,26 +1,58 @@
 """Order service for business logic."""
-from typing import Optional
+import base64
+import logging
+import time
+from datetime import datetime
+from typing import List, Optional, Tuple, Union
 from beanie import PydanticObjectId
+from bson import ObjectId
+from bson.errors import InvalidId
 from fastapi import HTTPException, status
+from pymongo import DESCENDING
 import stripe
 
+from app.cache import product_cache
 from app.config import settings
-from app.models.order import Order, OrderItem, ShippingAddress
-from app.models.product import Product
-from app.services.cart_service import get_user_cart, clear_cart
+from app.metrics import Counter, Histogram
+from app.models.cart import Cart
+from app.models.order import Order, OrderItem, OrderSummaryView, ShippingAddress
+from app.services.cart_service import get_user_cart, get_products_by_id, clear_cart
+from app.services.analytics_service import record_order_sales
+from app.services.product_service import decrease_stock
+from app.timing import record_timing
 from app.schemas.order_schemas import ShippingAddressSchema
 
+logger = logging.getLogger(__name__)
+
 # Configure Stripe
 stripe.api_key = settings.STRIPE_SECRET_KEY
+if settings.STRIPE_API_BASE:
+    stripe.api_base = settings.STRIPE_API_BASE
+
+stripe_request_duration_seconds = Histogram(
+    "stripe_request_duration_seconds",
+    "Stripe API call latency by operation"
+)
+stripe_errors = Counter(
+    "stripe_errors_total",
+    "Stripe API calls that failed, by operation and error type"
+)
 
 
-async def create_payment_intent(user_id: PydanticObjectId) -> dict:
+async def create_payment_intent(
+    user_id: PydanticObjectId,
+    idempotency_key: Optional[str] = None,
+    cart: Optional[Cart] = None
+) -> dict:
     """
-    Create a Stripe payment intent based on the user's cart.
+    Create a Stripe payment intent based on the user's cart, or the cart
+    already loaded by the caller.
     Returns the client secret for the frontend.
+    The idempotency key is forwarded to Stripe so retries never create a second intent.
     """
     # Get user's cart
-    cart = await get_user_cart(user_id)
+    if cart is None:
+        cart = await get_user_cart(user_id)
     
     if not cart.items:
         raise HTTPException(
@@ -30,9 +62,10 @@ async def create_payment_intent(user_id: PydanticObjectId) -> dict:
     
     # Calculate total amount
     total_amount = 0.0
+    products = await get_products_by_id([item.product_id for item in cart.items])
     
     for cart_item in cart.items:
-        product = await Product.get(cart_item.product_id)
+        product = products.get(cart_item.product_id)
         
         if not product:
             raise HTTPException(
@@ -40,8 +73,8 @@ async def create_payment_intent(user_id: PydanticObjectId) -> dict:
                 detail=f"Product with ID {cart_item.product_id} not found"
             )
         
-        # Check stock availability
-        if product.stock_quantity < cart_item.quantity:
+        # Check stock availability, hot products only have a reconciled snapshot
+        if product.stock_shards == 0 and product.stock_quantity < cart_item.quantity:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=f"Insufficient stock for {product.name}. Only {product.stock_quantity} available."
@@ -51,6 +84,7 @@ async def create_payment_intent(user_id: PydanticObjectId) -> dict:
     
     # Convert to cents for Stripe
     amount_in_cents = int(total_amount * 100)
+    started = time.perf_counter()
     
     try:
         # Create payment intent
@@ -59,7 +93,8 @@ async def create_payment_intent(user_id: PydanticObjectId) -> dict:
             currency="usd",
             metadata={
                 "user_id": str(user_id)
-            }
+            },
+            idempotency_key=idempotency_key
         )
         
         return {
@@ -67,10 +102,15 @@ async def create_payment_intent(user_id: PydanticObjectId) -> dict:
             "amount": total_amount
         }
     except stripe.error.StripeError as e:
+        stripe_errors.inc(operation="payment_intent.create", error=type(e).__name__)
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Stripe error: {str(e)}"
         )
+    finally:
+        elapsed = time.perf_counter() - started
+        stripe_request_duration_seconds.observe(elapsed, operation="payment_intent.create")
+        record_timing("stripe", elapsed)
 
 
 async def create_order_from_cart(
@@ -94,9 +134,10 @@ async def create_order_from_cart(
     # Prepare order items and calculate total
     order_items = []
     total_amount = 0.0
+    products = await get_products_by_id([item.product_id for item in cart.items])
     
     for cart_item in cart.items:
-        product = await Product.get(cart_item.product_id)
+        product = products.get(cart_item.product_id)
         
         if not product:
             raise HTTPException(
@@ -104,20 +145,21 @@ async def create_order_from_cart(
                 detail=f"Product with ID {cart_item.product_id} not found"
             )
         
-        # Check and decrease stock
-        if product.stock_quantity < cart_item.quantity:
+        # Check and atomically decrease stock
+        if (
+            (product.stock_shards == 0 and product.stock_quantity < cart_item.quantity)
+            or not await decrease_stock(cart_item.product_id, cart_item.quantity, product.stock_shards)
+        ):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=f"Insufficient stock for {product.name}"
             )
         
-        product.stock_quantity -= cart_item.quantity
-        await product.save()
-        
         # Create order item with snapshot of product data
         order_item = OrderItem(
             product_id=cart_item.product_id,
             name=product.name,
+            category=product.category,
             price=product.price,
             quantity=cart_item.quantity
         )
@@ -142,26 +184,142 @@ async def create_order_from_cart(
     
     await order.insert()
     
+    # Update the pre-aggregated sales rollups
+    await record_order_sales(order)
+    
+    # Stock levels changed, drop the cached product details
+    product_cache.invalidate([str(item.product_id) for item in order_items])
+    
     # Clear the cart
     await clear_cart(user_id)
     
     return order
 
 
-async def get_user_orders(user_id: PydanticObjectId) -> list[Order]:
+def encode_order_cursor(order: Union[Order, OrderSummaryView]) -> str:
+    """Encode the (created_at, _id) position of an order as an opaque cursor."""
+    raw = f"{order.created_at.isoformat()}|{order.id}"
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def decode_order_cursor(cursor: str) -> Tuple[datetime, ObjectId]:
+    """Decode a cursor produced by encode_order_cursor."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8")
+        created_at, order_id = raw.split("|", 1)
+        return datetime.fromisoformat(created_at), ObjectId(order_id)
+    except (ValueError, UnicodeError, InvalidId):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+
+async def find_orders(
+    user_id: Optional[PydanticObjectId] = None,
+    order_status: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: int = 20,
+    summary: bool = False
+) -> Tuple[List[Union[Order, OrderSummaryView]], Optional[str]]:
+    """
+    Get a page of orders, newest first, using keyset pagination on (created_at, _id).
+    Returns the page and the cursor for the next page (None on the last page).
+    Summary mode omits line items and shipping address.
+    """
+    query: dict = {}
+    
+    if user_id is not None:
+        query["user_id"] = user_id
+    
+    if order_status:
+        query["status"] = order_status
+    
+    if created_from or created_to:
+        query["created_at"] = {}
+        if created_from:
+            query["created_at"]["$gte"] = created_from
+        if created_to:
+            query["created_at"]["$lt"] = created_to
+    
+    if cursor:
+        cursor_created_at, cursor_id = decode_order_cursor(cursor)
+        query = {
+            "$and": [
+                query,
+                {
+                    "$or": [
+                        {"created_at": {"$lt": cursor_created_at}},
+                        {"created_at": cursor_created_at, "_id": {"$lt": cursor_id}}
+                    ]
+                }
+            ]
+        }
+    
+    # Fetch one extra document to know whether another page exists
+    find_query = Order.find(query).sort(
+        [("created_at", DESCENDING), ("_id", DESCENDING)]
+    ).limit(limit + 1)
+    
+    if summary:
+        find_query = find_query.project(OrderSummaryView)
+    
+    orders = await find_query.to_list()
+    
+    next_cursor = None
+    if len(orders) > limit:
+        orders = orders[:limit]
+        next_cursor = encode_order_cursor(orders[-1])
+    
+    return orders, next_cursor
+
+
+async def get_user_orders(
+    user_id: PydanticObjectId,
+    order_status: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: int = 20,
+    summary: bool = False
+) -> Tuple[List[Union[Order, OrderSummaryView]], Optional[str]]:
     """
-    Get all orders for a specific user.
+    Get a page of orders for a specific user.
     """
-    orders = await Order.find(Order.user_id == user_id).sort(-Order.created_at).to_list()
-    return orders
+    return await find_orders(
+        user_id=user_id,
+        order_status=order_status,
+        created_from=created_from,
+        created_to=created_to,
+        cursor=cursor,
+        limit=limit,
+        summary=summary
+    )
 
 
-async def get_all_orders() -> list[Order]:
+async def get_all_orders(
+    user_id: Optional[PydanticObjectId] = None,
+    order_status: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: int = 50,
+    summary: bool = False
+) -> Tuple[List[Union[Order, OrderSummaryView]], Optional[str]]:
     """
-    Get all orders (admin function).
+    Get a page of orders across all users (admin function).
     """
-    orders = await Order.find_all().sort(-Order.created_at).to_list()
-    return orders
+    return await find_orders(
+        user_id=user_id,
+        order_status=order_status,
+        created_from=created_from,
+        created_to=created_to,
+        cursor=cursor,
+        limit=limit,
+        summary=summary
+    )
 
 
 async def update_order_status(order_id: PydanticObjectId, status: str) -> Optional[Order]:
@@ -174,7 +332,8 @@ async def update_order_status(order_id: PydanticObjectId, status: str) -> Option
         return None
     
     order.status = status
-    await order.save()
+    order.updated_at = datetime.utcnow()
+    await order.save_changes()
     return order
 
 
@@ -197,11 +356,11 @@ def handle_stripe_webhook(payload: bytes, signature: str) -> dict:
         payment_intent = event["data"]["object"]
         # Payment was successful
         # You could update order status here if needed
-        print(f"Payment succeeded for PaymentIntent: {payment_intent['id']}")
+        logger.info("Payment succeeded", extra={"payment_intent_id": payment_intent["id"]})
     
     elif event["type"] == "payment_intent.payment_failed":
         payment_intent = event["data"]["object"]
         # Payment failed
-        print(f"Payment failed for PaymentIntent: {payment_intent['id']}")
+        logger.warning("Payment failed", extra={"payment_intent_id": payment_intent["id"]})
     
     return {"status": "success"}
@@ -1,8 +1,16 @@
 """Product service for business logic."""
-from typing import Optional
+from datetime import datetime
+from typing import List, Optional
 from beanie import PydanticObjectId
+from beanie.operators import Inc, Set
+from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
 from app.models.product import Product
 from app.models.review import Review
+from app.schemas.product_schemas import ProductBulkPatch
+from app.services.stock_service import NOT_SHARDED, decrease_sharded_stock
 
 
 async def recalculate_product_rating(product_id: PydanticObjectId) -> None:
@@ -29,8 +37,9 @@ async def recalculate_product_rating(product_id: PydanticObjectId) -> None:
         product.avg_rating = round(total_rating / len(reviews), 2)
         product.review_count = len(reviews)
     
-    # Save the updated product
-    await product.save()
+    # Save only the changed rating fields
+    product.updated_at = datetime.utcnow()
+    await product.save_changes()
 
 
 async def get_product_by_id(product_id: str) -> Optional[Product]:
@@ -41,19 +50,128 @@ async def get_product_by_id(product_id: str) -> Optional[Product]:
         return None
 
 
-async def decrease_stock(product_id: PydanticObjectId, quantity: int) -> bool:
+async def decrease_stock(product_id: PydanticObjectId, quantity: int, stock_shards: int = 0) -> bool:
     """
     Decrease the stock quantity of a product.
+    Hot products (stock_shards > 0) take stock from their shards instead.
     Returns True if successful, False if insufficient stock.
     """
+    if stock_shards > 0:
+        return await decrease_sharded_stock(product_id, stock_shards, quantity)
+    
+    # Conditional $inc, so concurrent buyers can never take stock below zero
+    result = await Product.find_one(
+        Product.id == product_id,
+        Product.stock_quantity >= quantity,
+        NOT_SHARDED
+    ).update(
+        Inc({Product.stock_quantity: -quantity}),
+        Set({Product.updated_at: datetime.utcnow()})
+    )
+    
+    if result.modified_count == 1:
+        return True
+    
+    # The product may have switched to hot mode since it was read
     product = await Product.get(product_id)
+    if product and product.stock_shards > 0:
+        return await decrease_sharded_stock(product_id, product.stock_shards, quantity)
+    return False
+
+
+async def bulk_update_products(patches: List[ProductBulkPatch]) -> List[dict]:
+    """
+    Apply many product patches with a single unordered bulk_write.
+    stock_delta is applied with $inc and only when it cannot take stock below zero.
+    Stock changes are refused for hot products, whose stock lives in shards.
+    Returns one result per patch, in request order.
+    """
+    results: List[dict] = [{"id": patch.id, "status": "updated"} for patch in patches]
+    operations: List[UpdateOne] = []
+    operation_indexes: List[int] = []
+    product_ids: List[ObjectId] = []
+    now = datetime.utcnow()
+    # Truncated to the milliseconds MongoDB stores, so applied patches can be recognised by it
+    now = now.replace(microsecond=now.microsecond // 1000 * 1000)
     
-    if not product:
-        return False
+    for index, patch in enumerate(patches):
+        try:
+            product_id = ObjectId(patch.id)
+        except InvalidId:
+            results[index] = {"id": patch.id, "status": "invalid_id", "error": "Invalid product id"}
+            continue
+        
+        query: dict = {"_id": product_id}
+        update: dict = {
+            "$set": {
+                **patch.model_dump(exclude_unset=True, exclude={"id", "stock_delta"}),
+                "updated_at": now
+            }
+        }
+        
+        if patch.stock_delta or patch.stock_quantity is not None:
+            query.update(NOT_SHARDED)
+        
+        if patch.stock_delta:
+            update["$inc"] = {"stock_quantity": patch.stock_delta}
+            if patch.stock_delta < 0:
+                query["stock_quantity"] = {"$gte": -patch.stock_delta}
+        
+        operations.append(UpdateOne(query, update))
+        operation_indexes.append(index)
+        product_ids.append(product_id)
+    
+    if not operations:
+        return results
+    
+    failed_indexes = set()
+    
+    try:
+        result = await Product.get_motor_collection().bulk_write(operations, ordered=False)
+        matched = result.matched_count
+    except BulkWriteError as e:
+        matched = e.details.get("nMatched", 0)
+        for write_error in e.details.get("writeErrors", []):
+            index = operation_indexes[write_error["index"]]
+            failed_indexes.add(index)
+            results[index] = {
+                "id": patches[index].id,
+                "status": "error",
+                "error": write_error.get("errmsg", "Write failed")
+            }
     
-    if product.stock_quantity < quantity:
-        return False
+    if matched + len(failed_indexes) < len(operations):
+        # Some filters matched nothing. One lookup tells applied patches, which
+        # set updated_at to this call's timestamp, from missing products and
+        # stock guards.
+        existing = {
+            doc["_id"]: doc
+            for doc in await Product.get_motor_collection().find(
+                {"_id": {"$in": product_ids}},
+                {"_id": 1, "stock_shards": 1, "updated_at": 1}
+            ).to_list(length=None)
+        }
+        
+        for index, product_id in zip(operation_indexes, product_ids):
+            if index in failed_indexes:
+                continue
+            patch = patches[index]
+            product = existing.get(product_id)
+            if product is None:
+                results[index] = {"id": patch.id, "status": "not_found", "error": "Product not found"}
+            elif product.get("updated_at") == now:
+                continue
+            elif product.get("stock_shards", 0) > 0 and (patch.stock_delta or patch.stock_quantity is not None):
+                results[index] = {
+                    "id": patch.id,
+                    "status": "hot_stock",
+                    "error": "Stock of a hot product is managed through its shards"
+                }
+            elif patch.stock_delta is not None and patch.stock_delta < 0:
+                results[index] = {
+                    "id": patch.id,
+                    "status": "insufficient_stock",
+                    "error": "Insufficient stock for stock_delta"
+                }
     
-    product.stock_quantity -= quantity
-    await product.save()
-    return True
+    return results
@@ -0,0 +1,222 @@
+"""Stock service for sharded hot-product counters."""
+import asyncio
+import logging
+import random
+from datetime import datetime
+from typing import Dict, List, Optional
+from beanie import PydanticObjectId
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import PyMongoError
+
+from app.config import settings
+from app.models.product import Product
+from app.models.stock_shard import StockShard
+
+logger = logging.getLogger(__name__)
+
+# Matches products that are not in hot mode, including documents without the field
+NOT_SHARDED = {"stock_shards": {"$not": {"$gt": 0}}}
+
+
+def split_stock(total: int, shards: int) -> List[int]:
+    """Split a stock level into near-equal shard quantities."""
+    base, extra = divmod(total, shards)
+    return [base + (1 if shard < extra else 0) for shard in range(shards)]
+
+
+async def get_sharded_stock(product_id: PydanticObjectId) -> int:
+    """Sum the stock held across a hot product's shards."""
+    shards = await StockShard.get_motor_collection().find(
+        {"product_id": product_id},
+        {"quantity": 1}
+    ).to_list(length=None)
+    return sum(shard["quantity"] for shard in shards)
+
+
+async def decrease_sharded_stock(product_id: PydanticObjectId, shards: int, quantity: int) -> bool:
+    """
+    Take stock from a hot product without serializing on one document.
+    A random shard is tried first with a conditional $inc, then the others in
+    turn. If no single shard holds enough, the quantity is gathered across
+    shards and rolled back when the total is insufficient.
+    """
+    collection = StockShard.get_motor_collection()
+    start = random.randrange(shards)
+    
+    for offset in range(shards):
+        result = await collection.update_one(
+            {"product_id": product_id, "shard": (start + offset) % shards, "quantity": {"$gte": quantity}},
+            {"$inc": {"quantity": -quantity}}
+        )
+        if result.modified_count == 1:
+            return True
+    
+    # No single shard has enough left, gather the quantity from several
+    taken: List[tuple] = []
+    remaining = quantity
+    
+    for shard in await collection.find(
+        {"product_id": product_id, "quantity": {"$gt": 0}}
+    ).sort("quantity", -1).to_list(length=None):
+        take = min(remaining, shard["quantity"])
+        result = await collection.update_one(
+            {"_id": shard["_id"], "quantity": {"$gte": take}},
+            {"$inc": {"quantity": -take}}
+        )
+        if result.modified_count == 1:
+            taken.append((shard["_id"], take))
+            remaining -= take
+        if remaining == 0:
+            return True
+    
+    for shard_id, take in taken:
+        await collection.update_one({"_id": shard_id}, {"$inc": {"quantity": take}})
+    return False
+
+
+async def enable_hot_stock(product_id: PydanticObjectId, shards: int) -> Optional[Product]:
+    """
+    Move a product's stock into shard documents.
+    Flipping stock_shards first freezes stock_quantity, because normal decrements
+    only match products that are not sharded.
+    """
+    product = await Product.get_motor_collection().find_one_and_update(
+        {"_id": product_id, **NOT_SHARDED},
+        {"$set": {"stock_shards": shards, "updated_at": datetime.utcnow()}},
+        return_document=ReturnDocument.AFTER
+    )
+    
+    if product is None:
+        return None
+    
+    await StockShard.get_motor_collection().bulk_write([
+        UpdateOne(
+            {"product_id": product_id, "shard": shard},
+            {"$inc": {"quantity": quantity}},
+            upsert=True
+        )
+        for shard, quantity in enumerate(split_stock(product["stock_quantity"], shards))
+    ], ordered=False)
+    
+    return await Product.get(product_id)
+
+
+async def disable_hot_stock(product_id: PydanticObjectId) -> Optional[Product]:
+    """Collapse a hot product's shards back into stock_quantity."""
+    collection = StockShard.get_motor_collection()
+    total = 0
+    
+    for shard in await collection.find({"product_id": product_id}, {"_id": 1}).to_list(length=None):
+        removed = await collection.find_one_and_delete({"_id": shard["_id"]})
+        if removed:
+            total += removed["quantity"]
+    
+    await Product.get_motor_collection().update_one(
+        {"_id": product_id},
+        {"$set": {"stock_quantity": total, "stock_shards": 0, "updated_at": datetime.utcnow()}}
+    )
+    return await Product.get(product_id)
+
+
+async def _return_units(product_id: PydanticObjectId, quantity: int) -> None:
+    """
+    Put units taken off the shards during a rebalance back. They go on any
+    shard still there, or onto stock_quantity once disable_hot_stock has
+    folded the shards back in; its final update sets stock_shards and
+    stock_quantity together, so the $inc only matches after it.
+    """
+    collection = StockShard.get_motor_collection()
+    
+    for _ in range(20):
+        result = await collection.update_one({"product_id": product_id}, {"$inc": {"quantity": quantity}})
+        if result.matched_count == 1:
+            return
+        
+        result = await Product.get_motor_collection().update_one(
+            {"_id": product_id, **NOT_SHARDED},
+            {"$inc": {"stock_quantity": quantity}, "$set": {"updated_at": datetime.utcnow()}}
+        )
+        if result.matched_count == 1:
+            return
+        
+        # disable_hot_stock has deleted the shards but not yet updated the product
+        await asyncio.sleep(0.05)
+    
+    logger.error("Could not return %d stock units to product %s after rebalancing", quantity, product_id)
+
+
+async def reconcile_hot_stock(product_id: PydanticObjectId, shards: int) -> int:
+    """
+    Rebalance a hot product's shards and refresh its stock_quantity snapshot.
+    Units are first taken from over-full shards with compare-and-set updates
+    and only then added to under-full ones, so a concurrent buyer can at worst
+    see too little stock, never too much. Shards are never created here, so a
+    concurrent disable_hot_stock cannot be followed by orphan shards that a
+    later enable_hot_stock would count twice. Returns the total stock.
+    """
+    product = await Product.get_motor_collection().find_one(
+        {"_id": product_id},
+        {"stock_shards": 1, "stock_quantity": 1}
+    )
+    
+    if product is None or product.get("stock_shards", 0) != shards:
+        # Deleted, folded back or resharded since it was listed, there is nothing to rebalance
+        return product["stock_quantity"] if product else 0
+    
+    collection = StockShard.get_motor_collection()
+    current: Dict[int, int] = {shard: 0 for shard in range(shards)}
+    
+    for shard in await collection.find({"product_id": product_id}).to_list(length=None):
+        current[shard["shard"]] = shard["quantity"]
+    
+    total = sum(current.values())
+    moved = 0
+    
+    for shard, target in enumerate(split_stock(total, shards)):
+        surplus = current[shard] - target
+        if surplus > 0:
+            result = await collection.update_one(
+                {"product_id": product_id, "shard": shard, "quantity": current[shard]},
+                {"$inc": {"quantity": -surplus}}
+            )
+            if result.modified_count == 1:
+                moved += surplus
+    
+    for shard, target in enumerate(split_stock(total, shards)):
+        deficit = min(target - current[shard], moved)
+        if deficit > 0:
+            result = await collection.update_one(
+                {"product_id": product_id, "shard": shard},
+                {"$inc": {"quantity": deficit}}
+            )
+            if result.matched_count == 1:
+                moved -= deficit
+    
+    if moved:
+        # Some shards were sold from while rebalancing, or deleted by disable_hot_stock
+        await _return_units(product_id, moved)
+    
+    total = await get_sharded_stock(product_id)
+    # updated_at only moves when the snapshot does, so catalog ETags stay valid between sales
+    await Product.get_motor_collection().update_one(
+        {"_id": product_id, "stock_shards": shards, "stock_quantity": {"$ne": total}},
+        {"$set": {"stock_quantity": total, "updated_at": datetime.utcnow()}}
+    )
+    return total
+
+
+async def run_stock_reconciler() -> None:
+    """Periodically rebalance every hot product until cancelled."""
+    while True:
+        await asyncio.sleep(settings.STOCK_RECONCILE_INTERVAL_SECONDS)
+        
+        try:
+            hot_products = await Product.get_motor_collection().find(
+                {"stock_shards": {"$gt": 0}},
+                {"stock_shards": 1}
+            ).to_list(length=None)
+            
+            for product in hot_products:
+                await reconcile_hot_stock(product["_id"], product["stock_shards"])
+        except PyMongoError as e:
+            logger.error("Stock reconciliation failed: %s", e)
@@ -0,0 +1,214 @@
+"""Slow MongoDB operation log with explain capture, fed by a pymongo command listener."""
+import asyncio
+import hashlib
+import json
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from pymongo import monitoring
+
+from app.config import settings
+
+logger = logging.getLogger("app.slow_queries")
+
+# Only reads are explained, explaining a write would plan it again for nothing
+EXPLAINABLE_COMMANDS = ("find", "aggregate", "count", "distinct")
+RECORDED_COMMANDS = EXPLAINABLE_COMMANDS + ("update", "delete", "findAndModify", "getMore")
+
+# Session and cluster fields that are not part of the query
+_DRIVER_FIELDS = (
+    "lsid", "$db", "$clusterTime", "$readPreference", "readConcern", "writeConcern",
+    "txnNumber", "autocommit", "startTransaction"
+)
+
+
+def redact(value: Any) -> Any:
+    """Replace the values of a filter with "?", keeping field names and operators."""
+    if isinstance(value, dict):
+        return {key: redact(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        # $and/$or hold sub-filters, $in/$nin hold values and collapse to one placeholder
+        shapes = [redact(item) for item in value]
+        return shapes if any(isinstance(item, dict) for item in value) else ["?"]
+    return "?"
+
+
+def query_shape(command_name: str, command: Dict[str, Any]) -> Dict[str, Any]:
+    """The redacted filter, sort and pipeline of a command, identifying its query shape."""
+    shape: Dict[str, Any] = {}
+    
+    if command_name == "find":
+        shape["filter"] = redact(command.get("filter", {}))
+        if command.get("sort"):
+            shape["sort"] = dict(command["sort"])
+    elif command_name == "aggregate":
+        shape["pipeline"] = redact(command.get("pipeline", []))
+    elif command_name in ("count", "distinct"):
+        shape["filter"] = redact(command.get("query", {}))
+        if command_name == "distinct":
+            shape["key"] = command.get("key")
+    elif command_name in ("update", "delete"):
+        statements = command.get("updates" if command_name == "update" else "deletes") or [{}]
+        shape["filter"] = redact(statements[0].get("q", {}))
+    elif command_name == "findAndModify":
+        shape["filter"] = redact(command.get("query", {}))
+        if command.get("sort"):
+            shape["sort"] = dict(command["sort"])
+    
+    return shape
+
+
+def summarize_explain(explain: Dict[str, Any]) -> Dict[str, Any]:
+    """Docs and keys examined, documents returned and the winning plan's stages."""
+    stats = explain.get("executionStats", {})
+    planner = explain.get("queryPlanner", {})
+    
+    # Aggregations report the plan of their first $cursor stage
+    if not stats and explain.get("stages"):
+        cursor = explain["stages"][0].get("$cursor", {})
+        stats = cursor.get("executionStats", {})
+        planner = cursor.get("queryPlanner", {})
+    
+    stages = []
+    plan = planner.get("winningPlan", {})
+    while plan:
+        stage = plan.get("stage", "")
+        stages.append(f"{stage}({plan['indexName']})" if plan.get("indexName") else stage)
+        plan = plan.get("inputStage") or (plan.get("inputStages") or [None])[0] or plan.get("queryPlan")
+    
+    return {
+        "plan": " <- ".join(stages),
+        "docs_examined": stats.get("totalDocsExamined"),
+        "keys_examined": stats.get("totalKeysExamined"),
+        "returned": stats.get("nReturned"),
+        "execution_ms": stats.get("executionTimeMillis")
+    }
+
+
+class SlowQueryLog:
+    """
+    Slow commands aggregated by query shape. Listener callbacks arrive on
+    driver threads, so the table is guarded by a lock and explains are handed
+    to the event loop.
+    """
+    
+    def __init__(self, threshold_ms: float, max_shapes: int, explain: bool):
+        self.threshold_ms = threshold_ms
+        self.max_shapes = max_shapes
+        self.explain = explain
+        self.shapes: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._run_explain: Optional[Callable] = None
+    
+    @property
+    def enabled(self) -> bool:
+        return self.threshold_ms > 0
+    
+    def bind(self, loop: asyncio.AbstractEventLoop, run_command: Callable) -> None:
+        """Set the loop and the `run_command(database, command)` coroutine used for explains."""
+        self._loop = loop
+        self._run_explain = run_command
+    
+    def record(
+        self,
+        database: str,
+        command_name: str,
+        command: Dict[str, Any],
+        duration_ms: float
+    ) -> None:
+        collection = command.get("collection" if command_name == "getMore" else command_name)
+        shape = query_shape(command_name, command)
+        key = hashlib.sha1(
+            json.dumps([command_name, collection, shape], sort_keys=True, default=str).encode()
+        ).hexdigest()[:16]
+        
+        with self._lock:
+            entry = self.shapes.get(key)
+            first_seen = entry is None
+            
+            if first_seen:
+                if len(self.shapes) >= self.max_shapes:
+                    # Keep the shapes that cost the most
+                    cheapest = min(self.shapes, key=lambda shape_key: self.shapes[shape_key]["total_ms"])
+                    del self.shapes[cheapest]
+                entry = self.shapes[key] = {
+                    "shape_id": key,
+                    "command": command_name,
+                    "collection": collection,
+                    "shape": shape,
+                    "count": 0,
+                    "total_ms": 0.0,
+                    "max_ms": 0.0,
+                    "first_seen": time.time(),
+                    "explain": None
+                }
+            
+            entry["count"] += 1
+            entry["total_ms"] += duration_ms
+            entry["max_ms"] = max(entry["max_ms"], duration_ms)
+            entry["last_seen"] = time.time()
+        
+        logger.warning(
+            "Slow %s on %s took %.1fms, shape %s %s",
+            command_name, collection, duration_ms, key, json.dumps(shape, default=str)
+        )
+        
+        if first_seen and self.explain and command_name in EXPLAINABLE_COMMANDS and self._loop:
+            explain_command = {
+                "explain": {name: value for name, value in command.items() if name not in _DRIVER_FIELDS},
+                "verbosity": "executionStats"
+            }
+            asyncio.run_coroutine_threadsafe(self._capture_explain(key, database, explain_command), self._loop)
+    
+    async def _capture_explain(self, key: str, database: str, explain_command: Dict[str, Any]) -> None:
+        try:
+            summary = summarize_explain(await self._run_explain(database, explain_command))
+        except Exception as e:
+            summary = {"error": str(e)}
+        
+        with self._lock:
+            if key in self.shapes:
+                self.shapes[key]["explain"] = summary
+        
+        logger.warning("Explain for slow shape %s: %s", key, json.dumps(summary, default=str))
+    
+    def top(self, limit: int) -> List[Dict[str, Any]]:
+        """Shapes with the most cumulative time first."""
+        with self._lock:
+            entries = sorted(self.shapes.values(), key=lambda entry: entry["total_ms"], reverse=True)
+            return [dict(entry) for entry in entries[:limit]]
+    
+    def clear(self) -> None:
+        with self._lock:
+            self.shapes.clear()
+
+
+class SlowQueryListener(monitoring.CommandListener):
+    """Passes commands slower than the threshold to the slow query log."""
+    
+    def __init__(self, log: SlowQueryLog):
+        self.log = log
+        self._started: Dict[int, tuple] = {}
+    
+    def started(self, event):
+        if event.command_name in RECORDED_COMMANDS:
+            self._started[event.request_id] = (event.database_name, event.command)
+    
+    def succeeded(self, event):
+        started = self._started.pop(event.request_id, None)
+        duration_ms = event.duration_micros / 1000
+        if started and duration_ms >= self.log.threshold_ms:
+            self.log.record(started[0], event.command_name, started[1], duration_ms)
+    
+    def failed(self, event):
+        self._started.pop(event.request_id, None)
+
+
+slow_query_log = SlowQueryLog(
+    threshold_ms=settings.SLOW_QUERY_THRESHOLD_MS,
+    max_shapes=settings.SLOW_QUERY_MAX_SHAPES,
+    explain=settings.SLOW_QUERY_EXPLAIN
+)
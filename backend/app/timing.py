@@ -0,0 +1,90 @@
+"""Per-request time breakdowns, reported in the Server-Timing response header."""
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, Optional
+
+from fastapi.responses import JSONResponse
+from pymongo import monitoring
+
+# Header entries in this order, each with its description
+PHASES = {
+    "mongo": "MongoDB",
+    "stripe": "Stripe",
+    "render": "JSON rendering"
+}
+
+
+class RequestTimings:
+    """Accumulated seconds and call counts per phase for one request."""
+    
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.seconds: Dict[str, float] = {}
+        self.calls: Dict[str, int] = {}
+    
+    def add(self, phase: str, seconds: float) -> None:
+        self.seconds[phase] = self.seconds.get(phase, 0.0) + seconds
+        self.calls[phase] = self.calls.get(phase, 0) + 1
+    
+    def header(self) -> str:
+        """Server-Timing value, e.g. mongo;dur=4.2;desc="MongoDB x3", total;dur=9.8"""
+        entries = [
+            f'{phase};dur={self.seconds[phase] * 1000:.1f};desc="{description} x{self.calls[phase]}"'
+            for phase, description in PHASES.items()
+            if phase in self.seconds
+        ]
+        entries.append(f"total;dur={(time.perf_counter() - self.started) * 1000:.1f}")
+        return ", ".join(entries)
+
+
+# Set by ServerTimingMiddleware. Motor copies the context into its executor
+# threads, so the command listener sees the request that issued the command.
+_request_timings: ContextVar[Optional[RequestTimings]] = ContextVar("request_timings", default=None)
+
+
+def start_request_timings() -> RequestTimings:
+    timings = RequestTimings()
+    _request_timings.set(timings)
+    return timings
+
+
+def record_timing(phase: str, seconds: float) -> None:
+    """Add time to a phase of the current request; a no-op outside timed requests."""
+    timings = _request_timings.get()
+    if timings is not None:
+        timings.add(phase, seconds)
+
+
+@contextmanager
+def timed(phase: str) -> Iterator[None]:
+    if _request_timings.get() is None:
+        yield
+        return
+    
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_timing(phase, time.perf_counter() - started)
+
+
+class MongoTimingListener(monitoring.CommandListener):
+    """Adds each command's round-trip time to the current request's timings."""
+    
+    def started(self, event):
+        pass
+    
+    def succeeded(self, event):
+        record_timing("mongo", event.duration_micros / 1_000_000)
+    
+    def failed(self, event):
+        record_timing("mongo", event.duration_micros / 1_000_000)
+
+
+class TimedJSONResponse(JSONResponse):
+    """The default response class, timing how long the body takes to render."""
+    
+    def render(self, content) -> bytes:
+        with timed("render"):
+            return super().render(content)
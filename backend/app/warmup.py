@@ -0,0 +1,101 @@
+"""Warmup run in the lifespan before a worker reports itself ready."""
+import asyncio
+import logging
+import time
+
+from fastapi import FastAPI
+from fastapi.routing import APIRoute
+
+from app import db
+from app.cache import product_cache
+from app.config import settings
+from app.models.product import Product
+from app.read_routing import build_read_preference, use_read_preference
+from app.schemas.product_schemas import ProductPublic
+from app.services.stock_service import get_sharded_stock
+
+logger = logging.getLogger(__name__)
+
+
+async def open_connections(count: int) -> None:
+    """
+    Open up to `count` pooled connections to the primary, and to the servers
+    catalog reads are routed to, by running that many pings at once.
+    """
+    database = db.client.get_default_database()
+    modes = {"primary", settings.MONGO_CATALOG_READ_PREFERENCE}
+    
+    await asyncio.gather(*(
+        database.command("ping", read_preference=build_read_preference(mode))
+        for mode in modes
+        for _ in range(count)
+    ))
+
+
+def touch_response_models(app: FastAPI) -> int:
+    """Run each route's response validator once so nothing is built on a live request."""
+    touched = 0
+    
+    for route in app.routes:
+        if isinstance(route, APIRoute) and route.response_field is not None:
+            # An empty value fails validation, which still runs the whole validator
+            route.response_field.validate({}, {}, loc=("response",))
+            touched += 1
+    
+    return touched
+
+
+async def preload_hot_products(limit: int) -> int:
+    """Put the most reviewed products in the product cache, built as GET /products/{id} does."""
+    use_read_preference(settings.MONGO_CATALOG_READ_PREFERENCE)
+    products = await Product.find_all().sort(-Product.review_count).limit(limit).to_list()
+    
+    for product in products:
+        stock_quantity = product.stock_quantity
+        if product.stock_shards > 0:
+            stock_quantity = await get_sharded_stock(product.id)
+        
+        product_cache.set(str(product.id), (product.updated_at, product.stock_shards, ProductPublic(
+            id=str(product.id),
+            sku=product.sku,
+            name=product.name,
+            description=product.description,
+            price=product.price,
+            imageUrl=product.imageUrl,
+            category=product.category,
+            stock_quantity=stock_quantity,
+            avg_rating=product.avg_rating,
+            review_count=product.review_count,
+            created_at=product.created_at
+        )))
+    
+    return len(products)
+
+
+async def warm_up(app: FastAPI) -> None:
+    """Open connections, touch response models and preload hot products, logging how long each took."""
+    timings = {}
+    
+    started = time.perf_counter()
+    connections = min(settings.WARMUP_CONNECTIONS, settings.MONGO_MAX_POOL_SIZE)
+    if connections > 0:
+        await open_connections(connections)
+    timings["connections_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    
+    started = time.perf_counter()
+    models = touch_response_models(app)
+    timings["response_models_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    
+    started = time.perf_counter()
+    products = 0
+    hot_products = min(settings.WARMUP_HOT_PRODUCTS, settings.PRODUCT_CACHE_MAX_ENTRIES)
+    if product_cache.enabled and hot_products > 0:
+        # In a task of its own, so the routed read preference does not outlive the preload
+        products = await asyncio.create_task(preload_hot_products(hot_products))
+    timings["hot_products_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    
+    logger.info(
+        "Warmup opened %d connections, touched %d response models and cached %d products",
+        connections, models, products,
+        extra=timings
+    )
@@ -0,0 +1,66 @@
+"""Shared helpers for benchmarks run against a local mongod."""
+import json
+import os
+import resource
+from types import SimpleNamespace
+from typing import Any, Dict
+
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from app.config import settings
+from app.db import init_db
+
+# Benchmarks drop and recreate this database, never point it at real data
+BENCH_MONGODB_URL = os.environ.get(
+    "BENCH_MONGODB_URL",
+    "mongodb://localhost:27017/ecommerce_bench"
+)
+
+
+class FakePaymentIntents:
+    """Stands in for stripe.PaymentIntent so no request leaves the process."""
+    
+    created = 0
+    
+    @classmethod
+    def create(cls, amount: int, currency: str, **kwargs) -> SimpleNamespace:
+        cls.created += 1
+        return SimpleNamespace(
+            id=f"pi_fake_{cls.created}",
+            client_secret=f"pi_fake_{cls.created}_secret"
+        )
+
+
+async def init_bench_db(drop: bool = True) -> None:
+    """Point the app at the benchmark database and initialize Beanie."""
+    settings.MONGODB_URL = BENCH_MONGODB_URL
+    
+    if drop:
+        client = AsyncIOMotorClient(BENCH_MONGODB_URL)
+        await client.drop_database(client.get_default_database().name)
+        client.close()
+    
+    await init_db()
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process in MiB (Linux reports KiB)."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def current_rss_mb() -> float:
+    """Current resident set size of this process in MiB."""
+    with open("/proc/self/statm") as statm:
+        resident_pages = int(statm.read().split()[1])
+    return resident_pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+
+
+def report(name: str, results: Dict[str, Any], output: str = None) -> None:
+    """Print benchmark results and optionally write them to a JSON file."""
+    print(f"\n{name}")
+    for key, value in results.items():
+        print(f"  {key}: {value:.2f}" if isinstance(value, float) else f"  {key}: {value}")
+    
+    if output:
+        with open(output, "w") as f:
+            json.dump({"benchmark": name, "results": results}, f, indent=2)
@@ -0,0 +1,367 @@
+"""
+Synthetic dataset generator for load and scaling tests.
+
+Fills a database with users, products, reviews, carts and orders at
+configurable volumes. Output is deterministic for a given --seed: document
+ids, field values and Zipf-skewed product popularity are all derived from it.
+Documents are written with parallel unordered insert_many batches and the
+declared indexes are built once the data is loaded.
+
+Usage (from backend/, with a local mongod running):
+    python -m benchmarks.datagen --scale 0.01            # quick, 1% of the defaults
+    python -m benchmarks.datagen --products 1000000 --reviews 10000000 \\
+        --users 500000 --carts 100000 --orders 5000000
+"""
+import argparse
+import asyncio
+import bisect
+import itertools
+import random
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator, List
+
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from app import db
+from app.config import settings
+from app.security import hash_password
+from benchmarks.common import BENCH_MONGODB_URL, report
+
+# Fixed ObjectId timestamp so generated ids do not depend on the wall clock
+ID_TIMESTAMP = 0x60000000
+USER, PRODUCT, REVIEW, CART, ORDER = range(1, 6)
+
+# (category, share of the catalog, median price)
+CATEGORIES = [
+    ("Electronics", 0.22, 120.0),
+    ("Home & Kitchen", 0.18, 35.0),
+    ("Clothing", 0.16, 30.0),
+    ("Sports & Outdoors", 0.10, 45.0),
+    ("Books", 0.10, 15.0),
+    ("Beauty", 0.08, 20.0),
+    ("Toys & Games", 0.07, 25.0),
+    ("Furniture", 0.05, 220.0),
+    ("Bags & Accessories", 0.04, 60.0)
+]
+
+ADJECTIVES = ["Classic", "Premium", "Compact", "Wireless", "Ergonomic", "Portable", "Smart", "Organic", "Deluxe", "Eco"]
+NOUNS = ["Lamp", "Backpack", "Speaker", "Chair", "Bottle", "Jacket", "Blender", "Novel", "Puzzle", "Headphones", "Mat", "Serum"]
+FIRST_NAMES = ["Alex", "Sam", "Jordan", "Taylor", "Morgan", "Casey", "Riley", "Jamie", "Avery", "Quinn"]
+LAST_NAMES = ["Smith", "Garcia", "Chen", "Patel", "Kim", "Nguyen", "Brown", "Silva", "Khan", "Novak"]
+CITIES = [("New York", "NY"), ("Austin", "TX"), ("Seattle", "WA"), ("Denver", "CO"), ("Miami", "FL"), ("Chicago", "IL")]
+ORDER_STATUSES = ["delivered", "shipped", "processing", "pending", "cancelled"]
+ORDER_STATUS_WEIGHTS = [0.6, 0.15, 0.1, 0.1, 0.05]
+
+DEFAULTS = {
+    "users": 500_000,
+    "products": 1_000_000,
+    "reviews": 10_000_000,
+    "carts": 100_000,
+    "orders": 5_000_000
+}
+
+
+def object_id(kind: int, index: int) -> ObjectId:
+    """A deterministic ObjectId for the index-th generated document of a kind."""
+    return ObjectId(f"{ID_TIMESTAMP:08x}{kind:02x}{index:014x}")
+
+
+class Catalog:
+    """
+    Per-product attributes shared by every generator: category, price and a
+    Zipf popularity rank that drives review counts and cart/order picks.
+    """
+    
+    def __init__(self, products: int, seed: int, zipf_exponent: float):
+        rng = random.Random(f"{seed}:catalog")
+        category_weights = [share for _, share, _ in CATEGORIES]
+        
+        self.size = products
+        self.categories = rng.choices(range(len(CATEGORIES)), weights=category_weights, k=products)
+        self.prices = [
+            round(max(1.0, rng.lognormvariate(0, 0.6) * CATEGORIES[category][2]), 2)
+            for category in self.categories
+        ]
+        
+        # Popularity rank r gets weight 1 / r^s; ranks are shuffled over products
+        self.by_rank = list(range(products))
+        rng.shuffle(self.by_rank)
+        self.weights = [1 / (rank + 1) ** zipf_exponent for rank in range(products)]
+        self._cumulative = list(itertools.accumulate(self.weights))
+    
+    def name(self, index: int) -> str:
+        return f"{ADJECTIVES[index % len(ADJECTIVES)]} {NOUNS[(index // len(ADJECTIVES)) % len(NOUNS)]} {index}"
+    
+    def category(self, index: int) -> str:
+        return CATEGORIES[self.categories[index]][0]
+    
+    def pick(self, rng: random.Random) -> int:
+        """Pick a product index with Zipf-skewed popularity."""
+        rank = bisect.bisect_left(self._cumulative, rng.random() * self._cumulative[-1])
+        return self.by_rank[min(rank, self.size - 1)]
+    
+    def review_counts(self, total: int) -> List[int]:
+        """Split total reviews over products in proportion to popularity."""
+        scale = total / self._cumulative[-1]
+        counts = [0] * self.size
+        assigned = 0
+        
+        for rank, weight in enumerate(self.weights):
+            count = int(weight * scale)
+            counts[self.by_rank[rank]] = count
+            assigned += count
+        
+        # Hand the rounding remainder to the most popular products
+        for rank in range(total - assigned):
+            counts[self.by_rank[rank % self.size]] += 1
+        return counts
+
+
+def batched(documents: Iterator[Dict[str, Any]], size: int) -> Iterator[List[Dict[str, Any]]]:
+    batch = []
+    for document in documents:
+        batch.append(document)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def generate_users(count: int, seed: int, now: datetime) -> Iterator[Dict[str, Any]]:
+    rng = random.Random(f"{seed}:users")
+    # bcrypt is deliberately slow, every synthetic user shares one password
+    hashed_password = hash_password("password123")
+    
+    for index in range(count):
+        yield {
+            "_id": object_id(USER, index),
+            "email": f"user{index}@example.com",
+            "hashed_password": hashed_password,
+            "first_name": rng.choice(FIRST_NAMES),
+            "last_name": rng.choice(LAST_NAMES),
+            "is_admin": index == 0,
+            "created_at": now - timedelta(days=rng.uniform(0, 3 * 365))
+        }
+
+
+def generate_products_and_reviews(
+    catalog: Catalog,
+    reviews: int,
+    users: int,
+    seed: int,
+    now: datetime
+) -> Iterator[tuple]:
+    """Yield ("products", doc) and ("reviews", doc) pairs with consistent rating aggregates."""
+    counts = catalog.review_counts(reviews)
+    review_index = 0
+    
+    for index in range(catalog.size):
+        rng = random.Random(f"{seed}:product:{index}")
+        created_at = now - timedelta(days=rng.uniform(0, 2 * 365))
+        # Ratings lean positive, like most storefronts
+        ratings = rng.choices([1, 2, 3, 4, 5], weights=[5, 5, 12, 33, 45], k=counts[index])
+        
+        yield "products", {
+            "_id": object_id(PRODUCT, index),
+            "sku": f"SKU-{index:08d}",
+            "name": catalog.name(index),
+            "description": f"{catalog.name(index)} for everyday use. " * rng.randint(2, 8),
+            "price": catalog.prices[index],
+            "imageUrl": f"https://example.com/images/{index}.jpg",
+            "category": catalog.category(index),
+            "stock_quantity": rng.randint(0, 500),
+            "stock_shards": 0,
+            "avg_rating": round(sum(ratings) / len(ratings), 2) if ratings else 0.0,
+            "review_count": len(ratings),
+            "created_at": created_at,
+            "updated_at": created_at
+        }
+        
+        for rating in ratings:
+            yield "reviews", {
+                "_id": object_id(REVIEW, review_index),
+                "product_id": object_id(PRODUCT, index),
+                "user_id": object_id(USER, rng.randrange(users)),
+                "rating": rating,
+                "comment": f"Rated {rating} out of 5. " * rng.randint(1, 4),
+                "created_at": created_at + (now - created_at) * rng.random()
+            }
+            review_index += 1
+
+
+def generate_carts(catalog: Catalog, count: int, users: int, seed: int, now: datetime) -> Iterator[Dict[str, Any]]:
+    rng = random.Random(f"{seed}:carts")
+    
+    for index, user in enumerate(rng.sample(range(users), min(count, users))):
+        products = {catalog.pick(rng) for _ in range(rng.randint(1, 5))}
+        yield {
+            "_id": object_id(CART, index),
+            "user_id": object_id(USER, user),
+            "items": [
+                {"product_id": object_id(PRODUCT, product), "quantity": rng.randint(1, 3)}
+                for product in products
+            ],
+            "updated_at": now - timedelta(hours=rng.uniform(0, 72))
+        }
+
+
+def generate_orders(
+    catalog: Catalog,
+    count: int,
+    users: int,
+    days: int,
+    seed: int,
+    now: datetime
+) -> Iterator[Dict[str, Any]]:
+    rng = random.Random(f"{seed}:orders")
+    
+    for index in range(count):
+        products = {catalog.pick(rng) for _ in range(rng.choices([1, 2, 3, 4], weights=[50, 30, 15, 5])[0])}
+        items = [
+            {
+                "product_id": object_id(PRODUCT, product),
+                "name": catalog.name(product),
+                "category": catalog.category(product),
+                "price": catalog.prices[product],
+                "quantity": rng.choices([1, 2, 3], weights=[80, 15, 5])[0]
+            }
+            for product in products
+        ]
+        city, state = rng.choice(CITIES)
+        created_at = now - timedelta(days=rng.uniform(0, days))
+        
+        yield {
+            "_id": object_id(ORDER, index),
+            "user_id": object_id(USER, rng.randrange(users)),
+            "items": items,
+            "total_amount": round(sum(item["price"] * item["quantity"] for item in items), 2),
+            "shipping_address": {
+                "street": f"{rng.randint(1, 9999)} Main St",
+                "city": city,
+                "state": state,
+                "zip_code": f"{rng.randint(10000, 99999)}"
+            },
+            "status": rng.choices(ORDER_STATUSES, weights=ORDER_STATUS_WEIGHTS)[0],
+            "stripe_payment_intent_id": f"pi_synthetic_{index}",
+            "created_at": created_at,
+            "updated_at": created_at + timedelta(days=rng.uniform(0, 3))
+        }
+
+
+class ParallelInserter:
+    """Runs up to `concurrency` unordered insert_many batches at a time."""
+    
+    def __init__(self, database, concurrency: int):
+        self.database = database
+        self.inserted: Dict[str, int] = {}
+        self._slots = asyncio.Semaphore(concurrency)
+        self._tasks: List[asyncio.Task] = []
+    
+    async def _insert(self, collection: str, documents: List[Dict[str, Any]]) -> None:
+        try:
+            await self.database[collection].insert_many(documents, ordered=False)
+            self.inserted[collection] = self.inserted.get(collection, 0) + len(documents)
+        finally:
+            self._slots.release()
+    
+    async def submit(self, collection: str, documents: List[Dict[str, Any]]) -> None:
+        await self._slots.acquire()
+        
+        for task in self._tasks:
+            if task.done():
+                # Re-raise a failed batch before generating more data
+                task.result()
+        self._tasks = [task for task in self._tasks if not task.done()]
+        self._tasks.append(asyncio.create_task(self._insert(collection, documents)))
+    
+    async def drain(self) -> None:
+        await asyncio.gather(*self._tasks)
+        self._tasks = []
+
+
+async def generate(args: argparse.Namespace) -> Dict[str, Any]:
+    now = datetime(2024, 1, 1)
+    client = AsyncIOMotorClient(args.url)
+    database = client.get_default_database()
+    
+    if args.drop:
+        await client.drop_database(database.name)
+    
+    inserter = ParallelInserter(database, args.concurrency)
+    timings: Dict[str, float] = {}
+    started = time.perf_counter()
+    
+    for batch in batched(generate_users(args.users, args.seed, now), args.batch_size):
+        await inserter.submit("users", batch)
+    await inserter.drain()
+    timings["users_seconds"] = time.perf_counter() - started
+    
+    catalog = Catalog(args.products, args.seed, args.zipf_exponent)
+    phase_started = time.perf_counter()
+    buffers: Dict[str, List[Dict[str, Any]]] = {"products": [], "reviews": []}
+    
+    for collection, document in generate_products_and_reviews(catalog, args.reviews, args.users, args.seed, now):
+        buffers[collection].append(document)
+        if len(buffers[collection]) == args.batch_size:
+            await inserter.submit(collection, buffers[collection])
+            buffers[collection] = []
+    for collection, documents in buffers.items():
+        if documents:
+            await inserter.submit(collection, documents)
+    await inserter.drain()
+    timings["products_and_reviews_seconds"] = time.perf_counter() - phase_started
+    
+    for collection, documents in (
+        ("carts", generate_carts(catalog, args.carts, args.users, args.seed, now)),
+        ("orders", generate_orders(catalog, args.orders, args.users, args.days, args.seed, now))
+    ):
+        phase_started = time.perf_counter()
+        for batch in batched(documents, args.batch_size):
+            await inserter.submit(collection, batch)
+        await inserter.drain()
+        timings[f"{collection}_seconds"] = time.perf_counter() - phase_started
+    
+    client.close()
+    
+    # Building indexes after the load is much faster than maintaining them during it
+    phase_started = time.perf_counter()
+    settings.MONGODB_URL = args.url
+    await db.init_db(create_indexes=True)
+    db.close_db()
+    timings["indexes_seconds"] = time.perf_counter() - phase_started
+    timings["total_seconds"] = time.perf_counter() - started
+    
+    return {**inserter.inserted, **timings}
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--url", default=BENCH_MONGODB_URL, help="Target database (default: BENCH_MONGODB_URL)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiply every default volume")
+    for name, default in DEFAULTS.items():
+        parser.add_argument(f"--{name}", type=int, default=None, help=f"default: {default:,} x scale")
+    parser.add_argument("--days", type=int, default=365, help="Spread orders over this many days")
+    parser.add_argument("--zipf-exponent", type=float, default=1.1)
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=8, help="insert_many batches in flight")
+    parser.add_argument("--no-drop", dest="drop", action="store_false", help="Keep existing data")
+    parser.add_argument("--output", help="Write results to this JSON file")
+    args = parser.parse_args()
+    
+    for name, default in DEFAULTS.items():
+        if getattr(args, name) is None:
+            setattr(args, name, max(1, int(default * args.scale)))
+    return args
+
+
+async def main() -> None:
+    args = parse_args()
+    report("datagen", await generate(args), args.output)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
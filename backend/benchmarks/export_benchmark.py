@@ -0,0 +1,120 @@
+"""
+Export throughput and memory benchmark.
+
+Seeds the benchmark database with synthetic orders and products, then drains
+the admin export streams and reports rows/sec and peak RSS.
+
+Usage (from backend/, with a local mongod running):
+    python -m benchmarks.export_benchmark --rows 200000 --format csv
+"""
+import argparse
+import asyncio
+import random
+import time
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+
+from app.models.order import Order
+from app.models.product import Product
+from app.services.export_service import stream_orders, stream_products
+from benchmarks.common import init_bench_db, current_rss_mb, peak_rss_mb, report
+
+SEED_BATCH_SIZE = 5000
+
+
+async def seed(rows: int) -> None:
+    """Insert synthetic orders and products in fixed-size batches."""
+    rng = random.Random(42)
+    start = datetime(2024, 1, 1)
+    
+    for offset in range(0, rows, SEED_BATCH_SIZE):
+        count = min(SEED_BATCH_SIZE, rows - offset)
+        products = []
+        orders = []
+        
+        for i in range(count):
+            created_at = start + timedelta(minutes=offset + i)
+            products.append({
+                "name": f"Product {offset + i}",
+                "description": "Benchmark product " * 20,
+                "price": round(rng.uniform(1, 500), 2),
+                "imageUrl": "https://example.com/image.jpg",
+                "category": rng.choice(["Electronics", "Books", "Home & Kitchen", "Sports"]),
+                "stock_quantity": rng.randint(0, 500),
+                "avg_rating": 0.0,
+                "review_count": 0,
+                "created_at": created_at,
+                "updated_at": created_at
+            })
+            items = [
+                {
+                    "product_id": ObjectId(),
+                    "name": f"Product {rng.randint(0, rows)}",
+                    "price": 19.99,
+                    "quantity": rng.randint(1, 3)
+                }
+                for _ in range(rng.randint(1, 5))
+            ]
+            orders.append({
+                "user_id": ObjectId(),
+                "items": items,
+                "total_amount": round(sum(item["price"] * item["quantity"] for item in items), 2),
+                "shipping_address": {
+                    "street": "123 Main St",
+                    "city": "New York",
+                    "state": "NY",
+                    "zip_code": "10001"
+                },
+                "status": "pending",
+                "stripe_payment_intent_id": f"pi_{offset + i}",
+                "created_at": created_at,
+                "updated_at": created_at
+            })
+        
+        await Product.get_motor_collection().insert_many(products, ordered=False)
+        await Order.get_motor_collection().insert_many(orders, ordered=False)
+
+
+async def drain(stream) -> tuple:
+    """Consume an export stream, returning (rows, bytes, seconds)."""
+    rows = 0
+    size = 0
+    started = time.perf_counter()
+    
+    async for chunk in stream:
+        rows += chunk.count("\n")
+        size += len(chunk)
+    
+    return rows, size, time.perf_counter() - started
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--format", choices=["ndjson", "csv"], default="ndjson")
+    parser.add_argument("--output", help="Write results to this JSON file")
+    args = parser.parse_args()
+    
+    await init_bench_db()
+    await seed(args.rows)
+    
+    results = {"rows": args.rows, "format": args.format, "rss_before_mb": current_rss_mb()}
+    
+    for name, stream in (
+        ("orders", stream_orders(args.format)),
+        ("products", stream_products(args.format))
+    ):
+        rows, size, seconds = await drain(stream)
+        results[f"{name}_rows_per_sec"] = rows / seconds
+        results[f"{name}_mb"] = size / (1024 * 1024)
+        results[f"{name}_seconds"] = seconds
+    
+    results["rss_after_mb"] = current_rss_mb()
+    results["peak_rss_mb"] = peak_rss_mb()
+    
+    report("export", results, args.output)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
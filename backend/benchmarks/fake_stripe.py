@@ -0,0 +1,168 @@
+"""
+Local stand-in for the Stripe API, for load tests that must run offline.
+
+Serves the PaymentIntent endpoints the backend calls, honours Idempotency-Key
+like Stripe does, and can add latency and failures to mimic a slow or flaky
+gateway. Point the backend at it with STRIPE_API_BASE (any secret key works).
+
+Usage (from backend/):
+    python -m benchmarks.fake_stripe --port 12111 --latency-ms 150 --jitter-ms 50
+    STRIPE_API_BASE=http://127.0.0.1:12111 STRIPE_SECRET_KEY=sk_test_fake uvicorn app.main:app
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import parse_qsl
+
+
+class FakeStripeState:
+    """Payment intents and idempotent responses, shared by all handler threads."""
+    
+    def __init__(self, latency_ms: float, jitter_ms: float, error_rate: float, seed: int):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.rng = random.Random(seed)
+        self.intents: Dict[str, Dict[str, Any]] = {}
+        self.idempotent: Dict[str, Tuple[int, Dict[str, Any]]] = {}
+        self.lock = threading.Lock()
+    
+    def delay(self) -> float:
+        with self.lock:
+            jitter = self.rng.uniform(-self.jitter_ms, self.jitter_ms) if self.jitter_ms else 0.0
+        return max(0.0, self.latency_ms + jitter) / 1000
+    
+    def should_fail(self) -> bool:
+        with self.lock:
+            return self.error_rate > 0 and self.rng.random() < self.error_rate
+    
+    def create_intent(self, params: Dict[str, str]) -> Dict[str, Any]:
+        with self.lock:
+            intent_id = f"pi_fake{len(self.intents) + 1:012d}"
+            intent = {
+                "id": intent_id,
+                "object": "payment_intent",
+                "amount": int(params.get("amount", 0)),
+                "currency": params.get("currency", "usd"),
+                "client_secret": f"{intent_id}_secret_fake",
+                "status": "requires_payment_method",
+                "created": int(time.time()),
+                "livemode": False,
+                "metadata": {
+                    key[len("metadata["):-1]: value
+                    for key, value in params.items()
+                    if key.startswith("metadata[")
+                }
+            }
+            self.intents[intent_id] = intent
+        return intent
+
+
+def stripe_error(message: str, error_type: str = "invalid_request_error") -> Dict[str, Any]:
+    return {"error": {"type": error_type, "message": message}}
+
+
+class FakeStripeHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep-alive, as the Stripe client expects
+    state: FakeStripeState
+    
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+    
+    def send_json(self, status: int, body: Dict[str, Any]) -> None:
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.send_header("Request-Id", f"req_fake{id(body):x}")
+        self.end_headers()
+        self.wfile.write(payload)
+    
+    def handle_api(self, method: str) -> None:
+        length = int(self.headers.get("Content-Length") or 0)
+        params = dict(parse_qsl(self.rfile.read(length).decode())) if length else {}
+        time.sleep(self.state.delay())
+        
+        if self.state.should_fail():
+            self.send_json(500, stripe_error("Injected failure", "api_error"))
+            return
+        
+        idempotency_key: Optional[str] = self.headers.get("Idempotency-Key")
+        if method == "POST" and idempotency_key:
+            with self.state.lock:
+                replay = self.state.idempotent.get(idempotency_key)
+            if replay:
+                self.send_json(*replay)
+                return
+        
+        status, body = self.route(method, params)
+        
+        if method == "POST" and idempotency_key:
+            with self.state.lock:
+                self.state.idempotent[idempotency_key] = (status, body)
+        self.send_json(status, body)
+    
+    def route(self, method: str, params: Dict[str, str]) -> Tuple[int, Dict[str, Any]]:
+        path = self.path.split("?", 1)[0].rstrip("/")
+        
+        if path == "/v1/payment_intents" and method == "POST":
+            return 200, self.state.create_intent(params)
+        
+        if path.startswith("/v1/payment_intents/") and method == "GET":
+            intent = self.state.intents.get(path.rsplit("/", 1)[1])
+            if intent:
+                return 200, intent
+            return 404, stripe_error("No such payment_intent")
+        
+        return 404, stripe_error(f"Unrecognized request URL ({method}: {path})")
+    
+    def do_GET(self) -> None:
+        self.handle_api("GET")
+    
+    def do_POST(self) -> None:
+        self.handle_api("POST")
+
+
+def make_server(
+    host: str = "127.0.0.1",
+    port: int = 12111,
+    latency_ms: float = 0.0,
+    jitter_ms: float = 0.0,
+    error_rate: float = 0.0,
+    seed: int = 42
+) -> ThreadingHTTPServer:
+    """Build a fake Stripe server; call serve_forever() on it, e.g. in a thread."""
+    handler = type("Handler", (FakeStripeHandler,), {
+        "state": FakeStripeState(latency_ms, jitter_ms, error_rate, seed)
+    })
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=12111)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Added to every response")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="Uniform +/- spread around the latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with a 500")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    
+    server = make_server(args.host, args.port, args.latency_ms, args.jitter_ms, args.error_rate, args.seed)
+    print(f"Fake Stripe listening on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
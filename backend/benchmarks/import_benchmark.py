@@ -0,0 +1,88 @@
+"""
+Bulk product import throughput benchmark.
+
+Generates a synthetic NDJSON or CSV upload and feeds it through the import
+service in 64 KiB chunks, first inserting every SKU and then updating them.
+The target is 10k+ rows/sec against a local mongod.
+
+Usage (from backend/, with a local mongod running):
+    python -m benchmarks.import_benchmark --rows 100000 --format ndjson
+"""
+import argparse
+import asyncio
+import csv
+import io
+import json
+import random
+import time
+from typing import AsyncIterator
+
+from app.services.import_service import import_products
+from benchmarks.common import init_bench_db, peak_rss_mb, report
+
+CHUNK_SIZE = 64 * 1024
+CATEGORIES = ["Electronics", "Books", "Home & Kitchen", "Sports", "Toys", "Beauty"]
+
+
+def build_upload(rows: int, upload_format: str, price_offset: float = 0.0) -> bytes:
+    """Build a synthetic upload body with one product per SKU."""
+    rng = random.Random(7)
+    products = [
+        {
+            "sku": f"SKU-{i:08d}",
+            "name": f"Product {i}",
+            "description": f"Synthetic product number {i} for import benchmarking.",
+            "price": round(rng.uniform(1, 500) + price_offset, 2),
+            "imageUrl": f"https://example.com/images/{i}.jpg",
+            "category": rng.choice(CATEGORIES),
+            "stock_quantity": rng.randint(0, 1000)
+        }
+        for i in range(rows)
+    ]
+    
+    if upload_format == "ndjson":
+        return "".join(json.dumps(product) + "\n" for product in products).encode("utf-8")
+    
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=list(products[0].keys()))
+    writer.writeheader()
+    writer.writerows(products)
+    return buffer.getvalue().encode("utf-8")
+
+
+async def chunked(body: bytes) -> AsyncIterator[bytes]:
+    """Replay a body the way Starlette's request.stream() delivers it."""
+    for offset in range(0, len(body), CHUNK_SIZE):
+        yield body[offset:offset + CHUNK_SIZE]
+
+
+async def timed_import(body: bytes, upload_format: str) -> tuple:
+    """Run one import, returning (report, seconds)."""
+    started = time.perf_counter()
+    result = await import_products(chunked(body), upload_format)
+    return result, time.perf_counter() - started
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--format", choices=["ndjson", "csv"], default="ndjson")
+    parser.add_argument("--output", help="Write results to this JSON file")
+    args = parser.parse_args()
+    
+    await init_bench_db()
+    results = {"rows": args.rows, "format": args.format}
+    
+    for phase, price_offset in (("insert", 0.0), ("update", 1.0)):
+        body = build_upload(args.rows, args.format, price_offset)
+        result, seconds = await timed_import(body, args.format)
+        results[f"{phase}_rows_per_sec"] = args.rows / seconds
+        results[f"{phase}_seconds"] = seconds
+        results[f"{phase}_failed"] = result["failed"]
+    
+    results["peak_rss_mb"] = peak_rss_mb()
+    report("import", results, args.output)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
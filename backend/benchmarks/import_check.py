@@ -0,0 +1,87 @@
+"""
+Bulk import correctness check for hot products.
+
+Imports two SKUs, moves one into hot stock mode, then imports both again
+with new stock levels. The hot product's row must fail with the hot stock
+error and leave its shards and stock_quantity untouched, while the other
+row is applied. Exits non-zero when any case fails.
+
+Usage (from backend/, with a local mongod running):
+    python -m benchmarks.import_check
+"""
+import asyncio
+import json
+import sys
+from typing import Any, AsyncIterator, Dict, List
+
+from app.db import close_db
+from app.models.product import Product
+from app.services.import_service import HOT_STOCK_ERROR, import_products
+from app.services.stock_service import enable_hot_stock, get_sharded_stock
+from benchmarks.common import init_bench_db
+
+PRODUCT = {
+    "name": "Import check product",
+    "description": "Imported by benchmarks.import_check.",
+    "price": 10.0,
+    "imageUrl": "https://example.com/images/check.jpg",
+    "category": "Electronics"
+}
+
+
+async def run_import(rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+    body = "\n".join(json.dumps({**PRODUCT, **row}) for row in rows).encode()
+    
+    async def chunks() -> AsyncIterator[bytes]:
+        yield body
+    
+    return await import_products(chunks(), "ndjson")
+
+
+async def check_hot_stock_import() -> List[str]:
+    failures: List[str] = []
+    collection = Product.get_motor_collection()
+    
+    await run_import([{"sku": "HOT-1", "stock_quantity": 40}, {"sku": "COLD-1", "stock_quantity": 5}])
+    hot = await collection.find_one({"sku": "HOT-1"})
+    await enable_hot_stock(hot["_id"], 4)
+    
+    report = await run_import([
+        {"sku": "HOT-1", "stock_quantity": 999, "price": 12.0},
+        {"sku": "COLD-1", "stock_quantity": 7}
+    ])
+    hot = await collection.find_one({"sku": "HOT-1"})
+    cold = await collection.find_one({"sku": "COLD-1"})
+    
+    if report["errors"] != [{"row": 1, "sku": "HOT-1", "error": HOT_STOCK_ERROR}]:
+        failures.append(f"hot row: expected the hot stock error, got {report['errors']}")
+    else:
+        print("  ok   the hot product's row is reported as failed")
+    
+    if await get_sharded_stock(hot["_id"]) != 40 or hot["stock_quantity"] != 40 or hot["price"] != 10.0:
+        failures.append("hot product: the import changed it")
+    else:
+        print("  ok   the hot product's shards and snapshot are untouched")
+    
+    if report["updated"] != 1 or cold["stock_quantity"] != 7:
+        failures.append(f"cold row: expected it applied, got updated={report['updated']} stock={cold['stock_quantity']}")
+    else:
+        print("  ok   the other row is applied")
+    
+    return failures
+
+
+async def main() -> int:
+    await init_bench_db()
+    try:
+        failures = await check_hot_stock_import()
+    finally:
+        close_db()
+    
+    for failure in failures:
+        print(f"  FAIL {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,276 @@
+"""
+End-to-end load generator replaying weighted shopper journeys.
+
+Drives a running API instance over HTTP with an open-loop arrival process:
+journeys start at Poisson intervals sized so the overall request rate matches
+--rps, whether or not earlier journeys have finished. Journeys browse the
+catalog (filters, sorting, search, product detail, reviews), log in and edit
+a cart, or go all the way through payment intent and order placement.
+Product and user picks follow the dataset written by benchmarks.datagen with
+the same --scale and --seed, so runs are reproducible offline.
+
+Usage (from backend/, with a local mongod running):
+    python -m benchmarks.datagen --scale 0.001
+    python -m benchmarks.fake_stripe --port 12111 &
+    MONGODB_URL=mongodb://localhost:27017/ecommerce_bench STRIPE_SECRET_KEY=sk_test_fake \\
+        STRIPE_API_BASE=http://127.0.0.1:12111 uvicorn app.main:app --port 8000 &
+    python -m benchmarks.load_generator --base-url http://127.0.0.1:8000 --scale 0.001 --rps 200 --duration 60
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+from collections import Counter, defaultdict, deque
+from typing import Callable, Dict, List, Optional
+
+import httpx
+
+from benchmarks import datagen
+from benchmarks.common import report
+
+SHIPPING_ADDRESS = {"street": "1 Main St", "city": "Austin", "state": "TX", "zip_code": "73301"}
+
+
+class LoadStats:
+    """Latencies and status codes per route template."""
+    
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.statuses: Dict[str, Counter] = defaultdict(Counter)
+        self.journeys = Counter()
+        self.dropped_journeys = 0
+    
+    def record(self, route: str, elapsed: float, status: str) -> None:
+        self.latencies[route].append(elapsed)
+        self.statuses[route][status] += 1
+    
+    def summary(self, elapsed: float) -> Dict[str, float]:
+        results: Dict[str, float] = {}
+        total = errors = 0
+        
+        for route in sorted(self.latencies):
+            timings = self.latencies[route]
+            percentiles = statistics.quantiles(timings, n=100) if len(timings) > 1 else timings * 99
+            failed = sum(count for status, count in self.statuses[route].items() if not status.startswith("2"))
+            total += len(timings)
+            errors += failed
+            
+            results[f"{route} requests"] = len(timings)
+            results[f"{route} p50_ms"] = percentiles[49] * 1000
+            results[f"{route} p95_ms"] = percentiles[94] * 1000
+            results[f"{route} p99_ms"] = percentiles[98] * 1000
+            results[f"{route} error_rate"] = failed / len(timings)
+            for status, count in sorted(self.statuses[route].items()):
+                if not status.startswith("2"):
+                    results[f"{route} status_{status}"] = count
+        
+        results["requests"] = total
+        results["requests_per_second"] = total / elapsed
+        results["error_rate"] = errors / total if total else 0.0
+        results["dropped_journeys"] = self.dropped_journeys
+        for journey, count in sorted(self.journeys.items()):
+            results[f"journeys_{journey}"] = count
+        return results
+
+
+class Shopper:
+    """One journey's HTTP session; failed requests abort the journey."""
+    
+    def __init__(self, client: httpx.AsyncClient, stats: LoadStats, rng: random.Random):
+        self.client = client
+        self.stats = stats
+        self.rng = rng
+    
+    async def call(self, route: str, method: str, url: str, **kwargs) -> httpx.Response:
+        started = time.perf_counter()
+        try:
+            response = await self.client.request(method, url, **kwargs)
+        except httpx.HTTPError as e:
+            self.stats.record(route, time.perf_counter() - started, type(e).__name__)
+            raise
+        
+        self.stats.record(route, time.perf_counter() - started, str(response.status_code))
+        response.raise_for_status()
+        return response
+
+
+class Workload:
+    """Weighted journeys over a datagen catalog."""
+    
+    def __init__(self, args: argparse.Namespace):
+        self.catalog = datagen.Catalog(args.products, args.seed, args.zipf_exponent)
+        # user0 is the admin, shoppers are borrowed so no two journeys share a cart
+        self.free_users = deque(range(1, args.users))
+        self.journeys: Dict[str, Callable] = {
+            "browse": self.browse,
+            "cart": self.edit_cart,
+            "checkout": self.checkout
+        }
+        self.weights = {"browse": args.browse_weight, "cart": args.cart_weight, "checkout": args.checkout_weight}
+    
+    def product_id(self, rng: random.Random) -> str:
+        return str(datagen.object_id(datagen.PRODUCT, self.catalog.pick(rng)))
+    
+    def requests_per_journey(self) -> float:
+        """Average request count, used to turn the request rate into a journey rate."""
+        sizes = {"browse": 4.5, "cart": 6.0, "checkout": 7.0}
+        total = sum(self.weights.values())
+        return sum(sizes[name] * weight for name, weight in self.weights.items()) / total
+    
+    async def browse(self, shopper: Shopper) -> None:
+        rng = shopper.rng
+        params = {"limit": 20, "skip": 20 * min(int(rng.expovariate(0.7)), 10)}
+        if rng.random() < 0.5:
+            params["category"] = rng.choice(datagen.CATEGORIES)[0]
+        if rng.random() < 0.4:
+            params["sort"] = rng.choice(["price_asc", "price_desc"])
+        if rng.random() < 0.2:
+            params["q"] = rng.choice(datagen.ADJECTIVES + datagen.NOUNS).lower()
+        await shopper.call("GET /products", "GET", "/products", params=params)
+        
+        for _ in range(rng.randint(1, 3)):
+            product_id = self.product_id(rng)
+            await shopper.call("GET /products/{id}", "GET", f"/products/{product_id}")
+            if rng.random() < 0.5:
+                await shopper.call("GET /products/{id}/reviews", "GET", f"/products/{product_id}/reviews")
+    
+    async def login(self, shopper: Shopper, user: int) -> None:
+        await shopper.call("POST /auth/login", "POST", "/auth/login", data={
+            "username": f"user{user}@example.com",
+            "password": "password123"
+        })
+    
+    async def fill_cart(self, shopper: Shopper) -> List[str]:
+        product_ids = list({self.product_id(shopper.rng) for _ in range(shopper.rng.randint(1, 4))})
+        for product_id in product_ids:
+            await shopper.call("POST /cart/items", "POST", "/cart/items", json={
+                "product_id": product_id,
+                "quantity": 1
+            })
+        return product_ids
+    
+    async def edit_cart(self, shopper: Shopper, user: int) -> None:
+        await self.login(shopper, user)
+        product_ids = await self.fill_cart(shopper)
+        await shopper.call("PUT /cart/items/{id}", "PUT", f"/cart/items/{product_ids[0]}", json={"quantity": 2})
+        await shopper.call("GET /cart", "GET", "/cart")
+        for product_id in product_ids:
+            await shopper.call("DELETE /cart/items/{id}", "DELETE", f"/cart/items/{product_id}")
+    
+    async def checkout(self, shopper: Shopper, user: int) -> None:
+        await self.login(shopper, user)
+        await self.fill_cart(shopper)
+        await shopper.call("GET /cart", "GET", "/cart")
+        
+        journey_key = f"{user}-{shopper.rng.getrandbits(64):x}"
+        intent = await shopper.call(
+            "POST /orders/create-payment-intent", "POST", "/orders/create-payment-intent",
+            headers={"Idempotency-Key": f"{journey_key}-intent"}
+        )
+        payment_intent_id = intent.json()["clientSecret"].split("_secret")[0]
+        await shopper.call("POST /orders", "POST", "/orders", json={
+            "payment_intent_id": payment_intent_id,
+            "shipping_address": SHIPPING_ADDRESS
+        }, headers={"Idempotency-Key": f"{journey_key}-order"})
+    
+    async def run(self, name: str, shopper: Shopper) -> None:
+        if name == "browse":
+            await self.browse(shopper)
+            return
+        
+        user = self.free_users.popleft()
+        try:
+            await self.journeys[name](shopper, user)
+        finally:
+            self.free_users.append(user)
+
+
+async def run_load(args: argparse.Namespace) -> Dict[str, float]:
+    workload = Workload(args)
+    stats = LoadStats()
+    transport = httpx.AsyncHTTPTransport(limits=httpx.Limits(
+        max_connections=args.connections,
+        max_keepalive_connections=args.connections
+    ))
+    rng = random.Random(f"{args.seed}:load")
+    names = list(workload.weights)
+    weights = [workload.weights[name] for name in names]
+    journey_rate = args.rps / workload.requests_per_journey()
+    in_flight: set = set()
+    
+    async def journey(number: int, name: str) -> None:
+        # Each journey has its own cookie jar over the shared connection pool
+        client = httpx.AsyncClient(
+            base_url=f"{args.base_url.rstrip('/')}/api/v1",
+            transport=transport,
+            timeout=args.timeout
+        )
+        shopper = Shopper(client, stats, random.Random(f"{args.seed}:journey:{number}"))
+        try:
+            await workload.run(name, shopper)
+        except httpx.HTTPError:
+            pass
+    
+    started = time.perf_counter()
+    next_arrival = started
+    number = 0
+    
+    while next_arrival - started < args.duration:
+        await asyncio.sleep(max(0.0, next_arrival - time.perf_counter()))
+        name = rng.choices(names, weights)[0]
+        number += 1
+        
+        needs_user = name != "browse"
+        if len(in_flight) >= args.max_journeys or (needs_user and not workload.free_users):
+            stats.dropped_journeys += 1
+        else:
+            stats.journeys[name] += 1
+            task = asyncio.create_task(journey(number, name))
+            in_flight.add(task)
+            task.add_done_callback(in_flight.discard)
+        
+        next_arrival += rng.expovariate(journey_rate)
+    
+    if in_flight:
+        await asyncio.wait(in_flight, timeout=args.timeout)
+    elapsed = time.perf_counter() - started
+    await transport.aclose()
+    
+    results: Dict[str, float] = {"target_rps": args.rps, "duration_seconds": elapsed}
+    results.update(stats.summary(elapsed))
+    return results
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--rps", type=float, default=100.0, help="Target requests per second")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds to keep starting journeys")
+    parser.add_argument("--seed", type=int, default=42, help="Same seed as the datagen run")
+    parser.add_argument("--scale", type=float, default=0.001, help="Same scale as the datagen run")
+    parser.add_argument("--products", type=int, default=None)
+    parser.add_argument("--users", type=int, default=None)
+    parser.add_argument("--zipf-exponent", type=float, default=1.1)
+    parser.add_argument("--browse-weight", type=float, default=0.75)
+    parser.add_argument("--cart-weight", type=float, default=0.15)
+    parser.add_argument("--checkout-weight", type=float, default=0.10)
+    parser.add_argument("--connections", type=int, default=100, help="HTTP connection pool size")
+    parser.add_argument("--max-journeys", type=int, default=1000, help="Concurrent journeys before new ones are dropped")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--output", help="Write results to this JSON file")
+    args = parser.parse_args(argv)
+    
+    for name in ("products", "users"):
+        if getattr(args, name) is None:
+            setattr(args, name, max(2, int(datagen.DEFAULTS[name] * args.scale)))
+    return args
+
+
+async def main() -> None:
+    args = parse_args()
+    report("load", await run_load(args), args.output)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
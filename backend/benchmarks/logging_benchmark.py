@@ -0,0 +1,109 @@
+"""
+Cost of structured logging on the event loop at a fixed request rate.
+
+Emits one access record per simulated request, paced at --rate requests per
+second, with a request context and the same `extra` fields the access log
+uses. Compares the queue handler, where the listener thread formats and
+writes, with formatting and writing synchronously on the loop. Records go to
+--log-file, /dev/null by default. No database is needed.
+
+Usage (from backend/):
+    python -m benchmarks.logging_benchmark --rate 10000 --seconds 5
+"""
+import argparse
+import asyncio
+import logging
+import queue
+import statistics
+import time
+from typing import Dict, List
+
+from app.logs import (
+    BoundedQueueHandler, DebugSampler, JsonFormatter, LogListener, log_records_dropped, start_request_context
+)
+from benchmarks.common import report
+
+# Requests emitted back to back before yielding to the loop
+BATCH = 100
+
+
+async def emit(logger: logging.Logger, rate: int, seconds: float) -> List[float]:
+    """Per-record seconds spent in the logging call, paced to `rate` records per second."""
+    durations = []
+    total = int(rate * seconds)
+    started = time.perf_counter()
+    
+    for index in range(total):
+        start_request_context(request_id=f"{index:032x}", user_id="65f0c0ffee0000000000beef")
+        call_started = time.perf_counter()
+        logger.info(
+            "GET /api/v1/products 200",
+            extra={"method": "GET", "route": "/api/v1/products", "status": 200, "duration_ms": 3.21}
+        )
+        durations.append(time.perf_counter() - call_started)
+        
+        if index % BATCH == BATCH - 1:
+            # Sleep until this batch is due, like a loop serving requests at the target rate
+            await asyncio.sleep(max(0.0, started + (index + 1) / rate - time.perf_counter()))
+    
+    return durations
+
+
+def summarize(prefix: str, durations: List[float], rate: int) -> Dict[str, float]:
+    ordered = sorted(durations)
+    return {
+        f"{prefix}_mean_us": statistics.fmean(ordered) * 1_000_000,
+        f"{prefix}_p99_us": ordered[int(len(ordered) * 0.99)] * 1_000_000,
+        f"{prefix}_max_us": ordered[-1] * 1_000_000,
+        # Share of one core the logging calls take on the loop at this rate
+        f"{prefix}_loop_share_pct": statistics.fmean(ordered) * rate * 100
+    }
+
+
+def make_logger(name: str, handler: logging.Handler) -> logging.Logger:
+    logger = logging.getLogger(f"bench.{name}")
+    logger.handlers = [handler]
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    return logger
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rate", type=int, default=10_000, help="Records per second")
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--queue-size", type=int, default=10_000)
+    parser.add_argument("--log-file", default="/dev/null")
+    parser.add_argument("--output", help="Write results to this JSON file")
+    args = parser.parse_args()
+    
+    results: Dict[str, float] = {"rate": args.rate, "records": int(args.rate * args.seconds)}
+    
+    with open(args.log_file, "a") as log_file:
+        direct = logging.StreamHandler(log_file)
+        direct.setFormatter(JsonFormatter())
+        durations = await emit(make_logger("sync", direct), args.rate, args.seconds)
+        results.update(summarize("sync", durations, args.rate))
+        
+        output = logging.StreamHandler(log_file)
+        output.setFormatter(JsonFormatter())
+        log_queue: queue.Queue = queue.Queue(maxsize=args.queue_size)
+        handler = BoundedQueueHandler(log_queue)
+        handler.addFilter(DebugSampler(0.01))
+        listener = LogListener(log_queue, output)
+        listener.start()
+        
+        dropped_before = sum(log_records_dropped.values.values())
+        durations = await emit(make_logger("queued", handler), args.rate, args.seconds)
+        drain_started = time.perf_counter()
+        listener.stop()
+        
+        results.update(summarize("queued", durations, args.rate))
+        results["queued_dropped"] = sum(log_records_dropped.values.values()) - dropped_before
+        results["queued_drain_ms"] = (time.perf_counter() - drain_started) * 1000
+    
+    report("logging", results, args.output)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
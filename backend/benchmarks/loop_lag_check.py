@@ -0,0 +1,73 @@
+"""
+Event loop lag readiness check.
+
+Runs the health monitor's loop lag probe on a real event loop and blocks
+the loop the way a synchronous call does, with probes a short interval
+apart. One stall as long as a bcrypt verification must leave the worker
+healthy, stalls in HEALTH_LOOP_LAG_BREACHES probes in a row must mark it
+degraded, and a healthy probe must clear it again. Needs no database.
+Exits non-zero when any case fails.
+
+Usage (from backend/):
+    python -m benchmarks.loop_lag_check
+"""
+import asyncio
+import sys
+import time
+from typing import List
+
+from app.config import settings
+from app.health import DEGRADED, HEALTHY, LOOP_LAG_SAMPLE_SECONDS, HealthMonitor
+
+# About what one bcrypt verification takes at the default cost factor
+STALL_SECONDS = 0.3
+
+
+async def probe_after(monitor: HealthMonitor, stall: bool) -> str:
+    """Let the lag watcher sample, optionally block the loop, then run the loop check."""
+    await asyncio.sleep(LOOP_LAG_SAMPLE_SECONDS * 2)
+    if stall:
+        time.sleep(STALL_SECONDS)
+    await asyncio.sleep(LOOP_LAG_SAMPLE_SECONDS * 2)
+    return monitor.check_loop()["status"]
+
+
+async def check_loop_lag() -> List[str]:
+    failures: List[str] = []
+    breaches = settings.HEALTH_LOOP_LAG_BREACHES
+    monitor = HealthMonitor()
+    watcher = asyncio.create_task(monitor.watch_loop_lag())
+    
+    try:
+        statuses = [await probe_after(monitor, stall) for stall in (False, True, False)]
+        if statuses != [HEALTHY] * 3:
+            failures.append(f"one stall: expected every probe healthy, got {statuses}")
+        else:
+            print("  ok   one stall leaves the worker ready")
+        
+        statuses = [await probe_after(monitor, True) for _ in range(breaches)]
+        if statuses[-1] != DEGRADED or DEGRADED in statuses[:-1]:
+            failures.append(f"{breaches} stalls in a row: expected degraded on the last probe only, got {statuses}")
+        else:
+            print(f"  ok   {breaches} stalls in a row mark the worker degraded")
+        
+        status = await probe_after(monitor, False)
+        if status != HEALTHY:
+            failures.append(f"recovery: expected healthy after a probe without stalls, got {status}")
+        else:
+            print("  ok   a probe without stalls makes the worker ready again")
+    finally:
+        watcher.cancel()
+    
+    return failures
+
+
+async def main() -> int:
+    failures = await check_loop_lag()
+    for failure in failures:
+        print(f"  FAIL {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
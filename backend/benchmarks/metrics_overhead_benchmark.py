@@ -0,0 +1,109 @@
+"""
+Per-request cost of the metrics instrumentation.
+
+Calls a trivial ASGI endpoint directly, with and without MetricsMiddleware.
+The endpoint records a matched route in the scope as the router does. Also
+times the Mongo command listener on synthetic events and rendering /metrics.
+No database is needed.
+
+Usage (from backend/):
+    python -m benchmarks.metrics_overhead_benchmark --requests 100000
+"""
+import argparse
+import asyncio
+import time
+from types import SimpleNamespace
+from typing import Dict
+
+from app.db import CommandMetricsListener
+from app.metrics import registry
+from app.middleware import MetricsMiddleware
+from benchmarks.common import report
+
+ROUTES = [
+    ("GET", SimpleNamespace(path="/api/v1/products")),
+    ("GET", SimpleNamespace(path="/api/v1/products/{product_id}")),
+    ("POST", SimpleNamespace(path="/api/v1/orders/create-payment-intent")),
+    ("GET", None)
+]
+
+
+async def endpoint(scope, receive, send) -> None:
+    if scope["matched"] is not None:
+        scope["route"] = scope["matched"]
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"ok"})
+
+
+async def receive() -> dict:
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+async def send(message: dict) -> None:
+    pass
+
+
+async def time_requests(handler, requests: int) -> float:
+    """Mean seconds per request through handler."""
+    scopes = [
+        {"type": "http", "method": method, "matched": route, "headers": []}
+        for method, route in ROUTES
+    ]
+    
+    started = time.perf_counter()
+    for index in range(requests):
+        await handler(dict(scopes[index % len(scopes)]), receive, send)
+    return (time.perf_counter() - started) / requests
+
+
+def time_listener(commands: int) -> float:
+    """Mean seconds per command for a started and succeeded event pair."""
+    listener = CommandMetricsListener()
+    events = [
+        (
+            SimpleNamespace(command_name="find", command={"find": "products"}, request_id=index),
+            SimpleNamespace(command_name="find", duration_micros=850, request_id=index)
+        )
+        for index in range(1000)
+    ]
+    
+    started = time.perf_counter()
+    for index in range(commands):
+        started_event, succeeded_event = events[index % len(events)]
+        listener.started(started_event)
+        listener.succeeded(succeeded_event)
+    return (time.perf_counter() - started) / commands
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=100_000)
+    parser.add_argument("--output", help="Write results to this JSON file")
+    args = parser.parse_args()
+    
+    instrumented = MetricsMiddleware(endpoint)
+    # Warm both paths before timing
+    await time_requests(endpoint, 1000)
+    await time_requests(instrumented, 1000)
+    
+    bare = await time_requests(endpoint, args.requests)
+    with_metrics = await time_requests(instrumented, args.requests)
+    
+    started = time.perf_counter()
+    rendered = registry.render()
+    render_seconds = time.perf_counter() - started
+    
+    results: Dict[str, float] = {
+        "requests": args.requests,
+        "bare_request_us": bare * 1_000_000,
+        "instrumented_request_us": with_metrics * 1_000_000,
+        "middleware_overhead_us": (with_metrics - bare) * 1_000_000,
+        "command_listener_us": time_listener(args.requests) * 1_000_000,
+        "render_ms": render_seconds * 1000,
+        "render_bytes": len(rendered)
+    }
+    report("metrics_overhead", results, args.output)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,220 @@
+"""
+Local three-member replica set for checking catalog read routing.
+
+Starts three mongod processes (mongod must be on PATH), initiates a replica
+set, then checks through the API that catalog reads are served by a
+secondary while read-your-writes requests and cart reads stay on the
+primary, and that only the routed catalog responses are cacheable by shared
+caches. Exits non-zero when any request is routed or cached wrongly.
+
+Usage (from backend/):
+    python -m benchmarks.replica_set --base-port 27117
+"""
+import argparse
+import asyncio
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List, NamedTuple, Optional
+
+import httpx
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import monitoring
+
+REPLICA_SET_NAME = "rs-bench"
+
+
+class RoutingCase(NamedTuple):
+    name: str
+    path: str
+    collection: str
+    on_primary: bool
+    headers: Optional[Dict[str, str]] = None
+    cookies: Optional[Dict[str, str]] = None
+
+
+@asynccontextmanager
+async def local_replica_set(base_port: int = 27117, database: str = "ecommerce_replica") -> AsyncIterator[str]:
+    """Run a throwaway three-member replica set and yield its connection URL."""
+    if shutil.which("mongod") is None:
+        raise RuntimeError("mongod was not found on PATH")
+    
+    data_dir = tempfile.mkdtemp(prefix="ecommerce-rs-")
+    ports = [base_port + member for member in range(3)]
+    processes: List[subprocess.Popen] = []
+    
+    try:
+        for port in ports:
+            member_dir = os.path.join(data_dir, str(port))
+            os.makedirs(member_dir)
+            processes.append(subprocess.Popen(
+                [
+                    "mongod",
+                    "--replSet", REPLICA_SET_NAME,
+                    "--port", str(port),
+                    "--dbpath", member_dir,
+                    "--bind_ip", "127.0.0.1"
+                ],
+                stdout=subprocess.DEVNULL
+            ))
+        
+        admin = AsyncIOMotorClient(f"mongodb://127.0.0.1:{ports[0]}", directConnection=True)
+        deadline = time.monotonic() + 30
+        
+        while True:
+            try:
+                await admin.admin.command("ping")
+                break
+            except Exception:
+                if time.monotonic() > deadline:
+                    raise
+                await asyncio.sleep(0.5)
+        
+        await admin.admin.command("replSetInitiate", {
+            "_id": REPLICA_SET_NAME,
+            "members": [
+                {"_id": member, "host": f"127.0.0.1:{port}", "priority": 2 if member == 0 else 1}
+                for member, port in enumerate(ports)
+            ]
+        })
+        
+        while (await admin.admin.command("hello")).get("isWritablePrimary") is not True:
+            if time.monotonic() > deadline:
+                raise RuntimeError("Replica set did not elect a primary")
+            await asyncio.sleep(0.5)
+        admin.close()
+        
+        hosts = ",".join(f"127.0.0.1:{port}" for port in ports)
+        yield f"mongodb://{hosts}/{database}?replicaSet={REPLICA_SET_NAME}"
+    finally:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.wait()
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+
+class FindTargetListener(monitoring.CommandListener):
+    """Records which server each find command on a collection was sent to."""
+    
+    def __init__(self):
+        self.targets = []
+    
+    def started(self, event):
+        if event.command_name == "find":
+            self.targets.append((event.command["find"], event.connection_id))
+    
+    def succeeded(self, event):
+        pass
+    
+    def failed(self, event):
+        pass
+
+
+async def check_routing(url: str) -> List[str]:
+    """Drive the routed endpoints and return a message for each read served by the wrong member."""
+    listener = FindTargetListener()
+    monitoring.register(listener)
+    
+    from app.config import settings
+    settings.MONGODB_URL = url
+    
+    from app import db
+    from app.cache import product_cache
+    from app.http_cache import catalog_version_cache
+    from app.main import app
+    from app.models.product import Product
+    from app.models.user import User
+    from app.read_routing import READ_YOUR_WRITES_COOKIE
+    from app.security import hash_password
+    
+    await db.init_db()
+    await db.seed_database()
+    await User(
+        email="routing@example.com",
+        hashed_password=hash_password("password123"),
+        first_name="Rita",
+        last_name="Routing"
+    ).insert()
+    host, port = (await db.client.admin.command("hello"))["primary"].rsplit(":", 1)
+    primary = (host, int(port))
+    product = await Product.find_one()
+    
+    cases = [
+        RoutingCase("product list", "/api/v1/products", "products", on_primary=False),
+        RoutingCase("product details", f"/api/v1/products/{product.id}", "products", on_primary=False),
+        RoutingCase("product reviews", f"/api/v1/products/{product.id}/reviews", "reviews", on_primary=False),
+        RoutingCase(
+            "X-Read-Your-Writes header", "/api/v1/products", "products", on_primary=True,
+            headers={"X-Read-Your-Writes": "true"}
+        ),
+        RoutingCase(
+            "read-your-writes cookie", "/api/v1/products", "products", on_primary=True,
+            cookies={READ_YOUR_WRITES_COOKIE: str(time.time() + 60)}
+        ),
+        RoutingCase(
+            "read-your-writes product details", f"/api/v1/products/{product.id}", "products", on_primary=True,
+            cookies={READ_YOUR_WRITES_COOKIE: str(time.time() + 60)}
+        ),
+        RoutingCase("cart", "/api/v1/cart", "carts", on_primary=True)
+    ]
+    failures = []
+    
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://replica") as client:
+        response = await client.post("/api/v1/auth/login", data={
+            "username": "routing@example.com",
+            "password": "password123"
+        })
+        response.raise_for_status()
+        # Let the seed replicate so secondaries can serve it
+        await asyncio.sleep(2)
+        
+        for case in cases:
+            product_cache.clear()
+            catalog_version_cache.clear()
+            listener.targets.clear()
+            
+            response = await client.get(case.path, headers=case.headers, cookies=case.cookies)
+            targets = [target for collection, target in listener.targets if collection == case.collection]
+            cache_control = response.headers.get("cache-control", "")
+            # Primary reads of the catalog answer a writer and must stay out of shared caches
+            expected_cache_control = "private, no-store" if case.on_primary else "public"
+            
+            if response.status_code != 200:
+                failures.append(f"{case.name}: {case.path} returned {response.status_code}")
+            elif not targets:
+                failures.append(f"{case.name}: no find on {case.collection} was observed")
+            elif case.on_primary and any(target != primary for target in targets):
+                failures.append(f"{case.name}: expected the primary, reads went to {sorted(set(targets))}")
+            elif not case.on_primary and any(target == primary for target in targets):
+                failures.append(f"{case.name}: expected a secondary, reads went to the primary {primary}")
+            elif case.collection in ("products", "reviews") and not cache_control.startswith(expected_cache_control):
+                failures.append(f"{case.name}: expected Cache-Control {expected_cache_control}, got {cache_control!r}")
+            else:
+                print(f"  ok   {case.name} ({'primary' if case.on_primary else 'secondary'})")
+    
+    db.close_db()
+    return failures
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--base-port", type=int, default=27117)
+    args = parser.parse_args()
+    
+    async with local_replica_set(args.base_port) as url:
+        print(f"Replica set ready at {url}")
+        failures = await check_routing(url)
+    
+    for failure in failures:
+        print(f"  FAIL {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,374 @@
+"""
+Database round-trip budgets per endpoint.
+
+Counts the MongoDB commands each request issues, using a pymongo
+CommandListener, while driving the API in-process through httpx, with
+Stripe replaced by an in-process fake. Every router endpoint must declare a
+budget, and the check fails for one that does not: a fixed number of round
+trips plus an allowance per cart item where the work is inherently per item
+(the conditional stock decrement at checkout). The scenario is repeated at
+several data sizes, so an endpoint that starts issuing one query per cart
+item, review or order fails even if it is under budget at the smallest size.
+Exits non-zero when any budget is exceeded.
+
+Usage (from backend/, with a local mongod running):
+    python -m benchmarks.round_trips --sizes 1 10 50
+"""
+import argparse
+import asyncio
+import hashlib
+import hmac
+import json
+import re
+import sys
+import time
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import httpx
+import stripe
+from fastapi.routing import APIRoute
+from pymongo import monitoring
+
+from app.cache import product_cache
+from app.config import settings
+from app.http_cache import catalog_version_cache
+from app.db import close_db
+from app.models.cart import Cart, CartItem
+from app.models.order import Order, OrderItem, ShippingAddress
+from app.models.product import Product
+from app.models.review import Review
+from app.models.user import User
+from app.security import hash_password
+from benchmarks.common import FakePaymentIntents, init_bench_db
+
+API_PREFIX = "/api/v1"
+
+
+class Budget(NamedTuple):
+    fixed: int
+    per_item: int = 0
+    
+    def allowed(self, size: int) -> int:
+        return self.fixed + self.per_item * size
+
+
+# Authenticated requests include one users lookup for the session
+BUDGETS: Dict[str, Budget] = {
+    "POST /auth/login": Budget(1),
+    "GET /auth/me": Budget(1),
+    "GET /products": Budget(3),  # catalog version (newest updated_at and count) when not cached, then the list
+    "GET /products/{id}": Budget(1),
+    "GET /products/{id}/reviews": Budget(3),  # product updated_at for the ETag, reviews, then authors with $in
+    "POST /products/{id}/reviews": Budget(7),  # includes the rating recalculation
+    "GET /cart": Budget(3),  # user, cart, products with $in
+    "POST /cart/items": Budget(6),
+    "PUT /cart/items/{id}": Budget(6),
+    "DELETE /cart/items/{id}": Budget(5),
+    "POST /orders/create-payment-intent": Budget(3),
+    # One conditional stock decrement per line keeps each item's check atomic
+    "POST /orders": Budget(9, per_item=1),
+    "GET /orders": Budget(2),
+    "POST /auth/register": Budget(2),  # email lookup, insert
+    "POST /auth/logout": Budget(0),
+    "POST /orders/stripe-webhook": Budget(0),
+    "POST /admin/products": Budget(2),
+    "POST /admin/products:import": Budget(2),  # one bulk_write per batch of IMPORT_BATCH_SIZE rows
+    "PATCH /admin/products:bulk": Budget(3),  # one bulk_write, one lookup when a patch matched nothing
+    "PUT /admin/products/{id}": Budget(3),
+    "DELETE /admin/products/{id}": Budget(4),  # product, its shards
+    # Both include one command per shard, bounded by HOT_STOCK_SHARDS rather than the data
+    "POST /admin/products/{id}/hot-stock": Budget(9),
+    "DELETE /admin/products/{id}/hot-stock": Budget(9),
+    "GET /admin/orders": Budget(2),
+    "GET /admin/export/orders": Budget(2),
+    "GET /admin/export/products": Budget(2),
+    "GET /admin/analytics": Budget(4),  # timeseries, top products, top categories
+    # Job insert, then after the response three range deletes, three $merge aggregations, the day count, the job update
+    "POST /admin/analytics/backfill": Budget(10),
+    "GET /admin/analytics/backfill/{id}": Budget(2),
+    "GET /admin/checkout-admission": Budget(1),
+    "GET /admin/metrics": Budget(1),
+    "GET /admin/slow-queries": Budget(1),
+    "DELETE /admin/slow-queries": Budget(1),
+    "GET /admin/loop-stalls": Budget(1),
+    "DELETE /admin/loop-stalls": Budget(1)
+}
+
+# Hot stock split used by the admin hot-stock requests
+HOT_STOCK_SHARDS = 4
+
+
+class CommandCounter(monitoring.CommandListener):
+    """Counts commands sent to the server since the last reset."""
+    
+    def __init__(self):
+        self.commands: List[Tuple[str, str]] = []
+    
+    def started(self, event):
+        collection = event.command.get(event.command_name)
+        self.commands.append((event.command_name, collection if isinstance(collection, str) else ""))
+    
+    def succeeded(self, event):
+        pass
+    
+    def failed(self, event):
+        pass
+
+
+async def seed(size: int) -> Dict[str, str]:
+    """A shopper with `size` cart items and orders, and a product with `size` reviews."""
+    password = hash_password("password123")
+    shopper = User(email="shopper@example.com", hashed_password=password, first_name="Sam", last_name="Shopper")
+    await shopper.insert()
+    await User(
+        email="admin@example.com", hashed_password=password, first_name="Ada", last_name="Admin", is_admin=True
+    ).insert()
+    
+    products = [
+        Product(
+            name=f"Product {index}",
+            description="Round-trip budget fixture",
+            price=10.0 + index,
+            imageUrl="https://example.com/product.png",
+            category="Electronics",
+            stock_quantity=1000
+        )
+        for index in range(size + 1)
+    ]
+    await Product.insert_many(products)
+    products = await Product.find_all().sort(+Product.price).to_list()
+    
+    authors = [
+        User(email=f"author{index}@example.com", hashed_password=password, first_name="Ann", last_name=f"Author{index}")
+        for index in range(size)
+    ]
+    await User.insert_many(authors)
+    authors = await User.find({"email": {"$regex": "^author"}}).to_list()
+    await Review.insert_many([
+        Review(product_id=products[0].id, user_id=author.id, rating=4, comment="Works as described")
+        for author in authors
+    ])
+    
+    await Cart(
+        user_id=shopper.id,
+        items=[CartItem(product_id=product.id, quantity=1) for product in products[:size]]
+    ).insert()
+    await Order.insert_many([
+        Order(
+            user_id=shopper.id,
+            items=[OrderItem(product_id=products[0].id, name=products[0].name, price=products[0].price, quantity=1)],
+            total_amount=products[0].price,
+            shipping_address=ShippingAddress(street="1 Main St", city="Austin", state="TX", zip_code="73301"),
+            stripe_payment_intent_id=f"pi_fixture_{index}"
+        )
+        for index in range(size)
+    ])
+    
+    return {
+        "product": str(products[0].id),
+        "extra_product": str(products[size].id),
+        "products": [str(product.id) for product in products]
+    }
+
+
+def route_key(method: str, path: str) -> str:
+    """The BUDGETS key of a route, with every path parameter written as {id}."""
+    return f"{method} {re.sub(r'{[^}]+}', '{id}', path.removeprefix(API_PREFIX))}"
+
+
+def unbudgeted_routes() -> List[str]:
+    """Router endpoints that declare no round-trip budget."""
+    from app.main import app
+    
+    return sorted(
+        route_key(method, route.path)
+        for route in app.routes
+        if isinstance(route, APIRoute) and route.path.startswith(API_PREFIX)
+        for method in route.methods
+        if route_key(method, route.path) not in BUDGETS
+    )
+
+
+def signed_webhook(payload: str) -> Dict[str, str]:
+    """A Stripe-Signature header for the payload under the configured webhook secret."""
+    timestamp = int(time.time())
+    signature = hmac.new(
+        settings.STRIPE_WEBHOOK_SECRET.encode("utf-8"),
+        f"{timestamp}.{payload}".encode("utf-8"),
+        hashlib.sha256
+    ).hexdigest()
+    return {"Stripe-Signature": f"t={timestamp},v1={signature}", "Content-Type": "application/json"}
+
+
+async def measure_size(size: int, counter: CommandCounter, verbose: bool = False) -> Dict[str, int]:
+    """Run every budgeted request once against a dataset of the given size."""
+    await init_bench_db()
+    fixtures = await seed(size)
+    product_id, extra_id = fixtures["product"], fixtures["extra_product"]
+    counts: Dict[str, int] = {}
+    
+    from app.main import app
+    transport = httpx.ASGITransport(app=app)
+    
+    async with httpx.AsyncClient(transport=transport, base_url=f"http://budget{API_PREFIX}") as client:
+        async def call(route: str, method: str, url: str, **kwargs) -> httpx.Response:
+            # Measure the uncached path, as a cold worker would serve it
+            product_cache.clear()
+            catalog_version_cache.clear()
+            counter.commands.clear()
+            response = await client.request(method, url, **kwargs)
+            counts[route] = len(counter.commands)
+            if verbose:
+                print(f"  n={size} {route}: {', '.join(f'{name} {collection}' for name, collection in counter.commands)}")
+            if response.status_code >= 400:
+                raise RuntimeError(f"{route} returned {response.status_code}: {response.text}")
+            return response
+        
+        await call("POST /auth/login", "POST", "/auth/login", data={
+            "username": "shopper@example.com",
+            "password": "password123"
+        })
+        await call("GET /auth/me", "GET", "/auth/me")
+        await call("GET /products", "GET", "/products", params={"category": "Electronics", "sort": "price_asc"})
+        await call("GET /products/{id}", "GET", f"/products/{product_id}")
+        await call("GET /products/{id}/reviews", "GET", f"/products/{product_id}/reviews")
+        await call("POST /products/{id}/reviews", "POST", f"/products/{extra_id}/reviews", json={
+            "rating": 5,
+            "comment": "Budget check"
+        })
+        await call("GET /cart", "GET", "/cart")
+        await call("POST /cart/items", "POST", "/cart/items", json={"product_id": extra_id, "quantity": 1})
+        await call("PUT /cart/items/{id}", "PUT", f"/cart/items/{extra_id}", json={"quantity": 2})
+        await call("DELETE /cart/items/{id}", "DELETE", f"/cart/items/{extra_id}")
+        await call("GET /orders", "GET", "/orders")
+        await call("POST /orders/create-payment-intent", "POST", "/orders/create-payment-intent")
+        await call("POST /orders", "POST", "/orders", json={
+            "payment_intent_id": "pi_budget",
+            "shipping_address": {"street": "1 Main St", "city": "Austin", "state": "TX", "zip_code": "73301"}
+        })
+        
+        payload = json.dumps({
+            "id": "evt_budget",
+            "object": "event",
+            "type": "payment_intent.succeeded",
+            "data": {"object": {"id": "pi_budget", "object": "payment_intent"}}
+        })
+        await call("POST /orders/stripe-webhook", "POST", "/orders/stripe-webhook",
+                   content=payload, headers=signed_webhook(payload))
+        await call("POST /auth/logout", "POST", "/auth/logout")
+        await call("POST /auth/register", "POST", "/auth/register", json={
+            "email": "newcomer@example.com",
+            "password": "password123",
+            "first_name": "Nia",
+            "last_name": "Newcomer"
+        })
+        
+        # Admin endpoints
+        await client.post("/auth/login", data={"username": "admin@example.com", "password": "password123"})
+        created = await call("POST /admin/products", "POST", "/admin/products", json={
+            "sku": "BUDGET-NEW",
+            "name": "Budget product",
+            "description": "Round-trip budget fixture",
+            "price": 5.0,
+            "imageUrl": "https://example.com/product.png",
+            "category": "Books",
+            "stock_quantity": 10
+        })
+        created_id = created.json()["id"]
+        await call("POST /admin/products:import", "POST", "/admin/products:import", content="\n".join(
+            json.dumps({
+                "sku": f"BUDGET-{index}",
+                "name": f"Imported {index}",
+                "description": "Round-trip budget fixture",
+                "price": 3.0,
+                "imageUrl": "https://example.com/product.png",
+                "category": "Books",
+                "stock_quantity": 5
+            })
+            for index in range(size)
+        ), headers={"Content-Type": "application/x-ndjson"})
+        await call("PATCH /admin/products:bulk", "PATCH", "/admin/products:bulk", json=[
+            {"id": fixture_id, "stock_delta": -1000 if index == 0 else 1}
+            for index, fixture_id in enumerate(fixtures["products"])
+        ])
+        await call("PUT /admin/products/{id}", "PUT", f"/admin/products/{created_id}", json={"price": 6.0})
+        await call("POST /admin/products/{id}/hot-stock", "POST", f"/admin/products/{created_id}/hot-stock",
+                   params={"shards": HOT_STOCK_SHARDS})
+        await call("DELETE /admin/products/{id}/hot-stock", "DELETE", f"/admin/products/{created_id}/hot-stock")
+        await call("DELETE /admin/products/{id}", "DELETE", f"/admin/products/{created_id}")
+        await call("GET /admin/orders", "GET", "/admin/orders")
+        await call("GET /admin/export/orders", "GET", "/admin/export/orders")
+        await call("GET /admin/export/products", "GET", "/admin/export/products")
+        await call("GET /admin/analytics", "GET", "/admin/analytics")
+        # The in-process transport returns once the background rebuild has finished too
+        backfill = await call("POST /admin/analytics/backfill", "POST", "/admin/analytics/backfill")
+        await call("GET /admin/analytics/backfill/{id}", "GET", f"/admin/analytics/backfill/{backfill.json()['id']}")
+        await call("GET /admin/checkout-admission", "GET", "/admin/checkout-admission")
+        await call("GET /admin/metrics", "GET", "/admin/metrics")
+        await call("GET /admin/slow-queries", "GET", "/admin/slow-queries")
+        await call("DELETE /admin/slow-queries", "DELETE", "/admin/slow-queries")
+        await call("GET /admin/loop-stalls", "GET", "/admin/loop-stalls")
+        await call("DELETE /admin/loop-stalls", "DELETE", "/admin/loop-stalls")
+    
+    close_db()
+    return counts
+
+
+def check_budgets(counts_by_size: Dict[int, Dict[str, int]]) -> List[str]:
+    """Budget violations, and fixed budgets whose count grew with the data size."""
+    failures = []
+    smallest = min(counts_by_size)
+    
+    for route, budget in BUDGETS.items():
+        for size, counts in sorted(counts_by_size.items()):
+            if counts[route] > budget.allowed(size):
+                failures.append(f"{route}: {counts[route]} round trips at size {size}, budget {budget.allowed(size)}")
+        
+        grown = {
+            size: counts[route] - budget.per_item * size
+            for size, counts in counts_by_size.items()
+        }
+        if max(grown.values()) > grown[smallest]:
+            failures.append(f"{route}: round trips grow with data size beyond the per-item allowance {grown}")
+    
+    return failures
+
+
+async def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 10, 50],
+                        help="Cart items, reviews and orders per scenario")
+    parser.add_argument("--verbose", action="store_true", help="Print the commands of every request")
+    args = parser.parse_args(argv)
+    
+    counter = CommandCounter()
+    # Listeners only attach to clients created after registration
+    monitoring.register(counter)
+    # Payment intents never reach Stripe, and webhooks are signed with a throwaway secret
+    stripe.PaymentIntent = FakePaymentIntents
+    settings.STRIPE_WEBHOOK_SECRET = "whsec_round_trips"
+    
+    counts_by_size = {}
+    for size in args.sizes:
+        counts_by_size[size] = await measure_size(size, counter, args.verbose)
+    
+    print(f"{'endpoint':40}" + "".join(f"{f'n={size}':>8}" for size in args.sizes) + f"{'budget':>14}")
+    for route, budget in BUDGETS.items():
+        allowance = f"{budget.fixed} + {budget.per_item}n" if budget.per_item else str(budget.fixed)
+        print(f"{route:40}" + "".join(f"{counts_by_size[size][route]:>8}" for size in args.sizes) + f"{allowance:>14}")
+    
+    failures = check_budgets(counts_by_size) + [
+        f"{route}: no round-trip budget declared" for route in unbudgeted_routes()
+    ]
+    if failures:
+        print(f"\n{len(failures)} budget violation(s):")
+        for failure in failures:
+            print(f"  {failure}")
+        return 1
+    
+    print("\nAll endpoints within their round-trip budgets")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,239 @@
+"""
+Service-level micro-benchmarks for checkout and catalog hot paths.
+
+Generates a synthetic dataset of the requested scale (see benchmarks.datagen),
+then times each hot function in-process: cart population, payment intent and
+order creation (against a fake payment gateway), rating recalculation,
+product listing per filter/sort combination, reviews, authentication and
+*Public schema construction. Results can be compared with a previous run,
+failing when a case slowed down beyond the threshold.
+
+Usage (from backend/, with a local mongod running):
+    python -m benchmarks.service_benchmark --scale 0.001 --output current.json
+    python -m benchmarks.service_benchmark --skip-datagen --baseline current.json --threshold 0.25
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import statistics
+import sys
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+import stripe
+from starlette.requests import Request
+from starlette.responses import Response
+
+from app.models.cart import Cart, CartItem
+from app.models.order import Order
+from app.models.product import Product
+from app.routers import products as products_router
+from app.schemas.order_schemas import OrderItemSchema, OrderPublic, ShippingAddressSchema
+from app.schemas.product_schemas import ProductPublic
+from app.security import create_access_token, get_current_user
+from app.services.cart_service import get_populated_cart
+from app.services.order_service import create_order_from_cart, create_payment_intent
+from app.services.product_service import recalculate_product_rating
+from benchmarks import datagen
+from benchmarks.common import BENCH_MONGODB_URL, FakePaymentIntents, init_bench_db, report
+
+
+async def measure(
+    call: Callable[[], Awaitable],
+    iterations: int,
+    warmup: int,
+    setup: Optional[Callable[[], Awaitable]] = None
+) -> Dict[str, float]:
+    """Time `iterations` calls after `warmup` untimed ones; setup runs untimed before each."""
+    timings: List[float] = []
+    
+    for iteration in range(warmup + iterations):
+        if setup:
+            await setup()
+        
+        started = time.perf_counter()
+        await call()
+        elapsed = time.perf_counter() - started
+        
+        if iteration >= warmup:
+            timings.append(elapsed)
+    
+    percentiles = statistics.quantiles(timings, n=100) if len(timings) > 1 else timings * 99
+    return {
+        "p50_ms": statistics.median(timings) * 1000,
+        "p95_ms": percentiles[94] * 1000,
+        "mean_ms": statistics.mean(timings) * 1000,
+        "ops_per_second": len(timings) / sum(timings)
+    }
+
+
+async def build_cases() -> Dict[str, Tuple[Callable, Optional[Callable]]]:
+    """Pick fixtures from the generated data and build (call, setup) pairs per case."""
+    cart = await Cart.find_one({"items.0": {"$exists": True}})
+    popular = await Product.find_all().sort(-Product.review_count).first_or_none()
+    listing = await Product.find_all().limit(20).to_list()
+    order = await Order.find_one()
+    category = popular.category
+    
+    # A user with a three-item cart, refilled before each checkout call
+    buyer_id = cart.user_id
+    buyer_items = [CartItem(product_id=product.id, quantity=1) for product in listing[:3]]
+    await Product.find({"_id": {"$in": [item.product_id for item in buyer_items]}}).update(
+        {"$set": {"stock_quantity": 10_000_000, "stock_shards": 0}}
+    )
+    
+    async def refill_cart() -> None:
+        await Cart.find_one(Cart.user_id == buyer_id).update({"$set": {"items": [
+            item.model_dump() for item in buyer_items
+        ]}})
+    
+    token = create_access_token({"sub": str(buyer_id)})
+    request = Request({
+        "type": "http",
+        "headers": [(b"cookie", f"access_token={token}".encode())]
+    })
+    # The catalog handlers read If-None-Match and set caching headers
+    catalog_request = Request({"type": "http", "headers": []})
+    
+    def product_public(product: Product) -> ProductPublic:
+        return ProductPublic(
+            id=str(product.id),
+            sku=product.sku,
+            name=product.name,
+            description=product.description,
+            price=product.price,
+            imageUrl=product.imageUrl,
+            category=product.category,
+            stock_quantity=product.stock_quantity,
+            avg_rating=product.avg_rating,
+            review_count=product.review_count,
+            created_at=product.created_at
+        )
+    
+    def order_public(order: Order) -> OrderPublic:
+        return OrderPublic(
+            id=str(order.id),
+            user_id=str(order.user_id),
+            items=[
+                OrderItemSchema(
+                    product_id=str(item.product_id),
+                    name=item.name,
+                    price=item.price,
+                    quantity=item.quantity
+                )
+                for item in order.items
+            ],
+            total_amount=order.total_amount,
+            shipping_address=ShippingAddressSchema(**order.shipping_address.model_dump()),
+            status=order.status,
+            stripe_payment_intent_id=order.stripe_payment_intent_id,
+            created_at=order.created_at
+        )
+    
+    async def build_publics() -> None:
+        for product in listing:
+            product_public(product)
+        order_public(order)
+    
+    shipping = ShippingAddressSchema(street="1 Main St", city="Austin", state="TX", zip_code="73301")
+    
+    cases = {
+        "get_current_user": (lambda: get_current_user(request), None),
+        "get_populated_cart": (lambda: get_populated_cart(buyer_id), refill_cart),
+        "create_payment_intent": (lambda: create_payment_intent(buyer_id), refill_cart),
+        "create_order_from_cart": (
+            lambda: create_order_from_cart(buyer_id, "pi_benchmark", shipping),
+            refill_cart
+        ),
+        "recalculate_product_rating": (lambda: recalculate_product_rating(popular.id), None),
+        "get_product_reviews": (lambda: products_router.get_product_reviews(
+            str(popular.id), catalog_request, Response()
+        ), None),
+        "public_schemas_20_products_1_order": (build_publics, None)
+    }
+    
+    # Every listing filter/sort combination the catalog page can send
+    for filter_category, sort, q in itertools.product(
+        (None, category),
+        (None, "price_asc", "price_desc"),
+        (None, "wireless")
+    ):
+        name = "get_products[{}]".format(",".join(
+            f"{key}={value}"
+            for key, value in (("category", filter_category), ("sort", sort), ("q", q))
+            if value
+        ) or "default")
+        cases[name] = (
+            lambda filter_category=filter_category, sort=sort, q=q: products_router.get_products(
+                catalog_request, Response(), skip=0, limit=20, category=filter_category, sort=sort, q=q
+            ),
+            None
+        )
+    
+    return cases
+
+
+def find_regressions(results: Dict[str, float], baseline_path: str, threshold: float) -> List[str]:
+    """Cases whose median latency grew by more than threshold relative to the baseline."""
+    with open(baseline_path) as f:
+        baseline = json.load(f)["results"]
+    
+    regressions = []
+    for key, value in results.items():
+        if key.endswith("_p50_ms") and key in baseline and value > baseline[key] * (1 + threshold):
+            regressions.append(f"{key}: {baseline[key]:.2f}ms -> {value:.2f}ms")
+    return regressions
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--scale", type=float, default=0.001, help="Dataset size, as for benchmarks.datagen")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--skip-datagen", action="store_true", help="Reuse the data already in the database")
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--cases", nargs="*", help="Only run cases whose name starts with one of these")
+    parser.add_argument("--output", help="Write results to this JSON file")
+    parser.add_argument("--baseline", help="Compare against a previous --output file")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Allowed p50 slowdown, 0.25 = 25%%")
+    args = parser.parse_args()
+    
+    if not args.skip_datagen:
+        datagen_args = argparse.Namespace(
+            url=BENCH_MONGODB_URL,
+            seed=args.seed,
+            days=365,
+            zipf_exponent=1.1,
+            batch_size=5000,
+            concurrency=8,
+            drop=True,
+            **{name: max(1, int(default * args.scale)) for name, default in datagen.DEFAULTS.items()}
+        )
+        await datagen.generate(datagen_args)
+    
+    await init_bench_db(drop=False)
+    stripe.PaymentIntent = FakePaymentIntents
+    
+    results: Dict[str, float] = {"scale": args.scale, "iterations": args.iterations}
+    
+    for name, (call, setup) in (await build_cases()).items():
+        if args.cases and not any(name.startswith(prefix) for prefix in args.cases):
+            continue
+        for stat, value in (await measure(call, args.iterations, args.warmup, setup)).items():
+            results[f"{name}_{stat}"] = value
+    
+    report("service", results, args.output)
+    
+    if args.baseline:
+        regressions = find_regressions(results, args.baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} case(s) regressed by more than {args.threshold:.0%}:")
+            for regression in regressions:
+                print(f"  {regression}")
+            sys.exit(1)
+        print(f"\nNo case regressed by more than {args.threshold:.0%}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,93 @@
+"""
+Worker startup time benchmark.
+
+Boots several workers at once, each running the same startup as the API
+lifespan, once in the default mode (create indexes and seed) and once in
+FAST_START mode (only check that indexes exist). Reports the slowest and
+mean startup time per mode.
+
+Usage (from backend/, with a local mongod running):
+    python -m benchmarks.startup_benchmark --workers 8 --rounds 3
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+
+from app import db
+from app.config import settings
+from app.db import close_db, init_db, seed_database, verify_indexes
+from benchmarks.common import BENCH_MONGODB_URL, init_bench_db, report
+
+
+async def boot(fast_start: bool) -> None:
+    """One worker's database startup, as run by the lifespan handler."""
+    settings.MONGODB_URL = BENCH_MONGODB_URL
+    started = time.perf_counter()
+    
+    if fast_start:
+        await init_db(create_indexes=False)
+        await verify_indexes()
+    else:
+        await init_db()
+        await seed_database()
+    
+    print(time.perf_counter() - started)
+    close_db()
+
+
+async def run_round(workers: int, fast_start: bool) -> list:
+    """Start the workers as separate processes and collect their startup times."""
+    processes = [
+        await asyncio.create_subprocess_exec(
+            sys.executable, "-m", "benchmarks.startup_benchmark",
+            "--worker", "fast" if fast_start else "full",
+            stdout=asyncio.subprocess.PIPE
+        )
+        for _ in range(workers)
+    ]
+    
+    timings = []
+    for process in processes:
+        stdout, _ = await process.communicate()
+        timings.append(float(stdout.decode().strip().splitlines()[-1]))
+    return timings
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--worker", choices=["full", "fast"], help=argparse.SUPPRESS)
+    parser.add_argument("--output", help="Write results to this JSON file")
+    args = parser.parse_args()
+    
+    if args.worker:
+        await boot(args.worker == "fast")
+        return
+    
+    results = {"workers": args.workers, "rounds": args.rounds}
+    
+    for mode, fast_start in (("full", False), ("fast_start", True)):
+        slowest, timings = [], []
+        
+        for _ in range(args.rounds):
+            # Full startup is measured on an empty database, fast start after migrate
+            await init_bench_db()
+            if not fast_start:
+                await db.client.drop_database(db.client.get_default_database().name)
+            close_db()
+            
+            round_timings = await run_round(args.workers, fast_start)
+            slowest.append(max(round_timings))
+            timings.extend(round_timings)
+        
+        results[f"{mode}_slowest_worker_ms"] = statistics.mean(slowest) * 1000
+        results[f"{mode}_mean_worker_ms"] = statistics.mean(timings) * 1000
+    
+    report("startup", results, args.output)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
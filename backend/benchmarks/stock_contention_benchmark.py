@@ -0,0 +1,84 @@
+"""
+Hot-product stock contention benchmark.
+
+Many concurrent buyers decrement the stock of a single product, first with
+the plain single-document counter and then with increasing shard counts.
+Reports decrements per second and checks that no unit was lost or oversold.
+
+Usage (from backend/, with a local mongod running):
+    python -m benchmarks.stock_contention_benchmark --buyers 200 --purchases 20000 --shards 1 4 16
+"""
+import argparse
+import asyncio
+import time
+
+from app.models.product import Product
+from app.services.product_service import decrease_stock
+from app.services.stock_service import enable_hot_stock, get_sharded_stock
+from benchmarks.common import init_bench_db, report
+
+
+async def run_phase(buyers: int, purchases: int, shards: int) -> dict:
+    """Sell a product with purchases - buyers units to purchases attempts."""
+    # Less stock than attempts, so the last buyers must be turned away
+    stock = purchases - buyers
+    product = Product(
+        name=f"Drop with {shards} shards",
+        description="Limited release",
+        price=99.0,
+        imageUrl="https://example.com/drop.jpg",
+        category="Drops",
+        stock_quantity=stock
+    )
+    await product.insert()
+    
+    if shards:
+        product = await enable_hot_stock(product.id, shards)
+    
+    attempts = iter(range(purchases))
+    sold = 0
+    
+    async def buyer() -> None:
+        nonlocal sold
+        for _ in attempts:
+            if await decrease_stock(product.id, 1, product.stock_shards):
+                sold += 1
+    
+    started = time.perf_counter()
+    await asyncio.gather(*(buyer() for _ in range(buyers)))
+    elapsed = time.perf_counter() - started
+    
+    if shards:
+        remaining = await get_sharded_stock(product.id)
+    else:
+        remaining = (await Product.get(product.id)).stock_quantity
+    
+    return {
+        "decrements_per_second": purchases / elapsed,
+        "sold": sold,
+        # Every unit is either sold or still in stock
+        "consistent": sold + remaining == stock
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--buyers", type=int, default=200)
+    parser.add_argument("--purchases", type=int, default=20000)
+    parser.add_argument("--shards", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--output", help="Write results to this JSON file")
+    args = parser.parse_args()
+    
+    await init_bench_db()
+    
+    results = {"buyers": args.buyers, "purchases": args.purchases}
+    for shards in [0] + args.shards:
+        phase = f"shards_{shards}" if shards else "single_document"
+        for key, value in (await run_phase(args.buyers, args.purchases, shards)).items():
+            results[f"{phase}_{key}"] = value
+    
+    report("stock_contention", results, args.output)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,117 @@
+"""
+Full-document save() versus diff-only save_changes() benchmark.
+
+Applies the same small mutations (a product price change, a cart quantity
+change) with both write paths and reports bytes sent in update commands and
+mean latency per write for the products and carts collections.
+
+Usage (from backend/, with a local mongod running):
+    python -m benchmarks.write_benchmark --documents 2000
+"""
+import argparse
+import asyncio
+import time
+from collections import defaultdict
+
+import bson
+from beanie import PydanticObjectId
+from pymongo import monitoring
+
+from app.models.cart import Cart, CartItem
+from app.models.product import Product
+from benchmarks.common import init_bench_db, report
+
+
+class UpdateBytesListener(monitoring.CommandListener):
+    """Sums the encoded size of update commands per collection."""
+    
+    def __init__(self):
+        self.bytes_sent = defaultdict(int)
+    
+    def started(self, event):
+        if event.command_name in ("update", "findAndModify"):
+            self.bytes_sent[event.command[event.command_name]] += len(bson.encode(event.command))
+    
+    def succeeded(self, event):
+        pass
+    
+    def failed(self, event):
+        pass
+    
+    def reset(self):
+        self.bytes_sent.clear()
+
+
+async def seed(documents: int) -> None:
+    """Insert products with realistic descriptions and carts with several items."""
+    products = [
+        Product(
+            name=f"Product {i}",
+            description="A long, detailed product description. " * 40,
+            price=19.99,
+            imageUrl="https://example.com/image.jpg",
+            category="Electronics",
+            stock_quantity=100
+        )
+        for i in range(documents)
+    ]
+    await Product.insert_many(products)
+    
+    carts = [
+        Cart(
+            user_id=PydanticObjectId(),
+            items=[CartItem(product_id=PydanticObjectId(), quantity=1) for _ in range(10)]
+        )
+        for _ in range(documents)
+    ]
+    await Cart.insert_many(carts)
+
+
+async def run_phase(listener: UpdateBytesListener, documents: int, diff_only: bool) -> dict:
+    """Mutate every product and cart once and measure the writes."""
+    results = {}
+    
+    for name, model, mutate in (
+        ("products", Product, lambda product: setattr(product, "price", product.price + 1)),
+        ("carts", Cart, lambda cart: setattr(cart.items[0], "quantity", cart.items[0].quantity + 1))
+    ):
+        loaded = await model.find_all().limit(documents).to_list()
+        listener.reset()
+        started = time.perf_counter()
+        
+        for document in loaded:
+            mutate(document)
+            if diff_only:
+                await document.save_changes()
+            else:
+                await document.save()
+        
+        elapsed = time.perf_counter() - started
+        results[f"{name}_bytes_per_write"] = listener.bytes_sent[model.get_collection_name()] / len(loaded)
+        results[f"{name}_ms_per_write"] = elapsed * 1000 / len(loaded)
+    
+    return results
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--documents", type=int, default=2000)
+    parser.add_argument("--output", help="Write results to this JSON file")
+    args = parser.parse_args()
+    
+    listener = UpdateBytesListener()
+    monitoring.register(listener)
+    
+    await init_bench_db()
+    await seed(args.documents)
+    
+    results = {"documents": args.documents}
+    for phase, diff_only in (("save", False), ("save_changes", True)):
+        for key, value in (await run_phase(listener, args.documents, diff_only)).items():
+            results[f"{phase}_{key}"] = value
+    
+    report("writes", results, args.output)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
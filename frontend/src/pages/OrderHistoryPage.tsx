@@ -1,20 +1,24 @@
 import React, { useEffect, useState } from "react";
 import api from "../api/axios";
 import { Order } from "../types";
+import { Button } from "../components/ui/button";
 import { Card, CardContent, CardHeader, CardTitle } from "../components/ui/card";
 
 const OrderHistoryPage: React.FC = () => {
   const [orders, setOrders] = useState<Order[]>([]);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
 
   useEffect(() => {
     fetchOrders();
   }, []);
 
-  const fetchOrders = async () => {
+  const fetchOrders = async (cursor?: string) => {
     try {
-      const response = await api.get("/orders/my-orders");
-      setOrders(response.data);
+      const response = await api.get("/orders", { params: { cursor } });
+      setOrders((previous) => (cursor ? [...previous, ...response.data] : response.data));
+      setNextCursor(response.headers["x-next-cursor"] ?? null);
     } catch (error) {
       console.error("Error fetching orders:", error);
     } finally {
@@ -22,6 +26,13 @@ const OrderHistoryPage: React.FC = () => {
     }
   };
 
+  const loadMore = async () => {
+    if (!nextCursor) return;
+    setLoadingMore(true);
+    await fetchOrders(nextCursor);
+    setLoadingMore(false);
+  };
+
   if (loading) {
     return (
       <div className="flex justify-center items-center min-h-screen">
@@ -104,6 +115,14 @@ const OrderHistoryPage: React.FC = () => {
                 </CardContent>
               </Card>
             ))}
+
+            {nextCursor && (
+              <div className="flex justify-center">
+                <Button variant="outline" onClick={loadMore} disabled={loadingMore}>
+                  {loadingMore ? "Loading..." : "Load more orders"}
+                </Button>
+              </div>
+            )}
           </div>
         )}
       </div>
@@ -17,14 +17,27 @@ const DashboardPage: React.FC = () => {
     fetchStats();
   }, []);
 
+  // Order totals need every order, so follow the cursor through all pages of summaries
+  const fetchAllOrders = async () => {
+    const orders: any[] = [];
+    let cursor: string | undefined;
+    do {
+      const response = await api.get("/admin/orders", {
+        params: { summary: true, limit: 200, cursor },
+      });
+      orders.push(...response.data);
+      cursor = response.headers["x-next-cursor"];
+    } while (cursor);
+    return orders;
+  };
+
   const fetchStats = async () => {
     try {
-      const [productsRes, ordersRes] = await Promise.all([
+      const [productsRes, orders] = await Promise.all([
         api.get("/products?limit=1000"),
-        api.get("/admin/orders"),
+        fetchAllOrders(),
       ]);
 
-      const orders = ordersRes.data;
       setStats({
         totalProducts: productsRes.data.total,
         totalOrders: orders.length,
@@ -6,16 +6,19 @@ import { Card, CardContent, CardHeader, CardTitle } from "../../components/ui/ca
 
 const ManageOrdersPage: React.FC = () => {
   const [orders, setOrders] = useState<Order[]>([]);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
 
   useEffect(() => {
     fetchOrders();
   }, []);
 
-  const fetchOrders = async () => {
+  const fetchOrders = async (cursor?: string) => {
     try {
-      const response = await api.get("/admin/orders");
-      setOrders(response.data);
+      const response = await api.get("/admin/orders", { params: { cursor } });
+      setOrders((previous) => (cursor ? [...previous, ...response.data] : response.data));
+      setNextCursor(response.headers["x-next-cursor"] ?? null);
     } catch (error) {
       console.error("Error fetching orders:", error);
     } finally {
@@ -23,6 +26,13 @@ const ManageOrdersPage: React.FC = () => {
     }
   };
 
+  const loadMore = async () => {
+    if (!nextCursor) return;
+    setLoadingMore(true);
+    await fetchOrders(nextCursor);
+    setLoadingMore(false);
+  };
+
   const handleStatusUpdate = async (orderId: string, status: string) => {
     try {
       await api.patch(`/admin/orders/${orderId}/status`, { status });
@@ -161,6 +171,14 @@ const ManageOrdersPage: React.FC = () => {
                 </CardContent>
               </Card>
             ))}
+
+            {nextCursor && (
+              <div className="flex justify-center">
+                <Button variant="outline" onClick={loadMore} disabled={loadingMore}>
+                  {loadingMore ? "Loading..." : "Load more orders"}
+                </Button>
+              </div>
+            )}
           </div>
         )}
       </div>